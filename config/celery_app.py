@@ -9,11 +9,11 @@ import logging
 import os
 
 from celery import Celery
-from celery.signals import setup_logging
-
-from raterapid.rate.celery_config import RateAppCeleryConfig
+from celery.signals import setup_logging, worker_process_init
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.local")
+# The system checks already run with every manage.py command of the web start-up, workers need not repeat them.
+os.environ.setdefault("CELERY_SKIP_CHECKS", "1")
 
 app = Celery("raterapid")
 
@@ -21,11 +21,26 @@ app.config_from_object("django.conf:settings", namespace="CELERY")
 
 app.autodiscover_tasks()
 
-app.conf.beat_schedule = {}
-app.conf.beat_schedule.update(RateAppCeleryConfig.beat_schedule())
+
+@app.on_after_configure.connect
+def setup_beat_schedule(sender, **kwargs):
+    """Adds the apps' beat schedules once the configuration is read, so importing the app does not load Django."""
+    from raterapid.core.celery_config import CoreAppCeleryConfig
+    from raterapid.rate.celery_config import RateAppCeleryConfig
+
+    sender.conf.beat_schedule.update(CoreAppCeleryConfig.beat_schedule())
+    sender.conf.beat_schedule.update(RateAppCeleryConfig.beat_schedule())
 
 
 @setup_logging.connect
 def setup_celery_logging(**kwargs):
     """Set celery worker ROOT logger to celery."""
     return logging.getLogger("celery")
+
+
+@worker_process_init.connect
+def restart_logging(**kwargs):
+    """Starts the logging threads in each pool process, which does not inherit them from the worker."""
+    from raterapid.core.log import restart_log_listeners
+
+    restart_log_listeners()
@@ -0,0 +1,46 @@
+"""
+Gunicorn config for RateRapid production deployments.
+
+The app is loaded once in the master and forked into the workers, so they share its memory pages and start
+serving right away. Conversions mostly wait on the currency API providers, so each worker runs a pool of threads:
+a handful of processes keeps the CPUs busy while the threads overlap the waits.
+
+Every setting can be overridden through the ``GUNICORN_*`` environment variables.
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5000")
+preload_app = True
+worker_class = "gthread"
+workers = int(os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count() + 1))
+threads = int(os.environ.get("GUNICORN_THREADS", 8))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+# Recycle workers now and then to bound slow leaks, at different times so they never all restart at once.
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 5000))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", 500))
+# Heartbeat files on tmpfs, a disk-backed /tmp can stall the workers' heartbeats in containers.
+worker_tmp_dir = os.environ.get("GUNICORN_WORKER_TMP_DIR", "/dev/shm" if os.path.isdir("/dev/shm") else None)
+
+
+def pre_fork(server, worker):
+    """Closes the master's connections so the worker does not inherit them."""
+    from raterapid.core.process import close_connections
+
+    close_connections()
+
+
+def post_fork(server, worker):
+    """Resets the process-local state the worker inherited from the master."""
+    from raterapid.core.process import reset_after_fork
+
+    reset_after_fork()
+
+
+def worker_exit(server, worker):
+    """Flushes the worker's buffered state before it exits."""
+    from raterapid.core.process import flush_before_exit
+
+    flush_before_exit()
@@ -11,6 +11,8 @@ ALLOWED_HOSTS = env.list("DJANGO_ALLOWED_HOSTS", default=["RapidRate.MustafaGoma
 # DATABASES
 # ------------------------------------------------------------------------------
 DATABASES["default"]["CONN_MAX_AGE"] = env.int("CONN_MAX_AGE", default=60)  # noqa: F405
+for replica in DATABASE_REPLICAS:  # noqa: F405
+    DATABASES[replica]["CONN_MAX_AGE"] = DATABASES["default"]["CONN_MAX_AGE"]  # noqa: F405
 
 # CACHES
 # ------------------------------------------------------------------------------
@@ -147,11 +149,12 @@ INSTALLED_APPS = ["collectfast"] + INSTALLED_APPS  # noqa: F405
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
-    "filters": {"require_debug_false": {"()": "django.utils.log.RequireDebugFalse"}},
+    "filters": {
+        "require_debug_false": {"()": "django.utils.log.RequireDebugFalse"},
+        "sample_requests": {"()": "raterapid.core.log.SamplingFilter", "rate": LOG_SAMPLE_RATE},  # noqa: F405
+    },
     "formatters": {
-        "verbose": {
-            "format": "%(levelname)s %(asctime)s %(module)s %(process)d %(thread)d %(message)s",
-        },
+        "json": {"()": "raterapid.core.log.JSONFormatter"},
     },
     "handlers": {
         "mail_admins": {
@@ -162,10 +165,16 @@ LOGGING = {
         "console": {
             "level": "DEBUG",
             "class": "logging.StreamHandler",
-            "formatter": "verbose",
+            "formatter": "json",
+        },
+        # Writes to the console from a background thread, so request threads never wait on the I/O.
+        "queue": {
+            "()": "raterapid.core.log.QueueListenerHandler",
+            "handlers": ["cfg://handlers.console"],
+            "maxsize": LOG_QUEUE_SIZE,  # noqa: F405
         },
     },
-    "root": {"level": "INFO", "handlers": ["console"]},
+    "root": {"level": "INFO", "handlers": ["queue"]},
     "loggers": {
         "django.request": {
             "handlers": ["mail_admins"],
@@ -174,8 +183,10 @@ LOGGING = {
         },
         "django.security.DisallowedHost": {
             "level": "ERROR",
-            "handlers": ["console", "mail_admins"],
+            "handlers": ["queue", "mail_admins"],
             "propagate": True,
         },
+        "raterapid.rate.views": {"filters": ["sample_requests"]},
+        "raterapid.utils.currency_clients": {"filters": ["sample_requests"]},
     },
 }
@@ -17,10 +17,11 @@ import os
 import sys
 from pathlib import Path
 
-from django.core.wsgi import get_wsgi_application
-
 BASE_DIR = Path(__file__).resolve(strict=True).parent.parent
 sys.path.append(str(BASE_DIR / "raterapid"))
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.production")
 
+# API routes go through a lean middleware pipeline, see raterapid.core.handlers.
+from raterapid.core.handlers import get_wsgi_application  # noqa: E402
+
 application = get_wsgi_application()
@@ -0,0 +1,26 @@
+"""Core App Admin."""
+
+from django.contrib import admin
+
+from .models import RequestProfile
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    """Admin class for RequestProfile model, slowest requests first."""
+
+    list_display = ("created_at", "method", "path", "status_code", "duration_ms", "user")
+    list_filter = ("method", "status_code")
+    search_fields = ("=path",)
+    list_select_related = ("user",)
+    ordering = ("-duration_ms",)
+    date_hierarchy = "created_at"
+    readonly_fields = ("created_at", "method", "path", "status_code", "duration_ms", "phases", "user")
+
+    def has_add_permission(self, request):
+        """Returns False to disable add permission."""
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        """Returns False to disable change permission."""
+        return False
@@ -10,3 +10,22 @@ class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "raterapid.core"
     verbose_name = "Core"
+
+    def ready(self):
+        """
+        Resets the database routing state around every request and Celery task.
+
+        Also passes the trace of the sender on to the Celery tasks it sends, and traces their runs.
+        """
+        from celery.signals import before_task_publish, task_postrun, task_prerun
+        from django.core.signals import request_finished, request_started
+
+        from .db_router import finish_request, reset, start_request
+        from .tracing import trace_task_end, trace_task_publish, trace_task_start
+
+        request_started.connect(start_request, dispatch_uid="db_router_start_request")
+        request_finished.connect(finish_request, dispatch_uid="db_router_finish_request")
+        task_prerun.connect(reset, dispatch_uid="db_router_reset")
+        before_task_publish.connect(trace_task_publish, dispatch_uid="tracing_task_publish")
+        task_prerun.connect(trace_task_start, dispatch_uid="tracing_task_start")
+        task_postrun.connect(trace_task_end, dispatch_uid="tracing_task_end")
@@ -0,0 +1,24 @@
+# coding=utf-8
+"""Core App Celery-Config."""
+
+
+from celery.schedules import crontab
+from django.conf import settings
+
+
+class CoreAppCeleryConfig(object):
+    """Class representing the Core application celery configuration."""
+
+    @staticmethod
+    def beat_schedule() -> dict:
+        """Retrieve the celery.beat_schedule records related to the App."""
+        return {
+            "schedule-prune_request_profiles": {
+                "task": "raterapid.core.tasks.prune_request_profiles",
+                "schedule": crontab(**settings.PRUNE_REQUEST_PROFILES),
+                "args": (),
+            },
+        }
+
+
+__all__ = ["CoreAppCeleryConfig"]
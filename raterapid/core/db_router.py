@@ -0,0 +1,89 @@
+# coding=utf-8
+"""Core App Database Router."""
+
+import hashlib
+import random
+from contextvars import ContextVar
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+# Whether reads of the current request or task must go to the primary, because it wrote or recently wrote.
+_pinned_to_primary: ContextVar[bool] = ContextVar("pinned_to_primary", default=False)
+# Cache key remembering, across requests, that the current client wrote recently.
+_pin_key: ContextVar[Optional[str]] = ContextVar("pin_key", default=None)
+
+
+def pin_key_for(environ: dict) -> Optional[str]:
+    """Returns the cache key identifying the client of a request, from its credentials or session cookie."""
+    credentials = environ.get("HTTP_AUTHORIZATION") or environ.get("HTTP_COOKIE")
+    if not credentials:
+        return None
+    return f"db_pin:{hashlib.sha256(credentials.encode()).hexdigest()[:32]}"
+
+
+def start_request(sender, environ: Optional[dict] = None, **kwargs) -> None:
+    """Resets the routing state at the start of a request, pinning clients which wrote recently to the primary."""
+    key = pin_key_for(environ or {}) if settings.DATABASE_REPLICAS else None
+    _pin_key.set(key)
+    _pinned_to_primary.set(bool(key and cache.get(key)))
+
+
+def finish_request(sender, **kwargs) -> None:
+    """Keeps a client which wrote during the request pinned to the primary for ``DATABASE_REPLICA_PIN_SECONDS``."""
+    key = _pin_key.get()
+    if key and _pinned_to_primary.get():
+        cache.set(key, True, timeout=settings.DATABASE_REPLICA_PIN_SECONDS)
+    reset()
+
+
+def pin_to_primary() -> None:
+    """Sends the remaining reads of the current request or task to the primary, e.g. before reading a new user."""
+    _pinned_to_primary.set(True)
+
+
+def reset(sender=None, **kwargs) -> None:
+    """Resets the routing state, e.g. before a Celery task runs."""
+    _pin_key.set(None)
+    _pinned_to_primary.set(False)
+
+
+class ReplicaRouter:
+    """
+    Database router sending reads to the read replicas and writes to the primary.
+
+    Reads of the models of ``DATABASE_REPLICA_APP_LABELS`` (auth, tokens, conversion statistics) are spread over
+    ``DATABASE_REPLICAS``. Once the current request or task writes a model of ``DATABASE_REPLICA_PIN_APP_LABELS``,
+    e.g. a user or a token, its remaining reads go to the primary so it reads its own writes, and so do the client's
+    requests for the next ``DATABASE_REPLICA_PIN_SECONDS``, which covers the replication lag. Counter and statistics
+    writes, made by every conversion, pin nothing. Reads within a transaction of the primary go to the primary too,
+    so the writes of a transaction, e.g. the rate changes or the compacted counters, are never computed from lagging
+    data. Without replicas configured, everything goes to the primary.
+    """
+
+    def db_for_read(self, model, **hints) -> Optional[str]:
+        """Returns a replica for reads of replicated apps, unless the current context is pinned to the primary."""
+        if not settings.DATABASE_REPLICAS or _pinned_to_primary.get() or connections["default"].in_atomic_block:
+            return None
+        if model._meta.app_label not in settings.DATABASE_REPLICA_APP_LABELS:
+            return None
+        return random.choice(settings.DATABASE_REPLICAS)  # NOQA: S311
+
+    def db_for_write(self, model, **hints) -> str:
+        """Returns the primary, pinning the current context to it if the client reads the model back."""
+        if model._meta.app_label in settings.DATABASE_REPLICA_PIN_APP_LABELS:
+            _pinned_to_primary.set(True)
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints) -> bool:
+        """Allows every relation, the replicas hold the same data as the primary."""
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints) -> bool:
+        """Migrates the primary only, the replicas receive its changes through replication."""
+        return db == "default"
+
+
+__all__ = ["ReplicaRouter", "finish_request", "pin_to_primary", "reset", "start_request"]
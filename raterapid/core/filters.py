@@ -0,0 +1,48 @@
+# coding=utf-8
+"""Core App Admin Filters."""
+
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.contrib import admin
+from django.core.cache import cache
+from django.db.models import Count, Sum
+
+
+class CachedFacetsFieldListFilter(admin.ChoicesFieldListFilter):
+    """
+    Choices filter that shows, next to each choice, how many rows of the whole table have that value.
+
+    The facets are computed with a single ``GROUP BY`` query and cached for ``ADMIN_FACETS_CACHE_TTL`` seconds, so
+    browsing the changelist does not aggregate the table on every page load. Set ``facet_field`` to sum that field
+    instead of counting rows.
+    """
+
+    facet_field: Optional[str] = None
+
+    def facets_key(self) -> str:
+        """Returns the cache key of the facets of the filtered field."""
+        return f"admin_facets:{self.field.model._meta.label_lower}:{self.field_path}:{self.facet_field or 'rows'}"
+
+    def get_facets(self) -> Dict[str, int]:
+        """Returns the number of rows, or the sum of ``facet_field``, per value of the filtered field."""
+        facets = cache.get(self.facets_key())
+        if facets is None:
+            aggregate = Sum(self.facet_field) if self.facet_field else Count("pk")
+            rows = self.field.model._default_manager.order_by().values(self.field_path).annotate(total=aggregate)
+            facets = {str(row[self.field_path]): row["total"] for row in rows}
+            cache.set(self.facets_key(), facets, timeout=settings.ADMIN_FACETS_CACHE_TTL)
+        return facets
+
+    def choices(self, changelist):
+        """Yields the choices of the filter, with their facet appended to their display."""
+        facets = self.get_facets()
+        lookups = {str(title): str(lookup) for lookup, title in self.field.flatchoices}
+        for choice in super().choices(changelist):
+            lookup = lookups.get(str(choice["display"]))
+            if lookup is not None:
+                choice["display"] = f"{choice['display']} ({facets.get(lookup, 0)})"
+            yield choice
+
+
+__all__ = ["CachedFacetsFieldListFilter"]
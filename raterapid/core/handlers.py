@@ -0,0 +1,61 @@
+# coding=utf-8
+"""Core App WSGI Handlers."""
+
+from contextlib import contextmanager
+from typing import Iterator, List
+
+import django
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+
+
+@contextmanager
+def middleware_setting(middleware: List[str]) -> Iterator[None]:
+    """Temporarily replaces ``settings.MIDDLEWARE``, which is where Django's handlers read their middleware from."""
+    original = settings.MIDDLEWARE
+    settings.MIDDLEWARE = middleware
+    try:
+        yield
+    finally:
+        settings.MIDDLEWARE = original
+
+
+class APIWSGIHandler(WSGIHandler):
+    """WSGI handler which runs requests through ``API_MIDDLEWARE`` instead of ``MIDDLEWARE``."""
+
+    def load_middleware(self, is_async=False):
+        """Populates the middleware lists from ``settings.API_MIDDLEWARE``."""
+        # The chain is built once, while the WSGI application is created and before any request is served.
+        with middleware_setting(settings.API_MIDDLEWARE):
+            super().load_middleware(is_async)
+
+
+class PrefixRoutedWSGIHandler:
+    """
+    WSGI application dispatching requests between two middleware pipelines by URL prefix.
+
+    Requests under ``API_URL_PREFIXES`` are token-authenticated JSON calls: they go through the short
+    ``API_MIDDLEWARE`` pipeline, skipping sessions, locale, CSRF, messages and clickjacking protection. Everything
+    else, such as the admin, keeps the full ``MIDDLEWARE`` pipeline.
+    """
+
+    def __init__(self):
+        """Initializes the PrefixRoutedWSGIHandler, building both middleware pipelines."""
+        self.api_prefixes = tuple(settings.API_URL_PREFIXES)
+        self.api_handler = APIWSGIHandler()
+        self.handler = WSGIHandler()
+
+    def __call__(self, environ, start_response):
+        """Handles a request with the pipeline matching its path."""
+        if environ.get("PATH_INFO", "").startswith(self.api_prefixes):
+            return self.api_handler(environ, start_response)
+        return self.handler(environ, start_response)
+
+
+def get_wsgi_application() -> PrefixRoutedWSGIHandler:
+    """Public interface to the project's WSGI application, replacing ``django.core.wsgi.get_wsgi_application``."""
+    django.setup(set_prefix=False)
+    return PrefixRoutedWSGIHandler()
+
+
+__all__ = ["APIWSGIHandler", "PrefixRoutedWSGIHandler", "get_wsgi_application"]
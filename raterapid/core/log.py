@@ -0,0 +1,183 @@
+# coding=utf-8
+"""Core App Log."""
+
+import atexit
+import copy
+import logging
+import queue
+import random
+import weakref
+from datetime import datetime, timezone
+from logging.config import ConvertingList
+from logging.handlers import QueueHandler, QueueListener
+from typing import List
+
+import orjson
+
+# Attributes every LogRecord has, anything else on a record was passed through ``extra``.
+RECORD_ATTRIBUTES = frozenset(logging.makeLogRecord({}).__dict__) | {"message", "asctime", "taskName"}
+
+
+class JSONFormatter(logging.Formatter):
+    """Formats each record as one JSON object per line, with the ``extra`` fields of the record as keys."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        """
+        Formats the record.
+
+        Args:
+            record (logging.LogRecord): The record to format.
+
+        Returns:
+            str: The JSON document of the record.
+        """
+        document = {
+            "time": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "process": record.process,
+            "thread": record.thread,
+        }
+        document.update((key, value) for key, value in record.__dict__.items() if key not in RECORD_ATTRIBUTES)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            document["exc_info"] = record.exc_text
+        if record.stack_info:
+            document["stack_info"] = self.formatStack(record.stack_info)
+        return orjson.dumps(document, default=str).decode()
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a random share of the records below a level, e.g. the info logs written on every request."""
+
+    def __init__(self, rate: float = 1.0, level: int = logging.WARNING):
+        """
+        Initializes the SamplingFilter.
+
+        Args:
+            rate (float): Share of the records below ``level`` that are kept, between 0 and 1.
+            level (int): Records of this level and above are always kept.
+        """
+        super().__init__()
+        self.rate = rate
+        self.level = level
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Returns True if the record is kept."""
+        return record.levelno >= self.level or random.random() < self.rate  # NOQA: S311
+
+
+class DrainingQueueListener(QueueListener):
+    """QueueListener waiting for room in a full queue to stop, so the records queued before are not lost."""
+
+    def enqueue_sentinel(self) -> None:
+        """Queues the sentinel stopping the listener thread once the records before it are handled."""
+        self.queue.put(self._sentinel)
+
+
+class QueueListenerHandler(QueueHandler):
+    """
+    Handler handing the records over to a background thread, which passes them on to the actual handlers.
+
+    Request threads only merge the arguments of a record into its message and put it on a bounded queue, the
+    formatting and the I/O of the actual handlers happen in the listener thread. Records arriving while the queue is
+    full are dropped and counted rather than blocking the request.
+    """
+
+    def __init__(self, handlers: List[logging.Handler], maxsize: int = 10000, respect_handler_level: bool = True):
+        """
+        Initializes the QueueListenerHandler and starts its listener thread.
+
+        Args:
+            handlers (List[logging.Handler]): The handlers the records are passed on to, e.g. "cfg://handlers.console".
+            maxsize (int): Number of records the queue holds before new ones are dropped.
+            respect_handler_level (bool): Whether each handler only gets the records of its level and above.
+        """
+        if isinstance(handlers, ConvertingList):
+            handlers = [handlers[index] for index in range(len(handlers))]
+        if not all(isinstance(handler, logging.Handler) for handler in handlers):
+            # dictConfig configures the handlers in the order of their names.
+            raise ValueError("The handlers must be named to sort before the QueueListenerHandler referring to them.")
+        super().__init__(queue.Queue(maxsize))
+        self.handlers = handlers
+        self.maxsize = maxsize
+        self.respect_handler_level = respect_handler_level
+        self.dropped = 0
+        self.listener = None
+        self.start()
+        _listener_handlers.add(self)
+
+    def start(self) -> None:
+        """
+        Starts a listener thread on a new queue.
+
+        Also meant for a forked process, which inherits the handler but not the listener thread of its parent.
+        """
+        self.queue = queue.Queue(self.maxsize)
+        self.listener = DrainingQueueListener(
+            self.queue, *self.handlers, respect_handler_level=self.respect_handler_level
+        )
+        self.listener.start()
+
+    def stop(self) -> None:
+        """Passes the queued records on to the handlers and stops the listener thread."""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Prepares a copy of the record for the listener thread.
+
+        The message is built now, so later changes to its arguments do not show up in the log, and the traceback is
+        rendered to text so the frames it references can be freed. Formatting is left to the actual handlers.
+        """
+        prepared = copy.copy(record)
+        prepared.message = record.getMessage()
+        prepared.msg, prepared.args = prepared.message, None
+        if record.exc_info:
+            prepared.exc_text = record.exc_text or logging.Formatter().formatException(record.exc_info)
+            prepared.exc_info = None
+        return prepared
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """Queues the record, or drops it if the queue is full."""
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self) -> None:
+        """Stops the listener thread and closes the handler."""
+        self.stop()
+        super().close()
+
+
+_listener_handlers: "weakref.WeakSet[QueueListenerHandler]" = weakref.WeakSet()
+
+
+def restart_log_listeners() -> None:
+    """Starts the listener threads again in a forked process, which only inherits the threads' handlers."""
+    for handler in list(_listener_handlers):
+        handler.start()
+
+
+def stop_log_listeners() -> None:
+    """Passes the queued records on to the handlers and stops the listener threads."""
+    for handler in list(_listener_handlers):
+        handler.stop()
+
+
+atexit.register(stop_log_listeners)
+
+__all__ = [
+    "DrainingQueueListener",
+    "JSONFormatter",
+    "QueueListenerHandler",
+    "SamplingFilter",
+    "restart_log_listeners",
+    "stop_log_listeners",
+]
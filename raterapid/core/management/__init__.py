@@ -0,0 +1 @@
+"""Core App management."""
@@ -0,0 +1,59 @@
+# coding=utf-8
+"""Core App Command : JSON renderer and parser microbenchmark."""
+
+import io
+import timeit
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from raterapid.core.parsers import ORJSONParser
+from raterapid.core.renderers import ORJSONRenderer
+
+
+class Command(BaseCommand):
+    """Compares the encode and decode cost of DRF's stdlib JSON renderer/parser and the orjson ones."""
+
+    help = "Benchmark the JSON renderers and parsers on single and batch conversion payloads."
+
+    def add_arguments(self, parser):
+        """Adds the command arguments."""
+        parser.add_argument("--number", type=int, default=2000, help="Number of calls per measurement.")
+        parser.add_argument("--repeat", type=int, default=5, help="Number of measurements, the best one is kept.")
+        parser.add_argument("--batch-size", type=int, default=500, help="Number of conversions in the batch payload.")
+
+    def measure(self, func, options) -> float:
+        """Returns the best time of ``func``, in microseconds per call."""
+        best = min(timeit.repeat(func, number=options["number"], repeat=options["repeat"]))
+        return best / options["number"] * 1_000_000
+
+    def handle(self, *args, **options):
+        """Runs the benchmark."""
+        conversion = {
+            "time_now": timezone.now(),
+            "last_updated": timezone.now(),
+            "amount": 85.42,
+            "base": "USD",
+            "target": "EUR",
+            "rate": Decimal("0.8542"),
+        }
+        payloads = {"single": conversion, "batch": [conversion] * options["batch_size"]}
+        implementations = {"stdlib": (JSONRenderer(), JSONParser()), "orjson": (ORJSONRenderer(), ORJSONParser())}
+
+        for payload_name, payload in payloads.items():
+            encoded = JSONRenderer().render(payload)
+            results = {}
+            for name, (renderer, parser) in implementations.items():
+                results[name] = (
+                    self.measure(lambda: renderer.render(payload), options),
+                    self.measure(lambda: parser.parse(io.BytesIO(encoded)), options),
+                )
+                encode, decode = results[name]
+                self.stdout.write(f"{payload_name:<7} {name:<7} encode {encode:10.2f} us  decode {decode:10.2f} us")
+            self.stdout.write(
+                f"{payload_name:<7} speedup encode {results['stdlib'][0] / results['orjson'][0]:9.2f}x  "
+                f"decode {results['stdlib'][1] / results['orjson'][1]:9.2f}x"
+            )
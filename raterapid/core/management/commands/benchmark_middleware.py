@@ -0,0 +1,40 @@
+# coding=utf-8
+"""Core App Command : Middleware pipeline microbenchmark."""
+
+import timeit
+from wsgiref.util import setup_testing_defaults
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+
+from raterapid.core.handlers import APIWSGIHandler
+
+
+class Command(BaseCommand):
+    """Compares the per-request overhead of the full and the API middleware pipelines."""
+
+    help = "Benchmark an API request through the full MIDDLEWARE pipeline and through API_MIDDLEWARE."
+
+    def add_arguments(self, parser):
+        """Adds the command arguments."""
+        parser.add_argument("--path", default="/rate/conversion/", help="Path of the API request.")
+        parser.add_argument("--number", type=int, default=2000, help="Number of requests per measurement.")
+        parser.add_argument("--repeat", type=int, default=5, help="Number of measurements, the best one is kept.")
+
+    def handle(self, *args, **options):
+        """Runs the benchmark."""
+
+        def start_response(status, headers):
+            pass
+
+        def call(handler):
+            environ = {"PATH_INFO": options["path"], "REQUEST_METHOD": "POST", "HTTP_HOST": "localhost"}
+            setup_testing_defaults(environ)
+            return handler(environ, start_response)
+
+        results = {}
+        for name, handler in (("full", WSGIHandler()), ("api", APIWSGIHandler())):
+            best = min(timeit.repeat(lambda: call(handler), number=options["number"], repeat=options["repeat"]))
+            results[name] = best / options["number"] * 1_000_000
+            self.stdout.write(f"{name:<6} {results[name]:8.2f} us/request")
+        self.stdout.write(f"saved  {results['full'] - results['api']:8.2f} us/request")
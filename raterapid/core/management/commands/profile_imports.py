@@ -0,0 +1,51 @@
+# coding=utf-8
+"""Core App Command : Import-time profile of the process start-up."""
+
+import subprocess
+
+from django.core.management.base import BaseCommand, CommandError
+
+from raterapid.core.startup import COLD_START_TARGETS, cold_start_budget, measure_cold_start
+
+
+class Command(BaseCommand):
+    """Profiles the imports made by a cold start of the web app or of a Celery worker."""
+
+    help = "Time a cold start of each process kind against its budget and list the slowest imports."
+
+    def add_arguments(self, parser):
+        """Adds the command arguments."""
+        parser.add_argument(
+            "targets", nargs="*", help=f"Process kinds to profile among {', '.join(COLD_START_TARGETS)}, default all."
+        )
+        parser.add_argument("--top", type=int, default=20, help="Number of imports listed per process kind.")
+        parser.add_argument(
+            "--sort", choices=["cumulative", "self"], default="cumulative", help="Time the imports are ranked by."
+        )
+        parser.add_argument("--repeat", type=int, default=3, help="Number of cold starts, the fastest one is kept.")
+        parser.add_argument("--check", action="store_true", help="Fail if a cold start is over its budget.")
+
+    def handle(self, *args, **options):
+        """Runs the profile."""
+        unknown = set(options["targets"]) - set(COLD_START_TARGETS)
+        if unknown:
+            raise CommandError(f"Unknown process kinds: {', '.join(sorted(unknown))}")
+        over_budget = []
+        for target in options["targets"] or COLD_START_TARGETS:
+            try:
+                elapsed, imports = measure_cold_start(target, repeat=options["repeat"])
+            except subprocess.CalledProcessError as exc:
+                raise CommandError(f"Cold start of {target} failed:\n{exc.stderr}") from exc
+            budget = cold_start_budget(target)
+            if elapsed > budget:
+                over_budget.append(target)
+            self.stdout.write(
+                f"{target}: {elapsed * 1000:.0f} ms, budget {budget * 1000:.0f} ms, {len(imports)} modules imported"
+            )
+            key = "cumulative_us" if options["sort"] == "cumulative" else "self_us"
+            for imported in sorted(imports, key=lambda row: getattr(row, key), reverse=True)[: options["top"]]:
+                self.stdout.write(
+                    f"  {imported.cumulative_us / 1000:8.1f} ms {imported.self_us / 1000:8.1f} ms  {imported.module}"
+                )
+        if options["check"] and over_budget:
+            raise CommandError(f"Cold start over budget: {', '.join(over_budget)}")
@@ -1,6 +1,7 @@
 # coding=utf-8
 """Core App Models."""
 
+from django.conf import settings
 from django.db import models
 
 
@@ -14,3 +15,30 @@ class TimeStampedModel(models.Model):
         """Meta class."""
 
         abstract = True
+
+
+class RequestProfile(models.Model):
+    """
+    Model holding the time breakdown of one profiled request.
+
+    Written by ``RequestProfilingMiddleware`` for a sample of the requests and for the staff requests asking for it.
+    ``phases`` maps each phase, e.g. "provider" or "db", to the milliseconds spent in it and the number of passes.
+    """
+
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Created At")
+    method = models.CharField(max_length=8)
+    path = models.CharField(max_length=255)
+    status_code = models.PositiveSmallIntegerField(verbose_name="Status Code")
+    duration_ms = models.FloatField(verbose_name="Duration (ms)")
+    phases = models.JSONField(default=dict)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL, related_name="+"
+    )
+
+    class Meta:
+        """Meta Class."""
+
+        ordering = ["-created_at"]
+        indexes = [models.Index(fields=["-created_at"]), models.Index(fields=["path", "-created_at"])]
+        verbose_name = "Request Profile"
+        verbose_name_plural = "Request Profiles"
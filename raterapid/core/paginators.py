@@ -0,0 +1,49 @@
+# coding=utf-8
+"""Core App Paginators."""
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+
+def estimated_row_count(queryset: QuerySet) -> int:
+    """
+    Returns the planner's estimate of the number of rows in the table of the queryset, or -1 if unknown.
+
+    The estimate is read from PostgreSQL's ``pg_class.reltuples``, kept up to date by ``ANALYZE`` and autovacuum;
+    other databases have no such statistic.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return -1
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [queryset.model._meta.db_table]
+        )
+        row = cursor.fetchone()
+    return row[0] if row else -1
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that estimates the number of rows of large unfiltered tables instead of counting them.
+
+    ``COUNT(*)`` scans the whole table on PostgreSQL, which gets slow once a table holds millions of rows. When the
+    queryset is not filtered and the estimated number of rows is at least ``ADMIN_ESTIMATED_COUNT_THRESHOLD``, the
+    estimate is used as the count; the last pages may then be empty or missing. Filtered querysets, small tables and
+    other databases are counted exactly.
+    """
+
+    @cached_property
+    def count(self) -> int:
+        """Returns the total number of objects, across all pages."""
+        if isinstance(self.object_list, QuerySet) and not self.object_list.query.where:
+            estimate = estimated_row_count(self.object_list)
+            if estimate >= settings.ADMIN_ESTIMATED_COUNT_THRESHOLD:
+                return estimate
+        return super().count
+
+
+__all__ = ["EstimatedCountPaginator", "estimated_row_count"]
@@ -0,0 +1,49 @@
+# coding=utf-8
+"""Core App Process."""
+
+from django.core.cache import caches
+from django.db import connections
+
+
+def close_connections() -> None:
+    """
+    Closes the database and cache connections of the current process.
+
+    Meant to run in a preloading server's master before it forks a worker, so the worker never inherits a socket
+    that another process is using.
+    """
+    connections.close_all()
+    for cache in caches.all(initialized_only=True):
+        cache.close()
+
+
+def reset_after_fork() -> None:
+    """
+    Resets the process-local state a worker inherited from the master it was forked from.
+
+    Drops the currency API sessions, the offline snapshot map and the buffered conversion counters, so each worker
+    opens its own connections and files on first use and only flushes the counts it made itself, and starts the
+    logging and counter flushing threads the worker did not inherit.
+    """
+    from raterapid.core.log import restart_log_listeners
+    from raterapid.rate.counters import conversion_counters
+    from raterapid.utils.currency_clients import reset_clients
+    from raterapid.utils.offline_snapshot import offline_snapshot
+
+    reset_clients()
+    offline_snapshot.close()
+    conversion_counters.reset()
+    conversion_counters.start()
+    restart_log_listeners()
+
+
+def flush_before_exit() -> None:
+    """Flushes the state buffered by the current process before it exits."""
+    from raterapid.core.log import stop_log_listeners
+    from raterapid.rate.counters import conversion_counters
+
+    conversion_counters.flush()
+    stop_log_listeners()
+
+
+__all__ = ["close_connections", "flush_before_exit", "reset_after_fork"]
@@ -0,0 +1,148 @@
+# coding=utf-8
+"""Core App Request Profiling."""
+
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+from django.conf import settings
+from django.db import DatabaseError
+
+logger = logging.getLogger(__name__)
+
+# Header asking for the request to be profiled. It is only honoured for staff users.
+PROFILE_HEADER = "X-Profile-Request"
+
+
+class RequestProfile:
+    """Time spent by one request in each of its phases, e.g. "auth", "serializer", "provider", "cache" or "db"."""
+
+    def __init__(self):
+        """Initializes a RequestProfile starting now."""
+        self.started_at = time.perf_counter()
+        self.duration = 0.0
+        self.phases: Dict[str, Dict[str, float]] = {}
+
+    def add(self, phase: str, elapsed: float) -> None:
+        """
+        Adds the time of one pass through a phase.
+
+        Args:
+            phase (str): The name of the phase.
+            elapsed (float): The time spent in it, in seconds.
+        """
+        totals = self.phases.setdefault(phase, {"ms": 0.0, "calls": 0})
+        totals["ms"] += elapsed * 1000
+        totals["calls"] += 1
+
+    def finish(self) -> None:
+        """Stops the clock, booking the time spent outside of every phase as "other"."""
+        self.duration = time.perf_counter() - self.started_at
+        tracked = sum(totals["ms"] for totals in self.phases.values())
+        self.phases["other"] = {"ms": max(self.duration * 1000 - tracked, 0.0), "calls": 1}
+
+    def server_timing(self) -> str:
+        """Returns the phases as the value of a ``Server-Timing`` header."""
+        return ", ".join(f"{phase};dur={totals['ms']:.2f}" for phase, totals in self.phases.items())
+
+
+# Profile of the current request, None unless the request is profiled.
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("current_profile", default=None)
+
+
+@contextmanager
+def profile_phase(phase: str) -> Iterator[None]:
+    """
+    Books the time spent in the block to a phase of the current request's profile.
+
+    Costs a context variable lookup when the request is not profiled. Phases are not meant to be nested, the time of
+    a nested phase would be booked twice.
+
+    Args:
+        phase (str): The name of the phase.
+    """
+    profile = _current_profile.get()
+    if profile is None:
+        yield
+        return
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add(phase, time.perf_counter() - started_at)
+
+
+class RequestProfilingMiddleware:
+    """
+    Middleware profiling a sample of the requests, and the requests of staff users asking for it.
+
+    ``REQUEST_PROFILE_SAMPLE_RATE`` of the requests are profiled at random. A request with the ``X-Profile-Request``
+    header is profiled too, and if it was authenticated as a staff user, its response carries the phases in a
+    ``Server-Timing`` header and the id of the stored profile in ``X-Profile-Id``. Profiles are stored as
+    ``RequestProfile`` rows, listed in the admin.
+    """
+
+    def __init__(self, get_response):
+        """Initializes the RequestProfilingMiddleware."""
+        self.get_response = get_response
+
+    def __call__(self, request):
+        """Handles the request, profiling it if it is sampled or asks for it."""
+        requested = PROFILE_HEADER in request.headers
+        sampled = random.random() < settings.REQUEST_PROFILE_SAMPLE_RATE  # NOQA: S311
+        if not (requested or sampled):
+            return self.get_response(request)
+
+        profile = RequestProfile()
+        token = _current_profile.set(profile)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_profile.reset(token)
+        profile.finish()
+
+        # The API views authenticate the request themselves, setting its user only once they ran.
+        user = getattr(request, "user", None)
+        trusted = requested and user is not None and user.is_staff
+        if sampled or trusted:
+            stored = self.store(request, response, profile, user)
+            if trusted:
+                response["Server-Timing"] = profile.server_timing()
+                if stored is not None:
+                    response["X-Profile-Id"] = str(stored.pk)
+        return response
+
+    @staticmethod
+    def store(request, response, profile: RequestProfile, user):
+        """
+        Stores the profile of a request.
+
+        Args:
+            request (HttpRequest): The profiled request.
+            response (HttpResponse): Its response.
+            profile (RequestProfile): Its profile.
+            user (Optional[User]): The user it was authenticated as.
+
+        Returns:
+            Optional[models.RequestProfile]: The stored profile, or None if it could not be stored.
+        """
+        from .models import RequestProfile as StoredProfile
+
+        try:
+            return StoredProfile.objects.create(
+                method=request.method,
+                path=request.path[:255],
+                status_code=response.status_code,
+                duration_ms=profile.duration * 1000,
+                phases=profile.phases,
+                user=user if user is not None and user.is_authenticated else None,
+            )
+        except DatabaseError as db_err:
+            logger.error("Dropped the profile of %s %s: %s", request.method, request.path, db_err)
+            return None
+
+
+__all__ = ["PROFILE_HEADER", "RequestProfile", "RequestProfilingMiddleware", "profile_phase"]
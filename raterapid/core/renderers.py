@@ -0,0 +1,47 @@
+# coding=utf-8
+"""Core App Renderers."""
+
+import orjson
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class ORJSONRenderer(BaseRenderer):
+    """
+    Renderer which serializes to JSON with orjson.
+
+    The output matches DRF's ``JSONRenderer`` with its default compact and unicode settings: datetimes are rendered
+    in ISO 8601 with UTC as ``Z``, and every type orjson does not support natively (``Decimal`` amounts, lazy
+    translations, querysets...) is handed to DRF's own ``JSONEncoder``.
+    """
+
+    media_type = "application/json"
+    format = "json"
+    charset = None
+    options = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+    default = JSONEncoder().default
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Render ``data`` into JSON, returning a bytestring."""
+        if data is None:
+            return b""
+
+        options = self.options
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            options |= orjson.OPT_INDENT_2
+
+        ret = orjson.dumps(data, default=self.default, option=options)
+        # Like DRF, escape the line separators that are valid JSON but not valid JavaScript.
+        if b"\xe2\x80" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
+
+    @staticmethod
+    def get_indent(accepted_media_type, renderer_context) -> bool:
+        """Returns True if the client asked for an indented output, e.g. with ``Accept: application/json; indent=4``."""
+        if accepted_media_type and "indent=" in accepted_media_type:
+            return True
+        return bool(renderer_context.get("indent"))
+
+
+__all__ = ["ORJSONRenderer"]
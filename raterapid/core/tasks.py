@@ -0,0 +1,18 @@
+"""Core App Task."""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from config.celery_app import app
+
+from .models import RequestProfile
+
+
+@app.task
+def prune_request_profiles():
+    """Deletes the request profiles older than ``REQUEST_PROFILE_RETENTION_DAYS`` days."""
+    cutoff = timezone.now() - timedelta(days=settings.REQUEST_PROFILE_RETENTION_DAYS)
+    deleted, _ = RequestProfile.objects.filter(created_at__lt=cutoff).delete()
+    return (True, f"Deleted {deleted} Request Profiles")
@@ -0,0 +1,128 @@
+"""Test suite for the database router."""
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import RequestFactory, SimpleTestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.connection import ConnectionDoesNotExist
+from django_celery_beat.models import PeriodicTask
+from rest_framework.authtoken.models import Token
+
+from raterapid.rate.counters import rollup_buckets
+from raterapid.rate.history import latest_snapshot, record_rates
+from raterapid.rate.models import BucketGranularity, ConversionCounterBucket, CurrencyConversion
+from raterapid.users.views import LoginView
+
+from .. import db_router
+from ..db_router import ReplicaRouter
+
+
+@override_settings(
+    DATABASE_REPLICAS=["replica_0"],
+    DATABASE_REPLICA_APP_LABELS=["auth", "rate"],
+    DATABASE_REPLICA_PIN_APP_LABELS=["auth"],
+)
+class ReplicaRouterTestCase(SimpleTestCase):
+    """Test suite for ReplicaRouter."""
+
+    environ = {"HTTP_AUTHORIZATION": "Token 1234"}
+
+    def setUp(self):
+        """Set Up Method."""
+        cache.clear()
+        self.router = ReplicaRouter()
+        db_router.start_request(None, environ=self.environ)
+
+    def tearDown(self):
+        """Tear Down Method."""
+        db_router.reset()
+
+    def test_reads_go_to_replicas(self):
+        """Test reads of the replicated apps go to a replica, and writes to the primary."""
+        self.assertEqual(self.router.db_for_read(User), "replica_0")
+        self.assertEqual(self.router.db_for_read(CurrencyConversion), "replica_0")
+        self.assertIsNone(self.router.db_for_read(PeriodicTask))
+
+    def test_read_your_writes(self):
+        """Test reads after a write go to the primary, for the rest of the request and the client's next requests."""
+        self.assertEqual(self.router.db_for_write(User), "default")
+        self.assertIsNone(self.router.db_for_read(User))
+        db_router.finish_request(None)
+
+        db_router.start_request(None, environ=self.environ)
+        self.assertIsNone(self.router.db_for_read(User))
+
+        db_router.start_request(None, environ={"HTTP_AUTHORIZATION": "Token 5678"})
+        self.assertEqual(self.router.db_for_read(User), "replica_0")
+
+    def test_counter_writes_do_not_pin(self):
+        """Test the counter writes of a conversion leave the client's reads, e.g. its token lookup, on the replicas."""
+        self.assertEqual(self.router.db_for_write(CurrencyConversion), "default")
+        self.assertEqual(self.router.db_for_write(ConversionCounterBucket), "default")
+        db_router.finish_request(None)
+
+        db_router.start_request(None, environ=self.environ)
+        self.assertEqual(self.router.db_for_read(User), "replica_0")
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas(self):
+        """Test everything goes to the primary when no replica is configured."""
+        self.assertIsNone(self.router.db_for_read(User))
+
+    def test_migrate_primary_only(self):
+        """Test only the primary is migrated."""
+        self.assertTrue(self.router.allow_migrate("default", "rate"))
+        self.assertFalse(self.router.allow_migrate("replica_0", "rate"))
+
+
+# "replica_0" is not a configured database here, so any read routed to it fails.
+@override_settings(DATABASE_REPLICAS=["replica_0"], DATABASE_REPLICA_APP_LABELS=["auth", "authtoken", "rate"])
+class ReplicaRouterWritePathTestCase(TransactionTestCase):
+    """Test suite for the reads of the write paths, which must see the primary."""
+
+    def setUp(self):
+        """Set Up Method."""
+        cache.clear()
+        db_router.reset()
+        self.addCleanup(db_router.reset)
+
+    def test_reads_outside_transactions_go_to_replicas(self):
+        """Test the plain reads of a task go to a replica."""
+        with self.assertRaises(ConnectionDoesNotExist):
+            latest_snapshot(timezone.now())
+
+    def test_record_rates_reads_primary(self):
+        """Test the rate changes are computed from the rates on the primary."""
+        record_rates({"USD": 1.0, "EUR": 0.9}, timezone.now() - timedelta(minutes=5))
+        db_router.reset()
+
+        self.assertEqual(record_rates({"USD": 1.0, "EUR": 0.91}), (False, 1))
+
+    def test_compaction_reads_primary(self):
+        """Test the compacted counters are summed from the buckets on the primary."""
+        bucket_start = timezone.now().replace(minute=0, second=0, microsecond=0) - timedelta(hours=1)
+        for _ in range(3):
+            ConversionCounterBucket.objects.create(
+                from_currency="USD",
+                to_currency="EUR",
+                granularity=BucketGranularity.HOUR,
+                bucket_start=bucket_start,
+                count=1,
+            )
+        db_router.reset()
+
+        self.assertEqual(rollup_buckets()[0], 2)
+
+    def test_login_reads_primary(self):
+        """Test a token request, typically right after the signup, finds the new user on the primary."""
+        user = User.objects.create_user(username="new", password="secret")  # NOQA: S106
+        token = Token.objects.create(user=user)
+        db_router.reset()
+        request = RequestFactory().post(reverse("users:login"), HTTP_AUTHORIZATION="Basic bmV3OnNlY3JldA==")
+
+        response = LoginView.as_view()(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["token"], token.key)
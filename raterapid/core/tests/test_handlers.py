@@ -0,0 +1,47 @@
+"""Test suite for WSGI handlers."""
+from unittest.mock import MagicMock
+
+from django.conf import settings
+from django.middleware.csrf import CsrfViewMiddleware
+from django.test import SimpleTestCase, override_settings
+
+from ..handlers import APIWSGIHandler, PrefixRoutedWSGIHandler
+
+
+@override_settings(API_URL_PREFIXES=["/rate/", "/auth/"])
+class PrefixRoutedWSGIHandlerTestCase(SimpleTestCase):
+    """Test suite for PrefixRoutedWSGIHandler."""
+
+    def setUp(self):
+        """Set Up Method."""
+        self.application = PrefixRoutedWSGIHandler()
+        self.application.api_handler = MagicMock()
+        self.application.handler = MagicMock()
+
+    def test_api_prefix_uses_api_pipeline(self):
+        """Test API requests go through the API pipeline."""
+        self.application({"PATH_INFO": "/rate/conversion/"}, None)
+
+        self.application.api_handler.assert_called_once()
+        self.application.handler.assert_not_called()
+
+    def test_other_paths_use_full_pipeline(self):
+        """Test other requests, such as the admin, go through the full pipeline."""
+        self.application({"PATH_INFO": f"/{settings.ADMIN_URL}"}, None)
+
+        self.application.handler.assert_called_once()
+        self.application.api_handler.assert_not_called()
+
+
+class APIWSGIHandlerTestCase(SimpleTestCase):
+    """Test suite for APIWSGIHandler."""
+
+    def test_api_middleware(self):
+        """Test the API pipeline is built from API_MIDDLEWARE and leaves MIDDLEWARE untouched."""
+        middleware = list(settings.MIDDLEWARE)
+
+        handler = APIWSGIHandler()
+
+        view_middleware = [method.__self__ for method in handler._view_middleware]
+        self.assertFalse(any(isinstance(instance, CsrfViewMiddleware) for instance in view_middleware))
+        self.assertEqual(settings.MIDDLEWARE, middleware)
@@ -0,0 +1,105 @@
+"""Test suite for the logging pipeline."""
+import logging
+import sys
+import threading
+
+import orjson
+from django.test import SimpleTestCase
+
+from ..log import JSONFormatter, QueueListenerHandler, SamplingFilter
+
+
+class RecordingHandler(logging.Handler):
+    """Handler keeping the records it handles, and the threads it handles them in."""
+
+    def __init__(self):
+        """Initializes an empty RecordingHandler."""
+        super().__init__()
+        self.records = []
+        self.threads = set()
+
+    def emit(self, record):
+        """Keeps the record."""
+        self.records.append(record)
+        self.threads.add(threading.get_ident())
+
+
+def make_record(level=logging.INFO, msg="Converted %s %s to %s.", args=(10, "USD", "EUR"), **extra):
+    """Creates a record of the logger of the conversion views."""
+    record = logging.LogRecord("raterapid.rate.views", level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+class JSONFormatterTestCase(SimpleTestCase):
+    """Test suite for the JSON formatter."""
+
+    def test_format(self):
+        """Test a record is formatted as one JSON document, with its message, level and extra fields."""
+        document = orjson.loads(JSONFormatter().format(make_record(request_id="abc")))
+
+        self.assertEqual(document["message"], "Converted 10 USD to EUR.")
+        self.assertEqual(document["level"], "INFO")
+        self.assertEqual(document["logger"], "raterapid.rate.views")
+        self.assertEqual(document["request_id"], "abc")
+        self.assertNotIn("args", document)
+
+    def test_format_exception(self):
+        """Test the traceback of a record is included."""
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = logging.LogRecord("test", logging.ERROR, __file__, 1, "Failed", (), sys.exc_info())
+
+        document = orjson.loads(JSONFormatter().format(record))
+
+        self.assertIn("ValueError: boom", document["exc_info"])
+
+
+class SamplingFilterTestCase(SimpleTestCase):
+    """Test suite for the sampling of the per-request logs."""
+
+    def test_rate(self):
+        """Test records below the level are kept at the rate, and records at or above it always are."""
+        self.assertFalse(SamplingFilter(rate=0.0).filter(make_record(logging.INFO)))
+        self.assertTrue(SamplingFilter(rate=1.0).filter(make_record(logging.INFO)))
+        self.assertTrue(SamplingFilter(rate=0.0).filter(make_record(logging.WARNING)))
+
+
+class QueueListenerHandlerTestCase(SimpleTestCase):
+    """Test suite for the handler writing logs from a background thread."""
+
+    def setUp(self):
+        """Set Up Method."""
+        self.target = RecordingHandler()
+        self.handler = QueueListenerHandler([self.target], maxsize=2)
+        self.addCleanup(self.handler.close)
+
+    def test_records_are_handled_in_the_listener_thread(self):
+        """Test the records reach the actual handler from another thread, with their message already built."""
+        rates = {"EUR": 0.9}
+        self.handler.handle(make_record(msg="Rates %s", args=(rates,)))
+        rates["EUR"] = 0.8
+        self.handler.stop()
+
+        self.assertEqual([record.getMessage() for record in self.target.records], ["Rates {'EUR': 0.9}"])
+        self.assertNotIn(threading.get_ident(), self.target.threads)
+
+    def test_records_are_dropped_when_the_queue_is_full(self):
+        """Test records arriving while the queue is full are counted and dropped rather than waited on."""
+        self.handler.stop()
+        self.handler.handle(make_record())
+        self.handler.handle(make_record())
+        self.handler.handle(make_record())
+
+        self.assertEqual(self.handler.dropped, 1)
+
+    def test_start_uses_a_new_queue(self):
+        """Test starting the listener again, as a forked process does, drains a new queue."""
+        self.handler.stop()
+        self.handler.handle(make_record())
+        self.handler.start()
+        self.handler.handle(make_record())
+        self.handler.stop()
+
+        self.assertEqual(len(self.target.records), 1)
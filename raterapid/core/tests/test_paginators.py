@@ -0,0 +1,36 @@
+"""Test suite for paginators."""
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from ..paginators import EstimatedCountPaginator, estimated_row_count
+
+
+@override_settings(ADMIN_ESTIMATED_COUNT_THRESHOLD=1000)
+class EstimatedCountPaginatorTestCase(TestCase):
+    """Test suite for EstimatedCountPaginator."""
+
+    def setUp(self):
+        """Set Up Method."""
+        self.users = get_user_model().objects.order_by("pk")
+
+    def test_no_estimate_without_postgresql(self):
+        """Test the row count is not estimated on databases without table statistics."""
+        self.assertEqual(estimated_row_count(self.users), -1)
+
+    @patch("raterapid.core.paginators.estimated_row_count", return_value=5000)
+    def test_estimates_large_unfiltered_tables(self, mock_estimate):
+        """Test the estimate is used for unfiltered querysets over large tables."""
+        self.assertEqual(EstimatedCountPaginator(self.users, 100).count, 5000)
+
+    @patch("raterapid.core.paginators.estimated_row_count", return_value=5000)
+    def test_counts_filtered_querysets(self, mock_estimate):
+        """Test filtered querysets are counted exactly."""
+        self.assertEqual(EstimatedCountPaginator(self.users.filter(is_staff=True), 100).count, 0)
+        mock_estimate.assert_not_called()
+
+    @patch("raterapid.core.paginators.estimated_row_count", return_value=10)
+    def test_counts_small_tables(self, mock_estimate):
+        """Test tables below ADMIN_ESTIMATED_COUNT_THRESHOLD are counted exactly."""
+        self.assertEqual(EstimatedCountPaginator(self.users, 100).count, 0)
@@ -0,0 +1,48 @@
+"""Test suite for the process lifecycle hooks."""
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from raterapid.rate.counters import conversion_counters
+from raterapid.rate.models import ConversionCounterBucket
+from raterapid.utils.currency_clients import exchangerate_client
+
+from ..process import flush_before_exit, reset_after_fork
+
+
+@override_settings(CONVERSION_COUNTER_FLUSH_SIZE=100, CONVERSION_COUNTER_FLUSH_INTERVAL=3600)
+class ProcessHooksTestCase(TestCase):
+    """Test suite for the hooks run around worker forks."""
+
+    def setUp(self):
+        """Set Up Method."""
+        conversion_counters.reset()
+        self.addCleanup(conversion_counters.stop)
+
+    def test_client_sessions_are_per_process(self):
+        """Test a client reuses its session, and opens a new one after a fork or a reset."""
+        session = exchangerate_client.session
+        self.assertIs(exchangerate_client.session, session)
+
+        with patch("raterapid.utils.currency_clients.os.getpid", return_value=-1):
+            self.assertIsNot(exchangerate_client.session, session)
+
+        reset_after_fork()
+        self.assertIsNone(exchangerate_client._session)
+
+    def test_reset_after_fork_drops_inherited_counts(self):
+        """Test increments buffered before the fork are dropped, so only the parent flushes them."""
+        conversion_counters.add("USD", "EUR")
+
+        reset_after_fork()
+        flush_before_exit()
+
+        self.assertFalse(ConversionCounterBucket.objects.exists())
+
+    def test_flush_before_exit(self):
+        """Test the buffered increments are flushed before the worker exits."""
+        conversion_counters.add("USD", "EUR")
+
+        flush_before_exit()
+
+        self.assertEqual(ConversionCounterBucket.objects.get().count, 1)
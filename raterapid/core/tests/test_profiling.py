@@ -0,0 +1,93 @@
+"""Test suite for the request profiling."""
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from raterapid.rate.counters import conversion_counters
+from raterapid.rate.views import CurrencyConversionView
+
+from ..models import RequestProfile
+from ..profiling import PROFILE_HEADER, RequestProfilingMiddleware, _current_profile, profile_phase
+
+
+def convert_from_provider(base, target, amount, deadline=None):
+    """Stands for a conversion answered by a provider."""
+    with profile_phase("provider"):
+        return True, 90.0, timezone.now()
+
+
+@patch("raterapid.rate.views.pair_conversion", convert_from_provider)
+@override_settings(CONVERSION_COUNTER_FLUSH_SIZE=100, CONVERSION_COUNTER_FLUSH_INTERVAL=3600)
+class RequestProfilingMiddlewareTestCase(TestCase):
+    """Test suite for RequestProfilingMiddleware."""
+
+    def setUp(self):
+        """Set Up Method."""
+        cache.clear()
+        conversion_counters.reset()
+        self.factory = RequestFactory()
+        self.user = User.objects.create_user(username="test", password="test")  # NOQA: S106
+        self.token = Token.objects.create(user=self.user)
+        self.middleware = RequestProfilingMiddleware(CurrencyConversionView.as_view())
+
+    def convert(self, **headers):
+        """Sends a conversion request through the middleware."""
+        request = self.factory.post(
+            reverse("rate:conversion"),
+            {"from_currency": "USD", "to_currency": "EUR", "amount": 100},
+            HTTP_AUTHORIZATION=f"Token {self.token.key}",
+            **headers,
+        )
+        return self.middleware(request)
+
+    @override_settings(REQUEST_PROFILE_SAMPLE_RATE=1.0)
+    def test_sampled_request_is_stored(self):
+        """Test a sampled request is stored with the time of each phase, without exposing it in the response."""
+        response = self.convert()
+
+        self.assertEqual(response.status_code, 200)
+        profile = RequestProfile.objects.get()
+        self.assertEqual((profile.method, profile.path, profile.status_code), ("POST", "/rate/conversion/", 200))
+        self.assertEqual(profile.user, self.user)
+        self.assertEqual(set(profile.phases), {"auth", "serializer", "cache", "provider", "db", "other"})
+        self.assertEqual(profile.phases["serializer"]["calls"], 2)
+        self.assertAlmostEqual(sum(phase["ms"] for phase in profile.phases.values()), profile.duration_ms, places=3)
+        self.assertNotIn("Server-Timing", response)
+
+    @override_settings(REQUEST_PROFILE_SAMPLE_RATE=0.0)
+    def test_unsampled_request_is_not_profiled(self):
+        """Test a request neither sampled nor asking for a profile is not profiled."""
+        self.convert()
+
+        self.assertFalse(RequestProfile.objects.exists())
+
+    @override_settings(REQUEST_PROFILE_SAMPLE_RATE=0.0)
+    def test_header_is_honoured_for_staff_only(self):
+        """Test the profile header is ignored for regular users, and answered with the profile for staff users."""
+        self.convert(**{f"HTTP_{PROFILE_HEADER.upper().replace('-', '_')}": "1"})
+        self.assertFalse(RequestProfile.objects.exists())
+
+        self.user.is_staff = True
+        self.user.save()
+        response = self.convert(**{f"HTTP_{PROFILE_HEADER.upper().replace('-', '_')}": "1"})
+
+        profile = RequestProfile.objects.get()
+        self.assertEqual(response["X-Profile-Id"], str(profile.pk))
+        self.assertIn("provider;dur=", response["Server-Timing"])
+
+
+class ProfilePhaseTestCase(TestCase):
+    """Test suite for profile_phase."""
+
+    def test_unprofiled_block(self):
+        """Test a phase outside of a profiled request only runs its block."""
+        with profile_phase("db"):
+            ran = True
+
+        self.assertTrue(ran)
+        self.assertIsNone(_current_profile.get())
@@ -0,0 +1,57 @@
+"""Test suite for renderers and parsers."""
+import io
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ErrorDetail, ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from ..parsers import ORJSONParser
+from ..renderers import ORJSONRenderer
+
+
+class ORJSONRendererTestCase(SimpleTestCase):
+    """Test suite for ORJSONRenderer."""
+
+    def test_matches_drf_renderer(self):
+        """Test the output is the same as DRF's JSONRenderer."""
+        data = {
+            "last_updated": datetime(2023, 6, 30, 10, 0, 0, 123456, tzinfo=timezone.utc),
+            "amount": Decimal("85.42"),
+            "base": "USD",
+            "errors": [ErrorDetail("This field is required.", code="required"), gettext_lazy("Currency")],
+            "id": uuid.UUID(int=1),
+            1: "non string key",
+            "separator": "\u2028",
+        }
+
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_indent(self):
+        """Test the output is indented when the client asks for it."""
+        rendered = ORJSONRenderer().render({"base": "USD"}, "application/json; indent=4")
+
+        self.assertIn(b"\n", rendered)
+
+    def test_none(self):
+        """Test None renders as an empty body."""
+        self.assertEqual(ORJSONRenderer().render(None), b"")
+
+
+class ORJSONParserTestCase(SimpleTestCase):
+    """Test suite for ORJSONParser."""
+
+    def test_matches_drf_parser(self):
+        """Test the parsed data is the same as DRF's JSONParser."""
+        body = b'{"from_currency": "USD", "to_currency": "EUR", "amount": 100.5, "tags": ["a", null]}'
+
+        self.assertEqual(ORJSONParser().parse(io.BytesIO(body)), JSONParser().parse(io.BytesIO(body)))
+
+    def test_invalid_json(self):
+        """Test malformed JSON raises a ParseError."""
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"amount": NaN}'))
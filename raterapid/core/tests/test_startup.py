@@ -0,0 +1,74 @@
+"""Test suite for the process start-up."""
+import subprocess
+import sys
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from ..startup import ImportTime, cold_start_budget, measure_cold_start, parse_importtime
+
+
+class ColdStartTestCase(SimpleTestCase):
+    """Test suite for the cold start budgets of the web app and the Celery worker."""
+
+    def assertWithinBudget(self, target):
+        """Asserts the fastest of two cold starts of the target is within its budget."""
+        elapsed, imports = measure_cold_start(target, repeat=2)
+        slowest = sorted(imports, key=lambda row: row.cumulative_us, reverse=True)[:10]
+        self.assertLessEqual(
+            elapsed,
+            cold_start_budget(target),
+            "Slowest imports: " + ", ".join(f"{row.module} {row.cumulative_us / 1000:.0f} ms" for row in slowest),
+        )
+
+    def test_wsgi_cold_start_within_budget(self):
+        """Test a web process loads the WSGI app within COLD_START_BUDGET_WSGI_MS."""
+        self.assertWithinBudget("wsgi")
+
+    def test_celery_cold_start_within_budget(self):
+        """Test a worker loads the Celery app and its tasks within COLD_START_BUDGET_CELERY_MS."""
+        self.assertWithinBudget("celery")
+
+    def test_web_process_uses_the_configured_celery_app(self):
+        """Test the web app makes the project's Celery app current, for the tasks it sends and the beat admin."""
+        code = (
+            "import config.wsgi; from celery import current_app; current_app.loader.import_default_modules(); "
+            "print(current_app.main, 'raterapid.rate.tasks.cache_api_rates' in current_app.tasks)"
+        )
+        completed = subprocess.run(  # NOQA: S603
+            [sys.executable, "-c", code], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True
+        )
+        self.assertEqual(completed.stdout.split(), ["raterapid", "True"])
+
+    def test_celery_app_defers_beat_schedule(self):
+        """Test the beat schedule is only built once the Celery configuration is read."""
+        code = (
+            "import sys; from config.celery_app import app; "
+            "print('raterapid.rate.celery_config' in sys.modules, sorted(app.conf.beat_schedule))"
+        )
+        completed = subprocess.run(  # NOQA: S603
+            [sys.executable, "-c", code], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True
+        )
+        self.assertTrue(completed.stdout.startswith("False ['schedule-cache_api_rates',"))
+
+    def test_parse_importtime(self):
+        """Test the importtime report is parsed into per-module rows, skipping its header."""
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |     orjson\n"
+            "import time:       300 |        420 |   raterapid.core.renderers\n"
+            "Traceback is not an import line\n"
+        )
+        self.assertEqual(
+            parse_importtime(output),
+            [ImportTime("orjson", 120, 120, 2), ImportTime("raterapid.core.renderers", 300, 420, 1)],
+        )
+
+    def test_beat_schedule_covers_every_app(self):
+        """Test the beat schedule holds the entries of the core app next to those of the rate app."""
+        code = "from config.celery_app import app; print(sorted(app.conf.beat_schedule))"
+        completed = subprocess.run(  # NOQA: S603
+            [sys.executable, "-c", code], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True
+        )
+        self.assertIn("'schedule-prune_request_profiles'", completed.stdout)
+        self.assertIn("'schedule-rollup_conversion_counters'", completed.stdout)
@@ -0,0 +1,30 @@
+"""Test suite for the core tasks."""
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from ..models import RequestProfile
+from ..tasks import prune_request_profiles
+
+
+def create_profile(age):
+    """Creates a request profile stored the given time ago."""
+    profile = RequestProfile.objects.create(method="POST", path="/conversion/", status_code=200, duration_ms=12.5)
+    RequestProfile.objects.filter(pk=profile.pk).update(created_at=timezone.now() - age)
+    return profile
+
+
+@override_settings(REQUEST_PROFILE_RETENTION_DAYS=7)
+class PruneRequestProfilesTestCase(TestCase):
+    """Test suite for prune_request_profiles."""
+
+    def test_prune_deletes_profiles_past_retention(self):
+        """Test profiles older than REQUEST_PROFILE_RETENTION_DAYS are deleted and newer ones kept."""
+        kept = create_profile(timedelta(days=6))
+        create_profile(timedelta(days=8))
+
+        result = prune_request_profiles()
+
+        self.assertEqual(result, (True, "Deleted 1 Request Profiles"))
+        self.assertEqual(list(RequestProfile.objects.values_list("pk", flat=True)), [kept.pk])
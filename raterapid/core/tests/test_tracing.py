@@ -0,0 +1,160 @@
+"""Test suite for the tracing spans."""
+import tempfile
+import threading
+from pathlib import Path
+from unittest.mock import patch
+
+import orjson
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+from raterapid.rate.counters import conversion_counters
+from raterapid.rate.tasks import cache_api_rates
+from raterapid.rate.views import CurrencyConversionView
+
+from ..tracing import (
+    SpanExporter,
+    extract,
+    inject,
+    start_span,
+    trace_task_end,
+    trace_task_publish,
+    trace_task_start,
+)
+
+
+class TracingTestCase(TestCase):
+    """Test suite for the spans and their propagation."""
+
+    def setUp(self):
+        """Set Up Method."""
+        cache.clear()
+        conversion_counters.reset()
+        self.spans_path = Path(tempfile.mkdtemp()) / "spans.jsonl"
+        self.exporter = SpanExporter()
+        exporter = patch("raterapid.core.tracing.span_exporter", self.exporter)
+        exporter.start()
+        self.addCleanup(exporter.stop)
+        tracing = override_settings(TRACING_EXPORTER=str(self.spans_path))
+        tracing.enable()
+        self.addCleanup(tracing.disable)
+        self.addCleanup(self.exporter.stop)
+
+    def exported(self):
+        """Returns the exported spans by name."""
+        self.exporter.stop()
+        if not self.spans_path.exists():
+            return {}
+        return {span["name"]: span for span in map(orjson.loads, self.spans_path.read_bytes().splitlines())}
+
+    def test_nested_spans(self):
+        """Test a span opened within another is its child in the same trace, and failures are marked."""
+        with start_span("outer", pair="USD/EUR"):
+            with self.assertRaises(ValueError):
+                with start_span("inner"):
+                    raise ValueError
+
+        spans = self.exported()
+        self.assertEqual(spans["inner"]["trace_id"], spans["outer"]["trace_id"])
+        self.assertEqual(spans["inner"]["parent_id"], spans["outer"]["span_id"])
+        self.assertEqual(spans["inner"]["status"], "error")
+        self.assertEqual(spans["outer"]["status"], "ok")
+        self.assertEqual(spans["outer"]["attributes"], {"pair": "USD/EUR"})
+
+    @override_settings(TRACING_EXPORTER="")
+    def test_disabled(self):
+        """Test no span is recorded while tracing is disabled."""
+        with start_span("outer") as span:
+            headers = {}
+            inject(headers)
+
+        self.assertIsNone(span)
+        self.assertEqual(headers, {})
+        self.assertEqual(self.exported(), {})
+
+    def test_extract(self):
+        """Test a traceparent is parsed back into the context it was injected from, and malformed ones ignored."""
+        with start_span("outer") as span:
+            headers = {}
+            inject(headers)
+
+        self.assertEqual(extract(headers["traceparent"]), span.context)
+        self.assertIsNone(extract("00-abc-def-01"))
+        self.assertIsNone(extract(None))
+
+    def test_task_is_traced_as_a_child_of_its_sender(self):
+        """Test a task run is a span of the trace of the span which sent it, through the message headers."""
+        with start_span("warm_caches"):
+            headers = {}
+            trace_task_publish(headers=headers)
+
+        cache_api_rates.push_request(id="task-1", **headers)
+        try:
+            trace_task_start(task_id="task-1", task=cache_api_rates)
+            with start_span("provider.request"):
+                pass
+            trace_task_end(task_id="task-1", task=cache_api_rates, state="SUCCESS")
+        finally:
+            cache_api_rates.pop_request()
+
+        spans = self.exported()
+        task_span = spans["task raterapid.rate.tasks.cache_api_rates"]
+        self.assertEqual(task_span["trace_id"], spans["warm_caches"]["trace_id"])
+        self.assertEqual(task_span["parent_id"], spans["warm_caches"]["span_id"])
+        self.assertEqual(spans["provider.request"]["parent_id"], task_span["span_id"])
+        self.assertEqual(task_span["attributes"], {"task_id": "task-1", "state": "SUCCESS"})
+
+    @patch("requests.Session.get")
+    def test_conversion_is_traced(self, mock_get):
+        """Test a conversion traces the provider call and the writes under the caller's trace."""
+        mock_get.return_value.json.return_value = {"conversion_result": 90.0, "result": 90.0, "success": True}
+        user = User.objects.create_user(username="test", password="test")  # NOQA: S106
+        token = Token.objects.create(user=user)
+        traceparent = "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+        request = RequestFactory().post(
+            reverse("rate:conversion"),
+            {"from_currency": "USD", "to_currency": "EUR", "amount": 100},
+            HTTP_AUTHORIZATION=f"Token {token.key}",
+            HTTP_TRACEPARENT=traceparent,
+        )
+
+        response = CurrencyConversionView.as_view()(request)
+
+        self.assertEqual(response.status_code, 200)
+        spans = self.exported()
+        post = spans["CurrencyConversionView.post"]
+        self.assertEqual((post["trace_id"], post["parent_id"]), extract(traceparent))
+        self.assertEqual(spans["pair_conversion"]["parent_id"], post["span_id"])
+        self.assertEqual(spans["provider.request"]["parent_id"], spans["pair_conversion"]["span_id"])
+        self.assertEqual(spans["db.currency_conversion"]["parent_id"], post["span_id"])
+        self.assertEqual(spans["cache.response"]["parent_id"], post["span_id"])
+
+    def test_spans_are_written_in_the_listener_thread(self):
+        """Test the request thread only queues its spans, and spans arriving while the queue is full are dropped."""
+        written = []
+
+        def emit(writer, record):
+            written.append(threading.get_ident())
+
+        with patch("raterapid.core.tracing.SpanWriter.emit", emit):
+            with start_span("outer"):
+                pass
+            self.exporter.stop()
+
+        self.assertEqual(len(written), 1)
+        self.assertNotEqual(written[0], threading.get_ident())
+
+    @override_settings(TRACING_QUEUE_SIZE=1)
+    def test_spans_are_dropped_when_the_queue_is_full(self):
+        """Test spans arriving while TRACING_QUEUE_SIZE spans are waiting are counted and dropped."""
+        with start_span("outer"):
+            pass
+        self.exporter._handler.stop()
+        for name in ("first", "second"):
+            with start_span(name):
+                pass
+
+        self.assertEqual(self.exporter.dropped, 1)
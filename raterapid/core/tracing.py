@@ -0,0 +1,253 @@
+# coding=utf-8
+"""Core App Tracing."""
+
+import logging
+import os
+import re
+import secrets
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, NamedTuple, Optional
+
+import orjson
+from django.conf import settings
+
+from raterapid.core.log import QueueListenerHandler
+
+# W3C trace context header, e.g. "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01".
+TRACEPARENT_HEADER = "traceparent"
+TRACEPARENT_PATTERN = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+
+class SpanContext(NamedTuple):
+    """Identifiers a span passes on to its children, in this process or in another one."""
+
+    trace_id: str
+    span_id: str
+
+
+class Span:
+    """One timed operation of a trace, e.g. a request, a provider call or a task run."""
+
+    def __init__(self, name: str, parent: Optional[SpanContext] = None, attributes: Optional[Dict[str, Any]] = None):
+        """
+        Initializes a Span starting now.
+
+        Args:
+            name (str): The name of the operation.
+            parent (Optional[SpanContext]): The span this one is part of, None to start a new trace.
+            attributes (Optional[Dict[str, Any]]): Details of the operation, e.g. the provider called.
+        """
+        self.name = name
+        self.context = SpanContext(parent.trace_id if parent else secrets.token_hex(16), secrets.token_hex(8))
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = dict(attributes or {})
+        self.status = "ok"
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self.duration = 0.0
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Adds a detail to the span."""
+        self.attributes[key] = value
+
+    def end(self) -> None:
+        """Stops the clock of the span."""
+        self.duration = time.perf_counter() - self._started
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the span as exported."""
+        return {
+            "trace_id": self.context.trace_id,
+            "span_id": self.context.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": datetime.fromtimestamp(self.started_at, tz=timezone.utc).isoformat(),
+            "duration_ms": round(self.duration * 1000, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+            "process": os.getpid(),
+        }
+
+
+class SpanWriter(logging.Handler):
+    """Handler writing each span it gets as a JSON line to ``TRACING_EXPORTER``, "stdout" or the path of a file."""
+
+    def __init__(self):
+        """Initializes the SpanWriter."""
+        super().__init__()
+        self._file = None
+        self._file_pid: Optional[int] = None
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Writes the span line of the record."""
+        try:
+            line = record.getMessage().encode() + b"\n"
+            if settings.TRACING_EXPORTER == "stdout":
+                sys.stdout.buffer.write(line)
+                sys.stdout.flush()
+                return
+            if self._file is None or self._file_pid != os.getpid():
+                self._file = open(settings.TRACING_EXPORTER, "ab", buffering=0)  # NOQA: SIM115
+                self._file_pid = os.getpid()
+            self._file.write(line)
+        except Exception:
+            self.handleError(record)
+
+    def close(self) -> None:
+        """Closes the file the spans are written to."""
+        with self.lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        super().close()
+
+
+class SpanExporter:
+    """
+    Hands the finished spans over to a background thread, which writes them with a SpanWriter.
+
+    The spans go through the same bounded queue and listener thread as the logs, so the request thread only
+    serializes the span. Spans arriving while ``TRACING_QUEUE_SIZE`` spans are waiting are dropped. The file is
+    opened in append mode on first use in each process, so the workers of a server can share it.
+    """
+
+    def __init__(self):
+        """Initializes the SpanExporter, its listener thread is started by the first span."""
+        self._lock = threading.Lock()
+        self._handler: Optional[QueueListenerHandler] = None
+
+    @property
+    def dropped(self) -> int:
+        """Number of spans dropped because the queue was full."""
+        return self._handler.dropped if self._handler is not None else 0
+
+    def export(self, span: Span) -> None:
+        """Queues the span to be written."""
+        if self._handler is None:
+            with self._lock:
+                if self._handler is None:
+                    self._handler = QueueListenerHandler([SpanWriter()], maxsize=settings.TRACING_QUEUE_SIZE)
+        line = orjson.dumps(span.to_dict(), default=str).decode()
+        self._handler.handle(logging.makeLogRecord({"name": __name__, "msg": line, "levelno": logging.INFO}))
+
+    def stop(self) -> None:
+        """Writes the queued spans and stops the listener thread, the next span starts a new one."""
+        with self._lock:
+            handler, self._handler = self._handler, None
+        if handler is not None:
+            handler.close()
+            for writer in handler.handlers:
+                writer.close()
+
+
+# Span of the operation running in the current context, None outside of a trace.
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+span_exporter = SpanExporter()
+
+
+def tracing_enabled() -> bool:
+    """Returns True if spans are recorded, i.e. ``TRACING_EXPORTER`` is set."""
+    return bool(settings.TRACING_EXPORTER)
+
+
+def current_span() -> Optional[Span]:
+    """Returns the span of the current context, if any."""
+    return _current_span.get()
+
+
+@contextmanager
+def start_span(name: str, parent: Optional[SpanContext] = None, **attributes) -> Iterator[Optional[Span]]:
+    """
+    Runs the block as a span, a child of the current span or of the given parent.
+
+    Yields None and records nothing while tracing is disabled. A block raising an exception ends its span with the
+    "error" status and the exception type.
+
+    Args:
+        name (str): The name of the operation.
+        parent (Optional[SpanContext]): The parent span, e.g. extracted from a request, defaults to the current one.
+        **attributes: Details of the operation.
+    """
+    if not tracing_enabled():
+        yield None
+        return
+    if parent is None and _current_span.get() is not None:
+        parent = _current_span.get().context
+    span = Span(name, parent, attributes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except Exception as exc:
+        span.status = "error"
+        span.set_attribute("error", type(exc).__name__)
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end()
+        span_exporter.export(span)
+
+
+def inject(carrier: Dict[str, Any]) -> None:
+    """Adds the ``traceparent`` of the current span to the carrier, e.g. the headers of an outgoing message."""
+    span = _current_span.get()
+    if span is not None:
+        carrier[TRACEPARENT_HEADER] = f"00-{span.context.trace_id}-{span.context.span_id}-01"
+
+
+def extract(traceparent: Optional[str]) -> Optional[SpanContext]:
+    """Returns the span context of a ``traceparent`` value, or None if it is missing or malformed."""
+    match = TRACEPARENT_PATTERN.match(traceparent or "")
+    return SpanContext(*match.groups()) if match else None
+
+
+def trace_task_publish(sender=None, headers=None, **kwargs) -> None:
+    """Celery ``before_task_publish`` handler passing the current span on to the task in its message headers."""
+    if headers is not None:
+        inject(headers)
+
+
+def trace_task_start(sender=None, task_id=None, task=None, **kwargs) -> None:
+    """Celery ``task_prerun`` handler running the task as a span, a child of the span which sent it."""
+    if task is None or not tracing_enabled():
+        return
+    traceparent = task.request.get(TRACEPARENT_HEADER) or (task.request.get("headers") or {}).get(TRACEPARENT_HEADER)
+    span = Span(f"task {task.name}", extract(traceparent), {"task_id": task_id})
+    task.request.trace_span = (span, _current_span.set(span))
+
+
+def trace_task_end(sender=None, task_id=None, task=None, state=None, **kwargs) -> None:
+    """Celery ``task_postrun`` handler ending the span of the task."""
+    trace_span = getattr(task.request, "trace_span", None) if task is not None else None
+    if trace_span is None:
+        return
+    span, token = trace_span
+    task.request.trace_span = None
+    _current_span.reset(token)
+    span.end()
+    span.set_attribute("state", state)
+    if state not in (None, "SUCCESS"):
+        span.status = "error"
+    span_exporter.export(span)
+
+
+__all__ = [
+    "Span",
+    "SpanContext",
+    "SpanExporter",
+    "SpanWriter",
+    "current_span",
+    "extract",
+    "inject",
+    "span_exporter",
+    "start_span",
+    "trace_task_end",
+    "trace_task_publish",
+    "trace_task_start",
+    "tracing_enabled",
+]
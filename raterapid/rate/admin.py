@@ -1,22 +1,58 @@
 """Rate App Admin."""
 
+from functools import reduce
+from operator import or_
+
 from django.contrib import admin
+from django.db.models import Q
+
+from raterapid.core.filters import CachedFacetsFieldListFilter
+from raterapid.core.paginators import EstimatedCountPaginator
+
+from .exports import bucket_rows, conversion_rows, csv_response
+from .models import ConversionCounterBucket, CurrencyConversion
+
+
+class RequestCountFacetsFilter(CachedFacetsFieldListFilter):
+    """Choices filter showing the number of conversion requests of each choice."""
+
+    facet_field = "count"
+
+
+class CurrencyCodeSearchMixin:
+    """
+    Admin mixin searching the currency codes by exact match.
+
+    The search terms are upper-cased to match the stored codes, so the lookups are plain equalities the indexes on the
+    currency columns serve, rather than the ``UPPER(column)`` comparisons of case-insensitive lookups.
+    """
 
-from .models import CurrencyConversion
+    search_fields = ("from_currency__exact", "to_currency__exact")
+
+    def get_search_results(self, request, queryset, search_term):
+        """Searches the upper-cased terms."""
+        return super().get_search_results(request, queryset, search_term.upper())
 
 
 @admin.register(CurrencyConversion)
-class CurrencyConversionAdmin(admin.ModelAdmin):
-    """Admin class for CurrencyConversion model."""
+class CurrencyConversionAdmin(CurrencyCodeSearchMixin, admin.ModelAdmin):
+    """
+    Admin class for CurrencyConversion model, listing one row per pair with the total of its shards.
+
+    The table holds at most one row per pair and shard, so unlike the buckets it is counted exactly.
+    """
 
-    list_filter = ("from_currency", "to_currency")
-    search_fields = ("from_currency", "to_currency")
-    list_display = ("from_currency", "to_currency", "count", "created_at")
+    list_filter = (("from_currency", RequestCountFacetsFilter), ("to_currency", RequestCountFacetsFilter))
+    list_display = ("from_currency", "to_currency", "total_count", "shard_count", "created_at")
+    show_full_result_count = False
+    actions = ["export_csv"]
+    # The count of the pair, rather than the count of the one shard the page is for.
+    readonly_fields = ("total_count", "shard_count")
     fieldsets = (
         (
             "Currency Information",
             {
-                "fields": ("from_currency", "to_currency", "count"),
+                "fields": ("from_currency", "to_currency", "total_count", "shard_count"),
             },
         ),
         (
@@ -27,6 +63,70 @@ class CurrencyConversionAdmin(admin.ModelAdmin):
         ),
     )
 
+    def get_queryset(self, request):
+        """Returns the first shard of each pair, annotated with the totals of the pair."""
+        return self.model._default_manager.with_totals().order_by(*self.get_ordering(request))
+
+    def get_ordering(self, request):
+        """Lists the most requested pairs first."""
+        return ["-total_count"]
+
+    @admin.action(description="Export selected pairs as CSV")
+    def export_csv(self, request, queryset):
+        """Streams the selected pairs, with their counts summed over all their shards, as a CSV file."""
+        pairs = [
+            Q(from_currency=base, to_currency=target)
+            for base, target in queryset.values_list("from_currency", "to_currency")
+        ]
+        return csv_response(conversion_rows(CurrencyConversion.objects.filter(reduce(or_, pairs))), "conversions")
+
+    @admin.display(description="Request Count", ordering="total_count")
+    def total_count(self, obj):
+        """Returns the number of requests for the pair, summed over its shards."""
+        return obj.total_count
+
+    @admin.display(description="Shards", ordering="shard_count")
+    def shard_count(self, obj):
+        """Returns the number of shards the count of the pair is split over."""
+        return obj.shard_count
+
+    def has_add_permission(self, request):
+        """Returns False to disable add permission."""
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        """Returns False to disable change permission."""
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        """Returns False to disable delete permission."""
+        return False
+
+
+@admin.register(ConversionCounterBucket)
+class ConversionCounterBucketAdmin(CurrencyCodeSearchMixin, admin.ModelAdmin):
+    """
+    Admin class for ConversionCounterBucket model.
+
+    There is no date hierarchy, whose links are built from the distinct dates of the whole table on every page.
+    """
+
+    list_filter = (
+        ("granularity", RequestCountFacetsFilter),
+        ("from_currency", RequestCountFacetsFilter),
+        ("to_currency", RequestCountFacetsFilter),
+    )
+    list_display = ("from_currency", "to_currency", "user", "granularity", "bucket_start", "count")
+    list_select_related = ("user",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ["export_csv"]
+
+    @admin.action(description="Export selected buckets as CSV")
+    def export_csv(self, request, queryset):
+        """Streams the selected buckets as a CSV file."""
+        return csv_response(bucket_rows(queryset), "conversion-buckets")
+
     def has_add_permission(self, request):
         """Returns False to disable add permission."""
         return False
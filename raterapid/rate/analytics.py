@@ -0,0 +1,80 @@
+# coding=utf-8
+"""Rate App Analytics."""
+
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import CurrencyConversion
+
+POPULAR_PAIRS_VERSION_KEY = "popular_pairs_version"
+
+
+def popular_pairs_key(version: int) -> str:
+    """Returns the cache key of the given version of the popular pairs aggregates."""
+    return f"popular_pairs:{version}"
+
+
+def get_popular_pairs() -> Optional[Dict[str, Any]]:
+    """Retrieves the latest popular pairs aggregates from the cache, or None if they were never computed."""
+    version = cache.get(POPULAR_PAIRS_VERSION_KEY)
+    if version is None:
+        return None
+    return cache.get(popular_pairs_key(version))
+
+
+def compute_popular_pairs() -> Dict[str, Any]:
+    """
+    Computes the popular pairs aggregates: the top pairs by conversion count, the totals, and the trends.
+
+    Trends are the growth of each count since the previously published aggregates, over ``window_seconds``.
+
+    Returns:
+        Dict[str, Any]: The aggregates.
+    """
+    now = timezone.now()
+    previous = get_popular_pairs() or {}
+    previous_counts = {(pair["base"], pair["target"]): pair["count"] for pair in previous.get("top_pairs", [])}
+    previous_at = parse_datetime(previous["generated_at"]) if previous else None
+
+    pair_totals = CurrencyConversion.objects.pair_totals()
+    total_conversions = CurrencyConversion.objects.aggregate(conversions=Sum("count"))["conversions"] or 0
+    top_pairs = []
+    for from_currency, to_currency, count in pair_totals.values_list("from_currency", "to_currency", "total_count")[
+        : settings.POPULAR_PAIRS_LIMIT
+    ]:
+        previous_count = previous_counts.get((from_currency, to_currency))
+        change = count - previous_count if previous_count is not None else None
+        top_pairs.append({"base": from_currency, "target": to_currency, "count": count, "change": change})
+
+    return {
+        "generated_at": now.isoformat(),
+        "window_seconds": (now - previous_at).total_seconds() if previous_at else None,
+        "total_conversions": total_conversions,
+        "total_conversions_change": total_conversions - previous.get("total_conversions", total_conversions),
+        "total_pairs": pair_totals.count(),
+        "top_pairs": top_pairs,
+    }
+
+
+def publish_popular_pairs(data: Dict[str, Any]) -> int:
+    """
+    Publishes new popular pairs aggregates under a new version.
+
+    The aggregates are written under their own key before the version pointer is moved, so readers always see a
+    complete set; superseded versions expire on their own.
+
+    Args:
+        data (Dict[str, Any]): The aggregates to publish.
+
+    Returns:
+        int: The version of the published aggregates.
+    """
+    version = (cache.get(POPULAR_PAIRS_VERSION_KEY) or 0) + 1
+    cache.set(popular_pairs_key(version), data, timeout=settings.POPULAR_PAIRS_TIMEOUT)
+    cache.set(POPULAR_PAIRS_VERSION_KEY, version, timeout=None)
+    return version
@@ -0,0 +1,116 @@
+# coding=utf-8
+"""Rate App API-Rates."""
+
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.utils import timezone
+from django_redis.cache import RedisCache
+from redis.exceptions import RedisError
+
+from raterapid.utils.currency_clients import (
+    bump_api_rates_version,
+    get_api_rates_checked_at,
+    next_api_rates_version,
+    rates_digest,
+)
+
+logger = logging.getLogger(__name__)
+
+# Stores the fence (KEYS[1]) and, if given, the cached API rates (KEYS[2]) unless a newer fence is already stored.
+FENCED_SET_SCRIPT = """
+local stored = tonumber(redis.call('GET', KEYS[1]) or '0')
+if stored > tonumber(ARGV[1]) then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[1])
+if ARGV[2] ~= '' then
+    redis.call('SET', KEYS[2], ARGV[2])
+end
+return 1
+"""
+
+_fenced_set_lock = threading.Lock()
+
+
+def cached_rates_are_fresh() -> bool:
+    """Returns True if the cached API rates were confirmed within ``CACHE_API_RATE_FRESHNESS`` seconds."""
+    checked_at = get_api_rates_checked_at()
+    if checked_at is None:
+        return False
+    return timezone.now() - checked_at < timedelta(seconds=settings.CACHE_API_RATE_FRESHNESS)
+
+
+def fenced_set(fence: int, cached_data: Optional[dict] = None) -> bool:
+    """
+    Stores the fence, and the cached API rates if given, unless a newer fence is already stored.
+
+    With the Redis cache the comparison and the writes run as one Lua script, so a stale lease holder cannot pass
+    the check and then overwrite the rates of a newer refresh. Other cache backends only get a lock within the
+    process, which is enough for the process-local memory cache.
+
+    Args:
+        fence (int): The fencing token of the lease held by the caller.
+        cached_data (Optional[dict]): The new value of the cached API rates, None to only store the fence.
+
+    Returns:
+        bool: True if the fence, and the rates, were stored, False if a newer fence was already stored.
+    """
+    backend = caches["default"]
+    if isinstance(backend, RedisCache):
+        client = backend.client
+        try:
+            script = client.get_client(write=True).register_script(FENCED_SET_SCRIPT)
+            keys = [client.make_key("api_rates_fence"), client.make_key("api_rates")]
+            return bool(script(keys=keys, args=[fence, b"" if cached_data is None else client.encode(cached_data)]))
+        except RedisError as exc:
+            logger.error("Failed to publish the API rates: %s", exc)
+            return False
+    with _fenced_set_lock:
+        if cache.get("api_rates_fence", 0) > fence:
+            return False
+        cache.set("api_rates_fence", fence, timeout=None)
+        if cached_data is not None:
+            cache.set("api_rates", cached_data, timeout=None)
+        return True
+
+
+def publish_api_rates(data: dict, fence: int, fetched_at: Optional[datetime] = None) -> bool:
+    """
+    Writes the API rates to the cache unless a newer refresh has already published its own.
+
+    Rates identical to the cached ones are not written again and keep their version, so nothing derived from them
+    is invalidated; only the time they were last confirmed, and the fence they were confirmed under, move forward.
+
+    Args:
+        data (dict): The rates to publish.
+        fence (int): The fencing token of the lease held by the caller.
+        fetched_at (Optional[datetime]): When the rates were fetched from a provider, defaults to now.
+
+    Returns:
+        bool: True if the cached rates are now the given ones, False if they were rejected as stale.
+    """
+    cached_data = cache.get("api_rates")
+    stored_fence = max(cache.get("api_rates_fence", 0), cached_data.get("fence", 0) if cached_data else 0)
+    if stored_fence > fence:
+        return False
+    now = str(fetched_at or timezone.now())
+    digest = rates_digest(data)
+    if cached_data is None or cached_data.get("digest") != digest:
+        version = next_api_rates_version()
+        if not fenced_set(
+            fence, {"rate": data, "updated_at": now, "fence": fence, "digest": digest, "version": version}
+        ):
+            return False
+        bump_api_rates_version(version)
+    elif not fenced_set(fence):
+        return False
+    cache.set("api_rates_checked_at", now, timeout=None)
+    return True
+
+
+__all__ = ["cached_rates_are_fresh", "fenced_set", "publish_api_rates"]
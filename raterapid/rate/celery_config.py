@@ -18,6 +18,16 @@ class RateAppCeleryConfig(object):
                 "schedule": crontab(**settings.CACHE_API_RATE),
                 "args": (),
             },
+            "schedule-cache_popular_pairs": {
+                "task": "raterapid.rate.tasks.cache_popular_pairs",
+                "schedule": crontab(**settings.CACHE_POPULAR_PAIRS),
+                "args": (),
+            },
+            "schedule-rollup_conversion_counters": {
+                "task": "raterapid.rate.tasks.rollup_conversion_counters",
+                "schedule": crontab(**settings.ROLLUP_CONVERSION_COUNTERS),
+                "args": (),
+            },
         }
 
 
@@ -0,0 +1,213 @@
+# coding=utf-8
+"""Rate App Counters."""
+
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+from django.db.models import Max, QuerySet, Sum
+from django.db.models.functions import TruncDay, TruncHour
+from django.utils import timezone
+
+from .models import BucketGranularity, ConversionCounterBucket
+
+logger = logging.getLogger(__name__)
+
+
+class ConversionCounterBuffer:
+    """
+    In-process buffer of conversion counter increments.
+
+    Increments are summed in memory per pair, user and hour, and inserted in bulk as new hourly buckets once
+    ``CONVERSION_COUNTER_FLUSH_SIZE`` increments are pending or ``CONVERSION_COUNTER_FLUSH_INTERVAL`` seconds have
+    passed since the last flush. Once started, a background thread also flushes the buffer when it is due, so an
+    idle process does not hold on to its counts. The buffer is also flushed when the process exits.
+    """
+
+    def __init__(self):
+        """Initializes an empty ConversionCounterBuffer."""
+        self._lock = threading.Lock()
+        self._counts: Counter = Counter()
+        self._pending = 0
+        self._flushed_at = time.monotonic()
+        self._flusher_pid: Optional[int] = None
+        self._flusher_stopped = threading.Event()
+
+    def add(self, from_currency: str, to_currency: str, user_id: Optional[int] = None) -> None:
+        """
+        Counts one conversion request, flushing the buffer if it is due.
+
+        Args:
+            from_currency (str): The base currency code (e.g. "USD").
+            to_currency (str): The target currency code (e.g. "EUR").
+            user_id (Optional[int]): The user who requested the conversion, kept if ``CONVERSION_COUNTERS_PER_USER``.
+        """
+        bucket_start = timezone.now().replace(minute=0, second=0, microsecond=0)
+        user_id = user_id if settings.CONVERSION_COUNTERS_PER_USER else None
+        with self._lock:
+            self._counts[(from_currency, to_currency, user_id, bucket_start)] += 1
+            self._pending += 1
+            due = (
+                self._pending >= settings.CONVERSION_COUNTER_FLUSH_SIZE
+                or time.monotonic() - self._flushed_at >= settings.CONVERSION_COUNTER_FLUSH_INTERVAL
+            )
+        if due:
+            self.flush()
+
+    def start(self) -> None:
+        """
+        Starts the thread flushing the buffer every ``CONVERSION_COUNTER_FLUSH_INTERVAL`` seconds, unless it runs.
+
+        Without it, the counts of a process going idle would wait for its next request or its exit, and then land in
+        hours the rollup may have compacted already. Also meant for a forked worker, which does not inherit the
+        thread of its parent.
+        """
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+            self._flusher_stopped = threading.Event()
+        threading.Thread(
+            target=self._flush_periodically, args=(self._flusher_stopped,), name="conversion-counters", daemon=True
+        ).start()
+
+    def stop(self) -> None:
+        """Stops the flushing thread."""
+        with self._lock:
+            self._flusher_pid = None
+            self._flusher_stopped.set()
+
+    def _flush_periodically(self, stopped: threading.Event) -> None:
+        """Flushes the buffer whenever it is due, until stopped."""
+        while True:
+            idle = time.monotonic() - self._flushed_at
+            if stopped.wait(max(settings.CONVERSION_COUNTER_FLUSH_INTERVAL - idle, 0)):
+                return
+            if time.monotonic() - self._flushed_at < settings.CONVERSION_COUNTER_FLUSH_INTERVAL:
+                continue
+            pending = self._pending
+            self.flush()
+            if pending:
+                # The thread's connection would otherwise stay open between flushes.
+                connections.close_all()
+
+    def reset(self) -> None:
+        """Drops the buffered increments, e.g. those a forked worker inherited from its parent."""
+        with self._lock:
+            self._counts = Counter()
+            self._pending = 0
+            self._flushed_at = time.monotonic()
+
+    def flush(self) -> None:
+        """Inserts the buffered increments as new hourly buckets."""
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+            self._pending = 0
+            self._flushed_at = time.monotonic()
+        if not counts:
+            return
+        try:
+            ConversionCounterBucket.objects.bulk_create(
+                ConversionCounterBucket(
+                    from_currency=from_currency,
+                    to_currency=to_currency,
+                    user_id=user_id,
+                    granularity=BucketGranularity.HOUR,
+                    bucket_start=bucket_start,
+                    count=count,
+                )
+                for (from_currency, to_currency, user_id, bucket_start), count in counts.items()
+            )
+        except DatabaseError as db_err:
+            logger.error("Dropped %s conversion counter increments: %s", sum(counts.values()), db_err)
+
+
+def compact_buckets(queryset: QuerySet, granularity: str) -> int:
+    """
+    Replaces the buckets of the queryset by one bucket per pair, user and period of the given granularity.
+
+    Only the rows that exist when the compaction starts are merged, so buckets inserted concurrently by a flush are
+    left for the next compaction.
+
+    Args:
+        queryset (QuerySet): The buckets to compact.
+        granularity (str): The granularity of the merged buckets.
+
+    Returns:
+        int: The number of buckets removed by the compaction.
+    """
+    truncate = TruncDay if granularity == BucketGranularity.DAY else TruncHour
+    with transaction.atomic():
+        last_id = queryset.aggregate(last_id=Max("id"))["last_id"]
+        if last_id is None:
+            return 0
+        queryset = queryset.filter(id__lte=last_id)
+        rows = (
+            queryset.annotate(period=truncate("bucket_start"))
+            .order_by()
+            .values("from_currency", "to_currency", "user_id", "period")
+            .annotate(total=Sum("count"))
+        )
+        merged = [
+            ConversionCounterBucket(
+                from_currency=row["from_currency"],
+                to_currency=row["to_currency"],
+                user_id=row["user_id"],
+                granularity=granularity,
+                bucket_start=row["period"],
+                count=row["total"],
+            )
+            for row in rows
+        ]
+        deleted, _ = queryset.delete()
+        ConversionCounterBucket.objects.bulk_create(merged)
+    return deleted - len(merged)
+
+
+def rollup_buckets(now: Optional[datetime] = None) -> Tuple[int, int, int]:
+    """
+    Keeps the bucket table small.
+
+    Merges the rows of the hours closed in the last ``CONVERSION_COUNTER_COMPACT_HOURS`` hours, rolls the hourly
+    buckets of the days older than ``CONVERSION_HOURLY_RETENTION_HOURS`` up into daily buckets, and deletes the
+    daily buckets older than ``CONVERSION_DAILY_RETENTION_DAYS``.
+
+    Args:
+        now (Optional[datetime]): The current time, defaults to now.
+
+    Returns:
+        Tuple[int, int, int]: The number of rows removed by each of the three steps.
+    """
+    now = now or timezone.now()
+    current_hour = now.replace(minute=0, second=0, microsecond=0)
+    hourly = ConversionCounterBucket.objects.filter(granularity=BucketGranularity.HOUR)
+    daily = ConversionCounterBucket.objects.filter(granularity=BucketGranularity.DAY)
+
+    compacted = compact_buckets(
+        hourly.filter(
+            bucket_start__lt=current_hour,
+            bucket_start__gte=current_hour - timedelta(hours=settings.CONVERSION_COUNTER_COMPACT_HOURS),
+        ),
+        BucketGranularity.HOUR,
+    )
+    hourly_cutoff = (now - timedelta(hours=settings.CONVERSION_HOURLY_RETENTION_HOURS)).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    rolled_up = compact_buckets(hourly.filter(bucket_start__lt=hourly_cutoff), BucketGranularity.DAY)
+    expired, _ = daily.filter(
+        bucket_start__lt=current_hour - timedelta(days=settings.CONVERSION_DAILY_RETENTION_DAYS)
+    ).delete()
+    return compacted, rolled_up, expired
+
+
+conversion_counters = ConversionCounterBuffer()
+atexit.register(conversion_counters.flush)
+
+__all__ = ["ConversionCounterBuffer", "compact_buckets", "conversion_counters", "rollup_buckets"]
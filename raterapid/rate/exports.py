@@ -0,0 +1,89 @@
+# coding=utf-8
+"""Rate App Exports."""
+
+import csv
+from typing import Any, Iterable, Iterator, Optional, Sequence
+
+from django.conf import settings
+from django.db.models import Count, Max, Min, QuerySet, Sum
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .models import ConversionCounterBucket, CurrencyConversion
+
+CONVERSION_HEADER = ("base", "target", "count", "shards", "first_requested_at", "last_requested_at")
+BUCKET_HEADER = ("base", "target", "user_id", "granularity", "bucket_start", "count")
+
+
+class Echo:
+    """File-like object whose ``write`` returns the written value instead of storing it."""
+
+    def write(self, value: str) -> str:
+        """Returns the value to write."""
+        return value
+
+
+def conversion_rows(queryset: Optional[QuerySet] = None) -> Iterator[Sequence[Any]]:
+    """
+    Yields the header then one row per currency pair, with its count summed over the shards.
+
+    Rows are fetched through ``QuerySet.iterator``, i.e. a server-side cursor on PostgreSQL, in chunks of
+    ``EXPORT_CHUNK_SIZE``, so memory use does not grow with the number of rows.
+
+    Args:
+        queryset (Optional[QuerySet]): The pairs to export, defaults to all of them.
+    """
+    queryset = CurrencyConversion.objects.all() if queryset is None else queryset
+    yield CONVERSION_HEADER
+    yield from (
+        queryset.order_by()
+        .values("from_currency", "to_currency")
+        .annotate(total_count=Sum("count"), shard_count=Count("id"), first=Min("created_at"), last=Max("updated_at"))
+        .order_by("from_currency", "to_currency")
+        .values_list("from_currency", "to_currency", "total_count", "shard_count", "first", "last")
+        .iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+    )
+
+
+def bucket_rows(queryset: Optional[QuerySet] = None) -> Iterator[Sequence[Any]]:
+    """
+    Yields the header then one row per conversion counter bucket, oldest first.
+
+    Args:
+        queryset (Optional[QuerySet]): The buckets to export, defaults to all of them.
+    """
+    queryset = ConversionCounterBucket.objects.all() if queryset is None else queryset
+    yield BUCKET_HEADER
+    yield from (
+        queryset.order_by("bucket_start", "id")
+        .values_list("from_currency", "to_currency", "user_id", "granularity", "bucket_start", "count")
+        .iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+    )
+
+
+def stream_csv(rows: Iterable[Sequence[Any]]) -> Iterator[str]:
+    """Formats each row as one CSV line, lazily."""
+    writer = csv.writer(Echo())
+    return (writer.writerow(row) for row in rows)
+
+
+def csv_response(rows: Iterable[Sequence[Any]], name: str) -> StreamingHttpResponse:
+    """
+    Returns a response streaming the rows as a CSV attachment.
+
+    Nginx is told not to buffer the response, so the first rows reach the client right away and the proxy read
+    timeout only applies between chunks rather than to the whole export.
+
+    Args:
+        rows (Iterable[Sequence[Any]]): The rows to export, starting with the header.
+        name (str): The name of the export, used in the file name.
+    """
+    filename = f"{name}-{timezone.now():%Y%m%d-%H%M%S}.csv"
+    return StreamingHttpResponse(
+        stream_csv(rows),
+        content_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', "X-Accel-Buffering": "no"},
+    )
+
+
+__all__ = ["Echo", "bucket_rows", "conversion_rows", "csv_response", "stream_csv"]
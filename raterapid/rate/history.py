@@ -0,0 +1,109 @@
+# coding=utf-8
+"""Rate App History."""
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import RateChange, RateSnapshot
+
+
+def latest_snapshot(moment: datetime) -> Optional[RateSnapshot]:
+    """Returns the latest keyframe taken at or before the given moment, or None if there is none."""
+    return RateSnapshot.objects.filter(taken_at__lte=moment).order_by("-taken_at").first()
+
+
+def replay(snapshot: RateSnapshot, moment: datetime) -> Dict[str, float]:
+    """Returns the rates of the keyframe with its changes up to the given moment applied."""
+    rates = dict(snapshot.rates)
+    for currency, rate in snapshot.changes.filter(changed_at__lte=moment).order_by().values_list("currency", "rate"):
+        if rate is None:
+            rates.pop(currency, None)
+        else:
+            rates[currency] = rate
+    return rates
+
+
+def rates_at(moment: Optional[datetime] = None) -> Optional[Dict[str, float]]:
+    """
+    Reconstructs the API rates as they were at the given moment.
+
+    Costs two queries whatever the moment: one for the latest keyframe before it, and one for the changes recorded
+    against that keyframe.
+
+    Args:
+        moment (Optional[datetime]): The point in time, defaults to now.
+
+    Returns:
+        Optional[Dict[str, float]]: The rates, or None if no rates were recorded before the moment.
+    """
+    moment = moment or timezone.now()
+    snapshot = latest_snapshot(moment)
+    return replay(snapshot, moment) if snapshot else None
+
+
+def record_rates(rates: Dict[str, float], moment: Optional[datetime] = None) -> Tuple[bool, int]:
+    """
+    Records the API rates in the history, storing only the rates that changed since the previous record.
+
+    A new keyframe holding the full table is taken every ``RATE_KEYFRAME_INTERVAL`` seconds, or sooner when the
+    changes recorded against the current keyframe would outgrow a full table. The changes are logged even when a
+    keyframe is taken, so the change log alone is a complete feed of the rate updates.
+
+    Args:
+        rates (Dict[str, float]): The full table of rates.
+        moment (Optional[datetime]): When the rates were fetched, defaults to now.
+
+    Returns:
+        Tuple[bool, int]: Whether a keyframe was taken, and the number of changes recorded.
+    """
+    moment = moment or timezone.now()
+    with transaction.atomic():
+        snapshot = latest_snapshot(moment)
+        previous = replay(snapshot, moment) if snapshot else {}
+        changes = [(currency, rate) for currency, rate in rates.items() if previous.get(currency) != rate]
+        changes += [(currency, None) for currency in previous.keys() - rates.keys()]
+
+        keyframe_due = (
+            snapshot is None
+            or moment - snapshot.taken_at >= timedelta(seconds=settings.RATE_KEYFRAME_INTERVAL)
+            or snapshot.changes.count() + len(changes) > len(rates)
+        )
+        if keyframe_due:
+            snapshot = RateSnapshot.objects.create(taken_at=moment, rates=rates)
+        if previous:
+            RateChange.objects.bulk_create(
+                RateChange(snapshot=snapshot, changed_at=moment, currency=currency, rate=rate)
+                for currency, rate in changes
+            )
+    return keyframe_due, len(changes) if previous else 0
+
+
+def changes_since(since: datetime, after_id: Optional[int] = None, limit: Optional[int] = None) -> List[Dict]:
+    """
+    Returns the rate changes recorded after the given position, oldest first.
+
+    Every change of one refresh shares its ``changed_at``, so positions are ``(changed_at, id)`` pairs: a page cut
+    within a refresh resumes with the remaining changes of that refresh.
+
+    Args:
+        since (datetime): Only changes recorded after this moment are returned.
+        after_id (Optional[int]): Also return the changes recorded at ``since`` itself with a greater id.
+        limit (Optional[int]): The maximum number of changes, defaults to ``RATE_HISTORY_CHANGES_LIMIT``.
+
+    Returns:
+        List[Dict]: The changes, as ``{"id", "changed_at", "currency", "rate"}`` dictionaries.
+    """
+    limit = limit or settings.RATE_HISTORY_CHANGES_LIMIT
+    position = Q(changed_at__gt=since)
+    if after_id is not None:
+        position |= Q(changed_at=since, id__gt=after_id)
+    changes = RateChange.objects.filter(position).order_by("changed_at", "id")
+    return list(changes.values("id", "changed_at", "currency", "rate")[:limit])
+
+
+__all__ = ["changes_since", "latest_snapshot", "rates_at", "record_rates", "replay"]
@@ -0,0 +1 @@
+"""Rate App management commands."""
@@ -0,0 +1,48 @@
+# coding=utf-8
+"""Rate App Command : Conversion endpoint microbenchmark."""
+
+import timeit
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from raterapid.rate.serializers import (
+    ConversionRequestValidator,
+    ConversionResponseBuilder,
+    CurrencyConversionResponseSerializer,
+    CurrencyConversionSerializer,
+)
+
+
+class Command(BaseCommand):
+    """Compares the per-request CPU cost of the DRF serializers and the lean conversion fast path."""
+
+    help = "Benchmark the input validation and response building of the conversion endpoint."
+
+    def add_arguments(self, parser):
+        """Adds the command arguments."""
+        parser.add_argument("--number", type=int, default=20000, help="Number of calls per measurement.")
+        parser.add_argument("--repeat", type=int, default=5, help="Number of measurements, the best one is kept.")
+
+    def handle(self, *args, **options):
+        """Runs the benchmark."""
+        request_data = {"from_currency": "USD", "to_currency": "EUR", "amount": "100.50"}
+        response_data = {"last_updated": timezone.now(), "amount": 85.42, "base": "USD", "target": "EUR"}
+
+        def serializer_path():
+            serializer = CurrencyConversionSerializer(data=request_data)
+            serializer.is_valid()
+            response_serializer = CurrencyConversionResponseSerializer(data=response_data)
+            response_serializer.is_valid()
+            return response_serializer.validated_data
+
+        def fast_path():
+            ConversionRequestValidator.validate(request_data)
+            return ConversionResponseBuilder.build(response_data)
+
+        results = {}
+        for name, func in (("serializers", serializer_path), ("fast path", fast_path)):
+            best = min(timeit.repeat(func, number=options["number"], repeat=options["repeat"]))
+            results[name] = best / options["number"] * 1_000_000
+            self.stdout.write(f"{name:<12} {results[name]:8.2f} us/request")
+        self.stdout.write(f"speedup      {results['serializers'] / results['fast path']:8.2f}x")
@@ -0,0 +1,40 @@
+# coding=utf-8
+"""Rate App Command : CSV export of the conversion statistics."""
+
+from django.core.management.base import BaseCommand
+
+from raterapid.rate.exports import bucket_rows, conversion_rows, stream_csv
+from raterapid.rate.models import BucketGranularity, ConversionCounterBucket
+
+
+class Command(BaseCommand):
+    """Streams the conversion counts, or their time buckets, as CSV with constant memory use."""
+
+    help = "Export the conversion counts per pair, or the conversion counter buckets, as CSV."
+
+    def add_arguments(self, parser):
+        """Adds the command arguments."""
+        parser.add_argument("--buckets", action="store_true", help="Export the counter buckets instead of the pairs.")
+        parser.add_argument(
+            "--granularity",
+            choices=BucketGranularity.values,
+            help="Only export the buckets of this granularity.",
+        )
+        parser.add_argument("--output", help="Path of the CSV file to write, defaults to the standard output.")
+
+    def handle(self, *args, **options):
+        """Runs the export."""
+        if options["buckets"]:
+            buckets = ConversionCounterBucket.objects.all()
+            if options["granularity"]:
+                buckets = buckets.filter(granularity=options["granularity"])
+            rows = bucket_rows(buckets)
+        else:
+            rows = conversion_rows()
+
+        if options["output"]:
+            with open(options["output"], "w", newline="") as output:
+                output.writelines(stream_csv(rows))
+        else:
+            for line in stream_csv(rows):
+                self.stdout.write(line, ending="")
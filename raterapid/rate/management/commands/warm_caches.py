@@ -0,0 +1,51 @@
+# coding=utf-8
+"""Rate App Command : Cache warm-up."""
+
+import logging
+
+from django.core.management.base import BaseCommand
+
+from raterapid.core.tracing import start_span
+from raterapid.rate.tasks import cache_api_rates
+from raterapid.rate.warmup import warm_caches
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """Warms the caches from the database before the app takes traffic."""
+
+    help = "Restore the cached rates from the last recorded rates, and precompute the statistics."
+
+    def add_arguments(self, parser):
+        """Adds the command arguments."""
+        parser.add_argument(
+            "--refresh",
+            action="store_true",
+            help="Queue a refresh of the rates if the restored ones are not fresh anymore.",
+        )
+
+    def handle(self, *args, **options):
+        """
+        Runs the warm-up, traced so the refresh it queues is part of the same trace.
+
+        Failures, e.g. while the database or the broker is unreachable, are logged and do not fail the command, so
+        the app still starts and answers from its fallbacks; the readiness endpoint reports whether it has rates.
+        """
+        with start_span("warm_caches"):
+            try:
+                warmed = warm_caches()
+            except Exception:
+                logger.exception("Failed to warm the caches.")
+                self.stdout.write("Failed to warm the caches.")
+                return
+            for name, done in warmed.items():
+                self.stdout.write(f"{name:<14} {'yes' if done else 'no'}")
+            if options["refresh"] and not warmed["fresh"]:
+                try:
+                    cache_api_rates.delay()
+                except Exception:
+                    logger.exception("Failed to queue a refresh of the rates.")
+                    self.stdout.write("Failed to queue a refresh of the rates.")
+                    return
+                self.stdout.write("Queued a refresh of the rates.")
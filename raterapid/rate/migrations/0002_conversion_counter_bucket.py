@@ -0,0 +1,61 @@
+# Generated by Django 4.2.2 on 2026-10-19 06:08
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("rate", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ConversionCounterBucket",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "from_currency",
+                    models.CharField(
+                        choices=[("USD", "Usd"), ("EGP", "Egp"), ("EUR", "Eur")],
+                        max_length=3,
+                        verbose_name="Base Currency",
+                    ),
+                ),
+                (
+                    "to_currency",
+                    models.CharField(
+                        choices=[("USD", "Usd"), ("EGP", "Egp"), ("EUR", "Eur")],
+                        max_length=3,
+                        verbose_name="Target Currency",
+                    ),
+                ),
+                (
+                    "granularity",
+                    models.CharField(choices=[("hour", "Hour"), ("day", "Day")], default="hour", max_length=4),
+                ),
+                ("bucket_start", models.DateTimeField(verbose_name="Bucket Start")),
+                ("count", models.PositiveIntegerField(verbose_name="Request Count")),
+                (
+                    "user",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Conversion Counter Bucket",
+                "verbose_name_plural": "Conversion Counter Buckets",
+                "ordering": ["-bucket_start"],
+                "indexes": [
+                    models.Index(fields=["granularity", "bucket_start"], name="rate_conver_granula_4b3177_idx")
+                ],
+            },
+        ),
+    ]
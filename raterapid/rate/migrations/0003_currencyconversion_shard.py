@@ -0,0 +1,25 @@
+# Generated by Django 4.2.2 on 2026-10-19 06:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("rate", "0002_conversion_counter_bucket"),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name="currencyconversion",
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name="currencyconversion",
+            name="shard",
+            field=models.PositiveSmallIntegerField(default=0, verbose_name="Shard"),
+        ),
+        migrations.AlterUniqueTogether(
+            name="currencyconversion",
+            unique_together={("from_currency", "to_currency", "shard")},
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.2 on 2026-10-19 06:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("rate", "0003_currencyconversion_shard"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="conversioncounterbucket",
+            index=models.Index(fields=["-bucket_start"], name="rate_conver_bucket__cb540a_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="conversioncounterbucket",
+            index=models.Index(
+                fields=["from_currency", "to_currency", "-bucket_start"], name="rate_conver_from_cu_890fff_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="currencyconversion",
+            index=models.Index(fields=["to_currency"], name="rate_curren_to_curr_06666d_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="currencyconversion",
+            index=models.Index(fields=["-count"], name="rate_curren_count_e98cb5_idx"),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.2.2 on 2026-10-19 06:13
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("rate", "0004_admin_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RateSnapshot",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("taken_at", models.DateTimeField(db_index=True, verbose_name="Taken At")),
+                ("rates", models.JSONField(verbose_name="Rates")),
+            ],
+            options={
+                "verbose_name": "Rate Snapshot",
+                "verbose_name_plural": "Rate Snapshots",
+                "ordering": ["-taken_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="RateChange",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("changed_at", models.DateTimeField(verbose_name="Changed At")),
+                ("currency", models.CharField(max_length=3, verbose_name="Currency")),
+                (
+                    "rate",
+                    models.FloatField(
+                        blank=True, help_text="Empty if the rate was removed.", null=True, verbose_name="Rate"
+                    ),
+                ),
+                (
+                    "snapshot",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="changes", to="rate.ratesnapshot"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Rate Change",
+                "verbose_name_plural": "Rate Changes",
+                "ordering": ["changed_at", "id"],
+                "indexes": [
+                    models.Index(fields=["snapshot", "changed_at"], name="rate_ratech_snapsho_2d2b11_idx"),
+                    models.Index(fields=["changed_at"], name="rate_ratech_changed_9cd4c4_idx"),
+                ],
+            },
+        ),
+    ]
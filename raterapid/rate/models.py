@@ -1,6 +1,9 @@
 # coding=utf-8
 """Rate App Models."""
 
+import random
+
+from django.conf import settings
 from django.db import models
 from django.utils import timezone
 
@@ -15,8 +18,42 @@ class Currency(models.TextChoices):
     EUR = "EUR"
 
 
+class CurrencyConversionQuerySet(models.QuerySet):
+    """QuerySet of CurrencyConversion, aggregating the counter shards of each pair."""
+
+    def pair_totals(self) -> models.QuerySet:
+        """Returns one ``{"from_currency", "to_currency", "total_count"}`` row per pair, summed over its shards."""
+        return (
+            self.order_by()
+            .values("from_currency", "to_currency")
+            .annotate(total_count=models.Sum("count"))
+            .order_by("-total_count")
+        )
+
+    def with_totals(self) -> "CurrencyConversionQuerySet":
+        """
+        Returns the first shard of each pair, annotated with the ``total_count`` and ``shard_count`` of the pair.
+
+        Unlike ``pair_totals``, the rows are model instances, so the totals can be listed wherever the pairs are.
+        """
+        pair_shards = CurrencyConversion.objects.filter(
+            from_currency=models.OuterRef("from_currency"), to_currency=models.OuterRef("to_currency")
+        ).order_by()
+        pair_aggregate = pair_shards.values("from_currency", "to_currency")
+        return self.filter(id=models.Subquery(pair_shards.order_by("id").values("id")[:1])).annotate(
+            total_count=models.Subquery(pair_aggregate.annotate(total=models.Sum("count")).values("total")),
+            shard_count=models.Subquery(pair_aggregate.annotate(shards=models.Count("id")).values("shards")),
+        )
+
+
 class CurrencyConversion(TimeStampedModel):
-    """Model to track the number of times specific currency conversion requests have been made."""
+    """
+    Model to track the number of times specific currency conversion requests have been made.
+
+    The count of a pair is split over up to ``CURRENCY_CONVERSION_SHARDS`` rows, one per shard. Each request
+    increments a random shard, so concurrent requests for a hot pair rarely wait on the same row lock; the count of
+    the pair is the sum of its shards.
+    """
 
     from_currency = models.CharField(
         max_length=3, choices=Currency.choices, null=False, blank=False, verbose_name="Base Currency"
@@ -24,13 +61,19 @@ class CurrencyConversion(TimeStampedModel):
     to_currency = models.CharField(
         max_length=3, choices=Currency.choices, null=False, blank=False, verbose_name="Target Currency"
     )
+    shard = models.PositiveSmallIntegerField(default=0, verbose_name="Shard")
     count = models.IntegerField(default=1, verbose_name="Request Count")
 
+    objects = CurrencyConversionQuerySet.as_manager()
+
     class Meta:
         """Meta Class."""
 
-        unique_together = ("from_currency", "to_currency")
+        unique_together = ("from_currency", "to_currency", "shard")
         ordering = ["-count"]
+        # The unique constraint also serves the lookups and filters on the base currency, the count index serves the
+        # default ordering; the admin's ordering on the pair totals is computed and cannot use an index.
+        indexes = [models.Index(fields=["to_currency"]), models.Index(fields=["-count"])]
         verbose_name = "Currency Conversion"
         verbose_name_plural = "Currency Conversions"
 
@@ -41,10 +84,101 @@ class CurrencyConversion(TimeStampedModel):
         self.save(update_fields=["count", "updated_at"])
 
     @classmethod
-    def get_or_increment(cls, from_currency: str, to_currency: str) -> "CurrencyConversion":
-        """Gets a CurrencyConversion instance, incrementing the count if it already exists."""
-        currency_conversion, created = cls.objects.get_or_create(from_currency=from_currency, to_currency=to_currency)
+    def get_or_increment(cls, from_currency: str, to_currency: str) -> None:
+        """
+        Counts one more conversion request between the two currencies.
+
+        The count of a random shard of the pair is incremented by a single ``UPDATE`` in the database, so the row
+        lock is held for the duration of that statement only and concurrent requests never overwrite each other's
+        increments. The shard row is created on its first request.
+        """
+        shard = random.randrange(settings.CURRENCY_CONVERSION_SHARDS)  # NOQA: S311
+        pair_shard = cls.objects.filter(from_currency=from_currency, to_currency=to_currency, shard=shard)
+        increment = {"count": models.F("count") + 1, "updated_at": timezone.now()}
+        if pair_shard.update(**increment):
+            return
+        _, created = cls.objects.get_or_create(from_currency=from_currency, to_currency=to_currency, shard=shard)
         if not created:
-            currency_conversion.increment_count()
+            # Another request created the row in the meantime.
+            pair_shard.update(**increment)
+
+    @classmethod
+    def total(cls, from_currency: str, to_currency: str) -> int:
+        """Returns the number of conversion requests between the two currencies, summed over the shards."""
+        totals = cls.objects.filter(from_currency=from_currency, to_currency=to_currency).aggregate(
+            total=models.Sum("count")
+        )
+        return totals["total"] or 0
+
+
+class BucketGranularity(models.TextChoices):
+    """Time span covered by a conversion counter bucket."""
+
+    HOUR = "hour"
+    DAY = "day"
+
+
+class ConversionCounterBucket(models.Model):
+    """
+    Model counting the conversion requests of a currency pair, and optionally of a user, over an hour or a day.
+
+    Rows are append-only: buffered increments are inserted as new rows, and the ``rollup_conversion_counters`` task
+    merges the rows of closed hours, rolls old hours up into days, and drops days past the retention period.
+    Counts over a period are the sum of its rows.
+    """
+
+    from_currency = models.CharField(max_length=3, choices=Currency.choices, verbose_name="Base Currency")
+    to_currency = models.CharField(max_length=3, choices=Currency.choices, verbose_name="Target Currency")
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL, related_name="+"
+    )
+    granularity = models.CharField(max_length=4, choices=BucketGranularity.choices, default=BucketGranularity.HOUR)
+    bucket_start = models.DateTimeField(verbose_name="Bucket Start")
+    count = models.PositiveIntegerField(verbose_name="Request Count")
+
+    class Meta:
+        """Meta Class."""
+
+        ordering = ["-bucket_start"]
+        indexes = [
+            models.Index(fields=["granularity", "bucket_start"]),
+            models.Index(fields=["-bucket_start"]),
+            models.Index(fields=["from_currency", "to_currency", "-bucket_start"]),
+        ]
+        verbose_name = "Conversion Counter Bucket"
+        verbose_name_plural = "Conversion Counter Buckets"
+
+
+class RateSnapshot(models.Model):
+    """
+    Model holding the full table of API rates at a point in time, a keyframe of the rate history.
+
+    Between keyframes, only the rates that changed are stored, as ``RateChange`` rows against the latest keyframe.
+    """
+
+    taken_at = models.DateTimeField(db_index=True, verbose_name="Taken At")
+    rates = models.JSONField(verbose_name="Rates")
+
+    class Meta:
+        """Meta Class."""
+
+        ordering = ["-taken_at"]
+        verbose_name = "Rate Snapshot"
+        verbose_name_plural = "Rate Snapshots"
+
+
+class RateChange(models.Model):
+    """Model recording a new rate of one currency, relative to a keyframe of the rate history."""
+
+    snapshot = models.ForeignKey(RateSnapshot, on_delete=models.CASCADE, related_name="changes")
+    changed_at = models.DateTimeField(verbose_name="Changed At")
+    currency = models.CharField(max_length=3, verbose_name="Currency")
+    rate = models.FloatField(null=True, blank=True, verbose_name="Rate", help_text="Empty if the rate was removed.")
+
+    class Meta:
+        """Meta Class."""
 
-        return currency_conversion
+        ordering = ["changed_at", "id"]
+        indexes = [models.Index(fields=["snapshot", "changed_at"]), models.Index(fields=["changed_at"])]
+        verbose_name = "Rate Change"
+        verbose_name_plural = "Rate Changes"
@@ -0,0 +1,83 @@
+# coding=utf-8
+"""Rate App Response Cache."""
+
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from raterapid.utils.currency_clients import get_api_rates_checked_at, get_api_rates_version
+
+
+def response_cache_key(from_currency: str, to_currency: str, amount: Decimal, version: int) -> str:
+    """
+    Builds the cache key of a conversion response.
+
+    Args:
+        from_currency (str): The base currency code (e.g. "USD").
+        to_currency (str): The target currency code (e.g. "EUR").
+        amount (Decimal): The amount of base currency to be converted.
+        version (int): The version of the cached API rates.
+
+    Returns:
+        str: The cache key, identical for every request asking for the same conversion.
+    """
+    return f"conversion:{version}:{from_currency}:{to_currency}:{amount.quantize(Decimal('0.01'))}"
+
+
+def get_cached_response(
+    from_currency: str, to_currency: str, amount: Decimal, version: Optional[int] = None
+) -> Optional[Dict]:
+    """
+    Retrieves the cached response of an identical conversion answered recently.
+
+    Responses are keyed on the version of the cached API rates, so publishing new rates invalidates all of them.
+
+    Args:
+        from_currency (str): The base currency code (e.g. "USD").
+        to_currency (str): The target currency code (e.g. "EUR").
+        amount (Decimal): The amount of base currency to be converted.
+        version (Optional[int]): The version of the cached API rates, defaults to the current one.
+
+    Returns:
+        Optional[Dict]: The response data, or None if the conversion was not answered recently.
+    """
+    if not settings.CONVERSION_RESPONSE_CACHE_TTL:
+        return None
+    if version is None:
+        version = get_api_rates_version()
+    return cache.get(response_cache_key(from_currency, to_currency, amount, version))
+
+
+def cache_response(
+    from_currency: str, to_currency: str, amount: Decimal, response_data: Dict, version: Optional[int] = None
+) -> None:
+    """
+    Caches the response of a conversion for identical requests.
+
+    The response lives for ``CONVERSION_RESPONSE_CACHE_TTL`` seconds at most, and never past the point where the
+    rates it was computed from stop being fresh. Rates a provider confirmed unchanged count as fresh again.
+
+    Args:
+        from_currency (str): The base currency code (e.g. "USD").
+        to_currency (str): The target currency code (e.g. "EUR").
+        amount (Decimal): The amount of base currency to be converted.
+        response_data (Dict): The validated response data.
+        version (Optional[int]): The version of the cached API rates read before the conversion was computed, so
+            a response computed from older rates is never stored under newer ones. Defaults to the current one.
+    """
+    if not settings.CONVERSION_RESPONSE_CACHE_TTL:
+        return
+    last_updated: datetime = response_data["last_updated"]
+    checked_at = get_api_rates_checked_at()
+    if checked_at is not None:
+        last_updated = max(last_updated, checked_at)
+    freshness = settings.CACHE_API_RATE_FRESHNESS - (timezone.now() - last_updated).total_seconds()
+    timeout = min(settings.CONVERSION_RESPONSE_CACHE_TTL, freshness)
+    if timeout > 0:
+        if version is None:
+            version = get_api_rates_version()
+        cache.set(response_cache_key(from_currency, to_currency, amount, version), response_data, timeout=timeout)
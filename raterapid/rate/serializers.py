@@ -1,8 +1,13 @@
 # coding=utf-8
 """Rate App Serializers."""
 
+from datetime import timedelta
+from typing import Any, Dict, List, Mapping, Tuple
+
+from django.conf import settings
 from django.utils import timezone
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 
 from .models import Currency
 
@@ -23,3 +28,92 @@ class CurrencyConversionResponseSerializer(serializers.Serializer):
     amount = serializers.FloatField()
     base = serializers.CharField(max_length=3)
     target = serializers.CharField(max_length=3)
+    stale = serializers.BooleanField(default=False)
+
+
+class RateHistorySerializer(serializers.Serializer):
+    """Serializer for rate history queries."""
+
+    at = serializers.DateTimeField(required=False)
+
+
+class RateChangesSerializer(serializers.Serializer):
+    """Serializer for rate changes queries."""
+
+    since = serializers.DateTimeField()
+    after_id = serializers.IntegerField(required=False, min_value=0)
+
+
+class ConversionRequestValidator:
+    """
+    Lean validator for the conversion endpoint input.
+
+    Produces the same validated data and errors as ``CurrencyConversionSerializer``, but runs the fields of a single
+    serializer instance built at import time instead of instantiating (and deep-copying the fields of) a serializer
+    on every request.
+    """
+
+    fields = CurrencyConversionSerializer().fields
+
+    @classmethod
+    def validate(cls, data: Mapping) -> Tuple[Dict[str, Any], Dict[str, List[str]]]:
+        """
+        Validates the conversion request data.
+
+        Args:
+            data (Mapping): The request data, anything else, e.g. a JSON list, is rejected like the serializer does.
+
+        Returns:
+            Tuple[Dict[str, Any], Dict[str, List[str]]]: The validated data, and the errors by field name, empty if
+            the data is valid.
+        """
+        if not isinstance(data, Mapping):
+            message = serializers.Serializer.default_error_messages["invalid"].format(datatype=type(data).__name__)
+            return {}, {api_settings.NON_FIELD_ERRORS_KEY: [message]}
+        validated_data, errors = {}, {}
+        for field_name, field in cls.fields.items():
+            try:
+                validated_data[field_name] = field.run_validation(field.get_value(data))
+            except serializers.ValidationError as exc:
+                errors[field_name] = exc.detail
+        return validated_data, errors
+
+
+class ConversionResponseBuilder:
+    """
+    Lean builder of the conversion endpoint output.
+
+    The response is made of values the view computed itself, so instead of validating them again through
+    ``CurrencyConversionResponseSerializer`` the builder only coerces them to the serializer's output types. The
+    ``last_updated`` timestamp, the one value that may come from the cache, still goes through the serializer field,
+    and the response is flagged ``stale`` when it is older than ``CONVERSION_STALE_AFTER``.
+    """
+
+    last_updated_field = CurrencyConversionResponseSerializer().fields["last_updated"]
+
+    @classmethod
+    def build(cls, response_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Builds the conversion response.
+
+        Args:
+            response_data (Dict[str, Any]): The response data built by the view.
+
+        Returns:
+            Dict[str, Any]: The response, shaped like ``CurrencyConversionResponseSerializer.validated_data``.
+
+        Raises:
+            serializers.ValidationError: If ``last_updated`` is not a valid datetime.
+        """
+        try:
+            last_updated = cls.last_updated_field.run_validation(response_data["last_updated"])
+        except serializers.ValidationError as exc:
+            raise serializers.ValidationError({"last_updated": exc.detail})
+        return {
+            "time_now": timezone.now(),
+            "last_updated": last_updated,
+            "amount": float(response_data["amount"]),
+            "base": str(response_data["base"]),
+            "target": str(response_data["target"]),
+            "stale": timezone.now() - last_updated > timedelta(seconds=settings.CONVERSION_STALE_AFTER),
+        }
@@ -1,21 +1,108 @@
 """Rate App Task."""
 
-from django.core.cache import cache
+import logging
+import random
+import time
+from itertools import permutations
+from typing import Optional
+
+from django.conf import settings
 from django.utils import timezone
 
-from config import celery_app as app
-from raterapid.utils.currency_clients import get_latest_rates
+from config.celery_app import app
+from raterapid.utils.cache_lock import CacheLease
+from raterapid.utils.currency_clients import get_cached_api_rates, get_latest_rates
+from raterapid.utils.offline_snapshot import is_complete_rates_table, write_offline_snapshot
+from raterapid.utils.rate_graph import build_rate_graph, publish_rate_graph
+
+from .analytics import compute_popular_pairs, publish_popular_pairs
+from .api_rates import cached_rates_are_fresh, publish_api_rates
+from .counters import rollup_buckets
+from .history import record_rates
+from .models import Currency
+
+logger = logging.getLogger(__name__)
 
 
 @app.task(bind=True, max_retries=3)
-def cache_api_rates(self):
-    """Caches the API rates."""
+def cache_api_rates(self, force: bool = False):
+    """
+    Caches the API rates.
+
+    Scheduled runs are spread over ``CACHE_API_RATE_JITTER`` seconds and skipped while the cached rates are still
+    fresh, forced runs start right away, and a cache lease makes sure only one refresh talks to the providers at a
+    time. Published rates are also recorded in the rate history and written to the offline snapshot file, and the
+    rate graph is rebuilt from every provider's latest quotes, unless the table lost too many of the currencies of
+    the previous one.
+
+    Args:
+        force (bool): Refresh even if the cached rates are still fresh.
+    """
+    if not force and self.request.retries == 0 and settings.CACHE_API_RATE_JITTER:
+        time.sleep(random.uniform(0, settings.CACHE_API_RATE_JITTER))  # NOQA: S311
+    if not force and cached_rates_are_fresh():
+        return (True, "Cached Data Is Still Fresh")
+
+    lease = CacheLease("cache_api_rates", timeout=settings.CACHE_API_RATE_LOCK_TIMEOUT)
+    fence = lease.acquire()
+    if fence is None:
+        return (False, "Another Task Is Already Updating Data")
+    try:
+        try:
+            # Another worker may have finished a refresh while we were waiting for the lease.
+            if not force and cached_rates_are_fresh():
+                return (True, "Cached Data Is Still Fresh")
+            previous_rates, _ = get_cached_api_rates()
+            success, data = get_latest_rates()
+            if not success or not publish_api_rates(data, fence):
+                return (False, "Task Failed to Update Data")
+        except Exception as e:
+            self.retry(exc=e, max_retries=3)
+            return (False, "Task Failed to Update Data")
+        record_published_rates(data, previous_rates)
+        return (True, "Task Updated Data Successfully")
+    finally:
+        lease.release()
+
+
+def record_published_rates(data: dict, previous_rates: Optional[dict]) -> None:
+    """
+    Records newly published rates in the rate history, the offline snapshot file and the rate graph.
+
+    The rates are already published, so a failure of one of these is logged rather than retried: a retry would
+    spend provider quota on a refresh that succeeded.
+
+    Args:
+        data (dict): The published rates.
+        previous_rates (Optional[dict]): The rates cached before them, None if there were none.
+    """
+    try:
+        record_rates(data)
+    except Exception:
+        logger.exception("Failed to record the published rates in the rate history.")
+    if settings.OFFLINE_RATES_PATH:
+        try:
+            write_offline_snapshot(data, timezone.now())
+        except Exception:
+            logger.exception("Failed to write the offline snapshot of the published rates.")
+    if not is_complete_rates_table(data, len(previous_rates or {})):
+        logger.warning("Kept the rate graph over a table of %s currencies.", len(data))
+        return
     try:
-        success, data = get_latest_rates()
-        if success:
-            cache.set("api_rates", {"rate": data, "updated_at": str(timezone.now())}, timeout=None)
-            return (True, "Task Updated Data Successfully")
-        return (False, "Task Failed to Update Data")
-    except Exception as e:
-        self.retry(exc=e, max_retries=3)
-        return (False, "Task Failed to Update Data")
+        publish_rate_graph(build_rate_graph(permutations(Currency.values, 2)))
+    except Exception:
+        logger.exception("Failed to publish the rate graph of the published rates.")
+
+
+@app.task
+def cache_popular_pairs():
+    """Computes the popular pairs aggregates and publishes them in the cache."""
+    version = publish_popular_pairs(compute_popular_pairs())
+    return (True, f"Published Popular Pairs Version {version}")
+
+
+@app.task
+def rollup_conversion_counters():
+    """Compacts the conversion counter buckets and applies their retention limits."""
+    compacted, rolled_up, expired = rollup_buckets()
+    return (True, f"Compacted {compacted}, Rolled Up {rolled_up} And Expired {expired} Buckets")
@@ -0,0 +1,89 @@
+"""Test suite for the admin."""
+from datetime import datetime
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from raterapid.users.tests.factory import UserFactory
+
+from ..models import BucketGranularity, ConversionCounterBucket, CurrencyConversion
+
+
+class AdminChangelistTestCase(TestCase):
+    """Test suite for the changelists of the rate models."""
+
+    def setUp(self):
+        """Set Up Method."""
+        cache.clear()
+        self.client.force_login(UserFactory.create(is_staff=True, is_superuser=True))
+        CurrencyConversion.objects.create(from_currency="USD", to_currency="EUR", shard=0, count=3)
+        CurrencyConversion.objects.create(from_currency="USD", to_currency="EUR", shard=1, count=4)
+        CurrencyConversion.objects.create(from_currency="EUR", to_currency="EGP", shard=0, count=1)
+
+    def changelist(self, model_name, query=""):
+        """Returns the admin changelist page of the given rate model."""
+        return self.client.get(f"/{settings.ADMIN_URL}rate/{model_name}/{query}")
+
+    def test_conversion_changelist_shows_totals_and_facets(self):
+        """Test the pairs are listed once with their total, and the filters show the requests of each currency."""
+        response = self.changelist("currencyconversion")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(row.from_currency, row.total_count) for row in response.context["cl"].result_list],
+            [("USD", 7), ("EUR", 1)],
+        )
+        self.assertContains(response, "Usd (7)")
+        self.assertContains(response, "Egp (0)")
+
+    def test_facets_are_cached(self):
+        """Test the facets are served from the cache, without aggregating the table again."""
+        self.changelist("currencyconversion")
+        CurrencyConversion.objects.create(from_currency="EGP", to_currency="USD", shard=0, count=9)
+
+        response = self.changelist("currencyconversion")
+
+        self.assertContains(response, "Egp (0)")
+
+    def test_bucket_changelist_avoids_full_count(self):
+        """Test the bucket changelist joins the users, and runs neither the full result count nor a date hierarchy."""
+        for day in range(1, 4):
+            ConversionCounterBucket.objects.create(
+                from_currency="USD",
+                to_currency="EUR",
+                user=UserFactory.create(),
+                granularity=BucketGranularity.DAY,
+                bucket_start=datetime(2023, 7, day, tzinfo=dt_timezone.utc),
+                count=day,
+            )
+        self.changelist("conversioncounterbucket")
+
+        with self.assertNumQueries(4):
+            response = self.changelist("conversioncounterbucket", "?from_currency__exact=USD")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.context["cl"].full_result_count)
+        self.assertContains(response, "Day (6)")
+
+    def test_search_matches_codes_exactly(self):
+        """Test searches match the currency codes whatever their case, with equalities the indexes serve."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.changelist("currencyconversion", "?q=egp")
+
+        self.assertEqual([row.to_currency for row in response.context["cl"].result_list], ["EGP"])
+        lookups = [query["sql"] for query in queries.captured_queries if "'EGP'" in query["sql"]]
+        self.assertTrue(lookups)
+        self.assertFalse(any("UPPER" in sql or "LIKE" in sql for sql in lookups))
+
+    def test_conversion_change_page_shows_pair_total(self):
+        """Test the page of a pair shows the count summed over its shards rather than the count of one shard."""
+        pair = CurrencyConversion.objects.get(from_currency="USD", to_currency="EUR", shard=0)
+
+        response = self.client.get(f"/{settings.ADMIN_URL}rate/currencyconversion/{pair.pk}/change/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '<div class="readonly">7</div>', html=True)
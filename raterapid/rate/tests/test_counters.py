@@ -0,0 +1,121 @@
+"""Test suite for the conversion counters."""
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from threading import Event
+from unittest.mock import patch
+
+from django.db.models import Sum
+from django.test import TestCase, override_settings
+
+from ..counters import ConversionCounterBuffer, rollup_buckets
+from ..models import BucketGranularity, ConversionCounterBucket
+
+NOW = datetime(2023, 7, 10, 12, 30, tzinfo=dt_timezone.utc)
+
+
+def create_bucket(bucket_start, count=1, granularity=BucketGranularity.HOUR, from_currency="USD"):
+    """Creates a conversion counter bucket."""
+    return ConversionCounterBucket.objects.create(
+        from_currency=from_currency,
+        to_currency="EUR",
+        granularity=granularity,
+        bucket_start=bucket_start,
+        count=count,
+    )
+
+
+class ConversionCounterBufferTestCase(TestCase):
+    """Test suite for ConversionCounterBuffer."""
+
+    @override_settings(CONVERSION_COUNTER_FLUSH_SIZE=100, CONVERSION_COUNTER_FLUSH_INTERVAL=3600)
+    def test_add_buffers_until_flush(self):
+        """Test increments stay in memory until the buffer is flushed, then land in one bucket per pair."""
+        buffer = ConversionCounterBuffer()
+        for _ in range(3):
+            buffer.add("USD", "EUR")
+        buffer.add("USD", "GBP")
+
+        self.assertFalse(ConversionCounterBucket.objects.exists())
+        buffer.flush()
+
+        counts = dict(ConversionCounterBucket.objects.values_list("to_currency", "count"))
+        self.assertEqual(counts, {"EUR": 3, "GBP": 1})
+
+    @override_settings(CONVERSION_COUNTER_FLUSH_SIZE=2, CONVERSION_COUNTER_FLUSH_INTERVAL=3600)
+    def test_add_flushes_when_full(self):
+        """Test the buffer is flushed once CONVERSION_COUNTER_FLUSH_SIZE increments are pending."""
+        buffer = ConversionCounterBuffer()
+        buffer.add("USD", "EUR")
+        buffer.add("USD", "EUR")
+        buffer.add("USD", "EUR")
+
+        self.assertEqual(ConversionCounterBucket.objects.get().count, 2)
+
+    @override_settings(CONVERSION_COUNTER_FLUSH_SIZE=100, CONVERSION_COUNTERS_PER_USER=False)
+    def test_add_ignores_user_unless_enabled(self):
+        """Test users are not tracked unless CONVERSION_COUNTERS_PER_USER is set."""
+        buffer = ConversionCounterBuffer()
+        buffer.add("USD", "EUR", user_id=1)
+        buffer.flush()
+
+        self.assertIsNone(ConversionCounterBucket.objects.get().user_id)
+
+    @override_settings(CONVERSION_COUNTER_FLUSH_SIZE=100, CONVERSION_COUNTER_FLUSH_INTERVAL=0.05)
+    def test_started_buffer_flushes_when_idle(self):
+        """Test a started buffer is flushed once the interval has passed, without another increment."""
+        buffer = ConversionCounterBuffer()
+        flushed = Event()
+        buffer.add("USD", "EUR")
+
+        with patch.object(buffer, "flush", side_effect=flushed.set):
+            buffer.start()
+            buffer.start()
+            self.addCleanup(buffer.stop)
+
+            self.assertTrue(flushed.wait(timeout=5))
+
+
+@override_settings(
+    CONVERSION_COUNTER_COMPACT_HOURS=3,
+    CONVERSION_HOURLY_RETENTION_HOURS=48,
+    CONVERSION_DAILY_RETENTION_DAYS=30,
+)
+class RollupBucketsTestCase(TestCase):
+    """Test suite for rollup_buckets."""
+
+    def test_rollup_compacts_closed_hours(self):
+        """Test the rows of a closed hour are merged, while the current hour is left alone."""
+        last_hour = NOW.replace(minute=0) - timedelta(hours=1)
+        for _ in range(3):
+            create_bucket(last_hour, count=2)
+            create_bucket(NOW.replace(minute=0))
+
+        compacted, _, _ = rollup_buckets(now=NOW)
+
+        self.assertEqual(compacted, 2)
+        self.assertEqual(ConversionCounterBucket.objects.filter(bucket_start=last_hour).get().count, 6)
+        self.assertEqual(ConversionCounterBucket.objects.filter(bucket_start=NOW.replace(minute=0)).count(), 3)
+
+    def test_rollup_moves_old_hours_into_days(self):
+        """Test hourly buckets past the retention are rolled up into a daily bucket without losing counts."""
+        old_day = (NOW - timedelta(days=5)).replace(hour=0, minute=0)
+        for hour in range(4):
+            create_bucket(old_day + timedelta(hours=hour), count=hour + 1)
+
+        _, rolled_up, _ = rollup_buckets(now=NOW)
+
+        daily = ConversionCounterBucket.objects.get()
+        self.assertEqual(rolled_up, 3)
+        self.assertEqual(daily.granularity, BucketGranularity.DAY)
+        self.assertEqual(daily.bucket_start, old_day)
+        self.assertEqual(daily.count, 10)
+
+    def test_rollup_expires_old_days(self):
+        """Test daily buckets older than CONVERSION_DAILY_RETENTION_DAYS are deleted."""
+        create_bucket(NOW - timedelta(days=31), granularity=BucketGranularity.DAY)
+        create_bucket(NOW - timedelta(days=29), count=5, granularity=BucketGranularity.DAY)
+
+        _, _, expired = rollup_buckets(now=NOW)
+
+        self.assertEqual(expired, 1)
+        self.assertEqual(ConversionCounterBucket.objects.aggregate(total=Sum("count"))["total"], 5)
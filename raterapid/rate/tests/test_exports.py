@@ -0,0 +1,59 @@
+"""Test suite for the CSV exports."""
+import csv
+import io
+from datetime import datetime
+from datetime import timezone as dt_timezone
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from ..exports import csv_response
+from ..models import BucketGranularity, ConversionCounterBucket, CurrencyConversion
+
+
+class ExportTestCase(TestCase):
+    """Test suite for the CSV exports of the conversion statistics."""
+
+    def setUp(self):
+        """Set Up Method."""
+        CurrencyConversion.objects.create(from_currency="USD", to_currency="EUR", shard=0, count=3)
+        CurrencyConversion.objects.create(from_currency="USD", to_currency="EUR", shard=1, count=4)
+        CurrencyConversion.objects.create(from_currency="EUR", to_currency="EGP", shard=0, count=1)
+        for granularity, day in ((BucketGranularity.DAY, 1), (BucketGranularity.HOUR, 2)):
+            ConversionCounterBucket.objects.create(
+                from_currency="USD",
+                to_currency="EUR",
+                granularity=granularity,
+                bucket_start=datetime(2023, 7, day, tzinfo=dt_timezone.utc),
+                count=day * 10,
+            )
+
+    def export(self, *args):
+        """Runs the export command and returns the parsed CSV rows."""
+        output = io.StringIO()
+        call_command("export_conversions", *args, stdout=output)
+        return list(csv.reader(io.StringIO(output.getvalue())))
+
+    def test_export_sums_shards(self):
+        """Test the pairs are exported once each, with the count summed over their shards."""
+        rows = self.export()
+
+        self.assertEqual(rows[0][:4], ["base", "target", "count", "shards"])
+        self.assertEqual([row[:4] for row in rows[1:]], [["EUR", "EGP", "1", "1"], ["USD", "EUR", "7", "2"]])
+
+    def test_export_buckets(self):
+        """Test the buckets are exported oldest first and can be filtered by granularity."""
+        rows = self.export("--buckets")
+        hourly_rows = self.export("--buckets", "--granularity", "hour")
+
+        self.assertEqual([(row[3], row[5]) for row in rows[1:]], [("day", "10"), ("hour", "20")])
+        self.assertEqual([(row[3], row[5]) for row in hourly_rows[1:]], [("hour", "20")])
+
+    def test_csv_response_streams(self):
+        """Test the response is streamed as an unbuffered CSV attachment."""
+        response = csv_response(iter([("base", "count"), ("USD", 1)]), "conversions")
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["X-Accel-Buffering"], "no")
+        self.assertIn("attachment;", response["Content-Disposition"])
+        self.assertEqual(b"".join(response.streaming_content), b"base,count\r\nUSD,1\r\n")
@@ -0,0 +1,88 @@
+"""Test suite for the rate history."""
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+
+from django.test import TestCase, override_settings
+
+from ..history import changes_since, rates_at, record_rates
+from ..models import RateChange, RateSnapshot
+
+START = datetime(2023, 7, 1, tzinfo=dt_timezone.utc)
+RATES = {"USD": 1.0, "EUR": 0.9, "EGP": 30.9, "GBP": 0.78, "JPY": 144.1}
+
+
+@override_settings(RATE_KEYFRAME_INTERVAL=24 * 60 * 60)
+class RateHistoryTestCase(TestCase):
+    """Test suite for the rate history."""
+
+    def test_record_stores_only_changes(self):
+        """Test the first record takes a keyframe, and later records only store the changed rates."""
+        self.assertEqual(record_rates(RATES, START), (True, 0))
+        self.assertEqual(record_rates(RATES, START + timedelta(minutes=30)), (False, 0))
+        self.assertEqual(record_rates({**RATES, "EUR": 0.91}, START + timedelta(hours=1)), (False, 1))
+
+        self.assertEqual(RateSnapshot.objects.count(), 1)
+        self.assertEqual(list(RateChange.objects.values_list("currency", "rate")), [("EUR", 0.91)])
+
+    def test_rates_at_reconstructs_any_moment(self):
+        """Test the rates are reconstructed as they were at any moment, including removed currencies."""
+        record_rates(RATES, START)
+        record_rates({**RATES, "EUR": 0.91}, START + timedelta(hours=1))
+        without_jpy = {currency: rate for currency, rate in RATES.items() if currency != "JPY"}
+        record_rates({**without_jpy, "EUR": 0.92}, START + timedelta(hours=2))
+
+        self.assertIsNone(rates_at(START - timedelta(seconds=1)))
+        self.assertEqual(rates_at(START + timedelta(minutes=59)), RATES)
+        self.assertEqual(rates_at(START + timedelta(hours=1)), {**RATES, "EUR": 0.91})
+        self.assertEqual(rates_at(START + timedelta(hours=3)), {**without_jpy, "EUR": 0.92})
+
+    def test_record_takes_periodic_keyframes(self):
+        """Test a new keyframe is taken once RATE_KEYFRAME_INTERVAL has passed, and the change is still logged."""
+        record_rates(RATES, START)
+        keyframe_taken, changes = record_rates({**RATES, "EUR": 0.95}, START + timedelta(days=1))
+
+        self.assertTrue(keyframe_taken)
+        self.assertEqual(changes, 1)
+        self.assertEqual(RateSnapshot.objects.count(), 2)
+        self.assertEqual(rates_at(START + timedelta(days=2)), {**RATES, "EUR": 0.95})
+
+    def test_record_takes_keyframe_when_changes_outgrow_it(self):
+        """Test a new keyframe is taken when the changes would outgrow a full table."""
+        record_rates(RATES, START)
+        for hour in range(1, 4):
+            record_rates(
+                {currency: rate * (1 + hour / 100) for currency, rate in RATES.items()}, START + timedelta(hours=hour)
+            )
+
+        self.assertEqual(RateSnapshot.objects.count(), 3)
+        self.assertEqual(RateChange.objects.count(), 15)
+
+    def test_changes_since(self):
+        """Test the changes are returned oldest first, after the given moment and up to the limit."""
+        record_rates(RATES, START)
+        record_rates({**RATES, "EUR": 0.91}, START + timedelta(hours=1))
+        record_rates({**RATES, "EUR": 0.92, "EGP": 31.0}, START + timedelta(hours=2))
+
+        changes = changes_since(START + timedelta(minutes=30))
+
+        self.assertEqual(
+            [(change["currency"], change["rate"]) for change in changes], [("EUR", 0.91), ("EUR", 0.92), ("EGP", 31.0)]
+        )
+        self.assertEqual(len(changes_since(START, limit=2)), 2)
+        self.assertEqual(changes_since(START + timedelta(hours=2)), [])
+
+    def test_changes_since_pages_within_a_refresh(self):
+        """Test paging by (changed_at, id) resumes within a refresh cut by the limit instead of skipping its rest."""
+        record_rates({currency: 1.0 for currency in "ABCDEFGHIJKL"}, START)
+        record_rates({currency: 2.0 for currency in "ABCDEFGHIJKL"}, START + timedelta(hours=1))
+
+        pages, since, after_id = [], START, None
+        while True:
+            changes = changes_since(since, after_id, limit=5)
+            if not changes:
+                break
+            pages.append(changes)
+            since, after_id = changes[-1]["changed_at"], changes[-1]["id"]
+
+        self.assertEqual([len(page) for page in pages], [5, 5, 2])
+        self.assertEqual(sorted(change["currency"] for page in pages for change in page), list("ABCDEFGHIJKL"))
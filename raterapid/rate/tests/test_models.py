@@ -0,0 +1,54 @@
+"""Test suite for models."""
+from django.test import TestCase, override_settings
+
+from ..models import CurrencyConversion
+
+
+class CurrencyConversionTestCase(TestCase):
+    """Test suite for CurrencyConversion."""
+
+    def test_get_or_increment_creates_pair(self):
+        """Test the first conversion of a pair creates a shard row with a count of one."""
+        CurrencyConversion.get_or_increment("USD", "EUR")
+
+        self.assertEqual(CurrencyConversion.objects.get(from_currency="USD", to_currency="EUR").count, 1)
+
+    @override_settings(CURRENCY_CONVERSION_SHARDS=1)
+    def test_get_or_increment_increments_pair(self):
+        """Test later conversions of a pair increment its count in place."""
+        CurrencyConversion.get_or_increment("USD", "EUR")
+        CurrencyConversion.get_or_increment("USD", "EUR")
+        CurrencyConversion.get_or_increment("EUR", "USD")
+
+        self.assertEqual(CurrencyConversion.objects.get(from_currency="USD", to_currency="EUR").count, 2)
+        self.assertEqual(CurrencyConversion.objects.get(from_currency="EUR", to_currency="USD").count, 1)
+
+    @override_settings(CURRENCY_CONVERSION_SHARDS=4)
+    def test_get_or_increment_spreads_over_shards(self):
+        """Test conversions of a pair are spread over the shards and summed on read."""
+        for _ in range(40):
+            CurrencyConversion.get_or_increment("USD", "EUR")
+        CurrencyConversion.get_or_increment("EUR", "USD")
+
+        shards = CurrencyConversion.objects.filter(from_currency="USD", to_currency="EUR")
+        self.assertGreater(shards.count(), 1)
+        self.assertLessEqual(shards.count(), 4)
+        self.assertEqual(CurrencyConversion.total("USD", "EUR"), 40)
+        self.assertEqual(CurrencyConversion.total("EUR", "EGP"), 0)
+
+    def test_with_totals_lists_one_row_per_pair(self):
+        """Test with_totals annotates one row per pair with the sum and number of its shards."""
+        CurrencyConversion.objects.create(from_currency="USD", to_currency="EUR", shard=0, count=3)
+        CurrencyConversion.objects.create(from_currency="USD", to_currency="EUR", shard=5, count=4)
+        CurrencyConversion.objects.create(from_currency="EUR", to_currency="USD", shard=2, count=1)
+
+        rows = {
+            (row.from_currency, row.to_currency): (row.total_count, row.shard_count)
+            for row in CurrencyConversion.objects.with_totals()
+        }
+
+        self.assertEqual(rows, {("USD", "EUR"): (7, 2), ("EUR", "USD"): (1, 1)})
+        self.assertEqual(
+            list(CurrencyConversion.objects.pair_totals().values_list("from_currency", "to_currency", "total_count")),
+            [("USD", "EUR", 7), ("EUR", "USD", 1)],
+        )
@@ -0,0 +1,86 @@
+"""Test suite for serializers."""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.http import QueryDict
+from django.test import SimpleTestCase, override_settings
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from ..serializers import (
+    ConversionRequestValidator,
+    ConversionResponseBuilder,
+    CurrencyConversionResponseSerializer,
+    CurrencyConversionSerializer,
+)
+
+
+class ConversionFastPathTestCase(SimpleTestCase):
+    """Test suite for the lean conversion validator and response builder."""
+
+    def test_validator_matches_serializer(self):
+        """Test the validator returns the same data and errors as CurrencyConversionSerializer."""
+        payloads = [
+            {"from_currency": "USD", "to_currency": "EUR", "amount": "100"},
+            {"from_currency": "USD", "to_currency": "EGP", "amount": 12.5},
+            {"from_currency": "USD", "to_currency": "XYZ", "amount": "100"},
+            {"from_currency": "USD", "amount": "1.234"},
+            {"from_currency": "EUR", "to_currency": "USD", "amount": "123456789"},
+            {"from_currency": "EUR", "to_currency": "USD", "amount": "nan"},
+            QueryDict("from_currency=USD&to_currency=EUR&amount=100"),
+            QueryDict("from_currency=USD&to_currency=EUR&amount="),
+        ]
+        for payload in payloads:
+            serializer = CurrencyConversionSerializer(data=payload)
+            serializer.is_valid()
+
+            validated_data, errors = ConversionRequestValidator.validate(payload)
+
+            self.assertEqual(errors, serializer.errors)
+            if not errors:
+                self.assertEqual(validated_data, serializer.validated_data)
+                self.assertEqual(validated_data["amount"], Decimal(str(payload["amount"])).quantize(Decimal("0.01")))
+
+    def test_validator_rejects_non_mapping(self):
+        """Test a body other than an object, e.g. a JSON list, gets the serializer's non_field_errors."""
+        for payload in ([], "x"):
+            serializer = CurrencyConversionSerializer(data=payload)
+            serializer.is_valid()
+
+            validated_data, errors = ConversionRequestValidator.validate(payload)
+
+            self.assertEqual(validated_data, {})
+            self.assertEqual(errors, serializer.errors)
+        self.assertEqual(errors, {"non_field_errors": ["Invalid data. Expected a dictionary, but got str."]})
+
+    def test_builder_matches_serializer(self):
+        """Test the builder returns the same response as CurrencyConversionResponseSerializer."""
+        response_data = {"last_updated": "2023-06-30T10:00:00Z", "amount": 85, "base": "USD", "target": "EUR"}
+        serializer = CurrencyConversionResponseSerializer(data=response_data)
+        serializer.is_valid()
+
+        response = ConversionResponseBuilder.build(response_data)
+
+        self.assertEqual(list(response), list(serializer.validated_data))
+        for field_name in ("last_updated", "amount", "base", "target"):
+            self.assertEqual(response[field_name], serializer.validated_data[field_name])
+        self.assertLessEqual(response["time_now"], timezone.now())
+
+    def test_builder_invalid_last_updated(self):
+        """Test the builder rejects an invalid last_updated like the serializer does."""
+        with self.assertRaises(ValidationError) as context:
+            ConversionResponseBuilder.build({"last_updated": "yesterday", "amount": 1, "base": "USD", "target": "EUR"})
+
+        self.assertIn("last_updated", context.exception.detail)
+
+    @override_settings(CONVERSION_STALE_AFTER=3600)
+    def test_builder_flags_stale_rates(self):
+        """Test responses computed from rates that missed a refresh, older than CONVERSION_STALE_AFTER, are stale."""
+        response_data = {"amount": 1, "base": "USD", "target": "EUR"}
+
+        refreshed_at = timezone.now() - timedelta(minutes=29)
+        fresh = ConversionResponseBuilder.build({**response_data, "last_updated": refreshed_at})
+        stale = ConversionResponseBuilder.build({**response_data, "last_updated": timezone.now() - timedelta(days=1)})
+
+        self.assertFalse(fresh["stale"])
+        self.assertTrue(stale["stale"])
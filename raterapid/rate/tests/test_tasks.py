@@ -0,0 +1,175 @@
+"""Test suite for tasks."""
+import os
+import tempfile
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from raterapid.utils.cache_lock import CacheLease
+from raterapid.utils.currency_clients import get_api_rates_version, rates_digest
+from raterapid.utils.offline_snapshot import OfflineSnapshot
+
+from ..tasks import cache_api_rates, cached_rates_are_fresh, publish_api_rates
+
+
+class CacheAPIRatesTaskTestCase(TestCase):
+    """Test suite for the cache_api_rates task."""
+
+    def setUp(self):
+        """Set Up Method."""
+        cache.clear()
+
+    @patch("raterapid.rate.tasks.get_latest_rates")
+    def test_cache_api_rates_successful(self, mock_rates):
+        """Test the rates are cached along with the fencing token of the refresh."""
+        mock_rates.return_value = (True, {"USD": 1.0, "EUR": 0.85})
+
+        success, _ = cache_api_rates()
+
+        self.assertTrue(success)
+        self.assertEqual(cache.get("api_rates")["rate"], {"USD": 1.0, "EUR": 0.85})
+        self.assertIn("fence", cache.get("api_rates"))
+        self.assertIsNone(cache.get("lease:cache_api_rates"))
+
+    @patch("raterapid.rate.tasks.get_latest_rates")
+    def test_cache_api_rates_writes_offline_snapshot(self, mock_rates):
+        """Test the refreshed rates are written to the offline snapshot file."""
+        mock_rates.return_value = (True, {"USD": 1.0, "EUR": 0.85})
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "rates.snapshot")
+            with override_settings(OFFLINE_RATES_PATH=path):
+                cache_api_rates()
+            snapshot = OfflineSnapshot(path)
+            self.assertEqual(snapshot.rate("EUR"), 0.85)
+            snapshot.close()
+
+    @patch("raterapid.rate.tasks.record_rates", side_effect=RuntimeError)
+    @patch("raterapid.rate.tasks.get_latest_rates")
+    def test_cache_api_rates_does_not_retry_after_publishing(self, mock_rates, mock_record_rates):
+        """Test a failure after the rates are published is logged, without calling the providers again."""
+        mock_rates.return_value = (True, {"USD": 1.0, "EUR": 0.85})
+
+        with self.assertLogs("raterapid.rate.tasks", "ERROR"):
+            success, _ = cache_api_rates(force=True)
+
+        self.assertTrue(success)
+        mock_rates.assert_called_once()
+        self.assertEqual(cache.get("api_rates")["rate"], {"USD": 1.0, "EUR": 0.85})
+
+    @override_settings(RATES_TABLE_MIN_SHARE=0.8)
+    @patch("raterapid.rate.tasks.publish_rate_graph")
+    @patch("raterapid.rate.tasks.get_latest_rates")
+    def test_cache_api_rates_keeps_rate_graph_over_partial_table(self, mock_rates, mock_publish_graph):
+        """Test a table that lost most of the cached currencies does not rebuild the rate graph."""
+        cache.set("api_rates", {"rate": {"USD": 1.0, "EUR": 0.85, "GBP": 0.78, "EGP": 30.9}, "updated_at": "x"})
+        mock_rates.return_value = (True, {"USD": 1.0})
+
+        cache_api_rates(force=True)
+
+        mock_publish_graph.assert_not_called()
+
+    @patch("raterapid.rate.tasks.get_latest_rates")
+    def test_cache_api_rates_skips_fresh_rates(self, mock_rates):
+        """Test no provider is called while the cached rates are still fresh."""
+        cache.set("api_rates", {"rate": {"USD": 1.0}, "updated_at": str(timezone.now())})
+
+        success, _ = cache_api_rates()
+
+        self.assertTrue(success)
+        mock_rates.assert_not_called()
+
+    @patch("raterapid.rate.tasks.get_latest_rates")
+    def test_cache_api_rates_refreshes_stale_rates(self, mock_rates):
+        """Test stale cached rates are refreshed."""
+        mock_rates.return_value = (True, {"USD": 1.0, "EUR": 0.9})
+        cache.set("api_rates", {"rate": {"USD": 1.0}, "updated_at": str(timezone.now() - timedelta(hours=1))})
+
+        success, _ = cache_api_rates()
+
+        self.assertTrue(success)
+        self.assertEqual(cache.get("api_rates")["rate"]["EUR"], 0.9)
+
+    @patch("raterapid.rate.tasks.get_latest_rates")
+    def test_cache_api_rates_skips_while_locked(self, mock_rates):
+        """Test only one refresh talks to the providers at a time."""
+        lease = CacheLease("cache_api_rates", timeout=60)
+        lease.acquire()
+
+        success, _ = cache_api_rates(force=True)
+
+        self.assertFalse(success)
+        mock_rates.assert_not_called()
+
+    @override_settings(CACHE_API_RATE_JITTER=60)
+    @patch("raterapid.rate.tasks.time.sleep")
+    @patch("raterapid.rate.tasks.get_latest_rates")
+    def test_cache_api_rates_forced_without_jitter(self, mock_rates, mock_sleep):
+        """Test forced refreshes are not delayed by the jitter of the scheduled ones."""
+        mock_rates.return_value = (True, {"USD": 1.0, "EUR": 0.9})
+
+        cache_api_rates(force=True)
+        mock_sleep.assert_not_called()
+        cache_api_rates()
+        mock_sleep.assert_called_once()
+
+    def test_publish_api_rates_rejects_older_fence(self):
+        """Test a refresh holding an older fencing token cannot overwrite newer rates."""
+        self.assertTrue(publish_api_rates({"EUR": 0.9}, fence=5))
+
+        self.assertFalse(publish_api_rates({"EUR": 0.8}, fence=4))
+        self.assertEqual(cache.get("api_rates")["rate"], {"EUR": 0.9})
+
+    def test_publish_api_rates_fence_advances_on_unchanged_rates(self):
+        """Test confirming unchanged rates under a newer fence still rejects the older fences in between."""
+        self.assertTrue(publish_api_rates({"EUR": 0.9}, fence=5))
+        self.assertTrue(publish_api_rates({"EUR": 0.9}, fence=7))
+
+        self.assertFalse(publish_api_rates({"EUR": 0.8}, fence=6))
+        self.assertEqual(cache.get("api_rates")["rate"], {"EUR": 0.9})
+
+    def test_publish_api_rates_stale_writer_loses_race(self):
+        """Test a stale refresh overtaken between its fence check and its write does not overwrite the newer rates."""
+
+        def overtaking_digest(rates):
+            # A newer refresh publishes while the stale one is past its check.
+            mock_digest.side_effect = rates_digest
+            publish_api_rates({"EUR": 0.95}, fence=7)
+            return rates_digest(rates)
+
+        self.assertTrue(publish_api_rates({"EUR": 0.9}, fence=5))
+        with patch("raterapid.rate.api_rates.rates_digest", side_effect=overtaking_digest) as mock_digest:
+            self.assertFalse(publish_api_rates({"EUR": 0.8}, fence=6))
+
+        self.assertEqual(cache.get("api_rates")["rate"], {"EUR": 0.95})
+
+    def test_publish_api_rates_skips_unchanged_rates(self):
+        """Test identical rates are not written again and keep their version, while their freshness is renewed."""
+        self.assertTrue(publish_api_rates({"EUR": 0.9, "EGP": 30.9}, fence=1))
+        cached_data = cache.get("api_rates")
+        version = get_api_rates_version()
+        cache.set("api_rates_checked_at", str(timezone.now() - timedelta(hours=1)), timeout=None)
+
+        self.assertTrue(publish_api_rates({"EGP": 30.9, "EUR": 0.9}, fence=2))
+
+        self.assertEqual(cache.get("api_rates"), cached_data)
+        self.assertEqual(get_api_rates_version(), version)
+        self.assertTrue(cached_rates_are_fresh())
+
+    def test_publish_api_rates_bumps_version_monotonically(self):
+        """Test changed rates get a greater version, even after the version counter was evicted."""
+        publish_api_rates({"EUR": 0.9}, fence=1)
+        first_version = get_api_rates_version()
+        publish_api_rates({"EUR": 0.91}, fence=2)
+        second_version = get_api_rates_version()
+        cache.delete("api_rates_version")
+
+        self.assertEqual(get_api_rates_version(), second_version)
+        publish_api_rates({"EUR": 0.92}, fence=3)
+
+        self.assertGreater(second_version, first_version)
+        self.assertGreater(get_api_rates_version(), second_version)
+        self.assertEqual(cache.get("api_rates")["version"], get_api_rates_version())
@@ -1,13 +1,23 @@
 """Test suite for views."""
+from datetime import timedelta
+from decimal import Decimal
 from unittest.mock import patch
 
 from django.contrib.auth.models import User
-from django.test import RequestFactory, TestCase
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework.authtoken.models import Token
 from rest_framework.test import force_authenticate
 
-from ..views import CurrencyConversionView
+from raterapid.utils.currency_clients import bump_api_rates_version, get_api_rates_version
+
+from ..analytics import compute_popular_pairs, get_popular_pairs, publish_popular_pairs
+from ..history import record_rates
+from ..models import CurrencyConversion
+from ..response_cache import get_cached_response
+from ..views import CurrencyConversionView, PopularPairsView, RateChangesView, RateHistoryView
 
 
 class CurrencyConversionViewTestCase(TestCase):
@@ -47,6 +57,14 @@ class CurrencyConversionViewTestCase(TestCase):
         response = self.view(request)
         self.assertEqual(response.status_code, 400)
 
+    def test_currency_conversion_non_object_body(self):
+        """Test a JSON body other than an object is rejected with a 400."""
+        request = self.factory.post(reverse("rate:conversion"), "[]", content_type="application/json")
+        force_authenticate(request, user=self.user, token=self.token)
+        response = self.view(request)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {"non_field_errors": ["Invalid data. Expected a dictionary, but got list."]})
+
     def test_currency_conversion_unauthenticated(self):
         """Test for unauthenticated currency conversion request."""
         request = self.factory.post(
@@ -54,3 +72,156 @@ class CurrencyConversionViewTestCase(TestCase):
         )
         response = self.view(request)
         self.assertEqual(response.status_code, 401)  # HTTP_401_UNAUTHORIZED
+
+    @override_settings(CONVERSION_RESPONSE_CACHE_TTL=30)
+    @patch("raterapid.rate.views.pair_conversion")
+    def test_currency_conversion_response_cache(self, mock_pair_conversion):
+        """Test identical conversions are answered from the response cache until new rates are published."""
+        cache.clear()
+        mock_pair_conversion.return_value = (True, 85.0, timezone.now())
+        data = {"from_currency": "USD", "to_currency": "EUR", "amount": "100.00"}
+
+        for _ in range(2):
+            request = self.factory.post(reverse("rate:conversion"), data)
+            force_authenticate(request, user=self.user, token=self.token)
+            response = self.view(request)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data["amount"], 85.0)
+        self.assertEqual(mock_pair_conversion.call_count, 1)
+        self.assertEqual(CurrencyConversion.total("USD", "EUR"), 1)
+
+        bump_api_rates_version()
+        request = self.factory.post(reverse("rate:conversion"), data)
+        force_authenticate(request, user=self.user, token=self.token)
+        self.view(request)
+        self.assertEqual(mock_pair_conversion.call_count, 2)
+
+    @override_settings(CONVERSION_RESPONSE_CACHE_TTL=30)
+    @patch("raterapid.rate.views.pair_conversion")
+    def test_response_computed_before_a_publish_is_cached_under_its_version(self, mock_pair_conversion):
+        """Test a response computed while new rates are published is not cached under the new version."""
+        cache.clear()
+        old_version = bump_api_rates_version()
+
+        def convert_during_publish(*args, **kwargs):
+            bump_api_rates_version()
+            return True, 85.0, timezone.now()
+
+        mock_pair_conversion.side_effect = convert_during_publish
+        request = self.factory.post(
+            reverse("rate:conversion"), {"from_currency": "USD", "to_currency": "EUR", "amount": "100.00"}
+        )
+        force_authenticate(request, user=self.user, token=self.token)
+        self.view(request)
+
+        amount = Decimal("100.00")
+        self.assertIsNone(get_cached_response("USD", "EUR", amount, get_api_rates_version()))
+        self.assertIsNotNone(get_cached_response("USD", "EUR", amount, old_version))
+
+
+class PopularPairsViewTestCase(TestCase):
+    """Test suite for PopularPairsView."""
+
+    def setUp(self):
+        """Set Up Method."""
+        cache.clear()
+        self.factory = RequestFactory()
+        self.user = User.objects.create_user(username="test", email="test@example.com", password="test")  # NOQA: S106
+        self.token = Token.objects.create(user=self.user)
+        self.view = PopularPairsView.as_view()
+
+    def get(self):
+        """Sends an authenticated request to the view."""
+        request = self.factory.get(reverse("rate:popular_pairs"))
+        force_authenticate(request, user=self.user, token=self.token)
+        return self.view(request)
+
+    def test_popular_pairs(self):
+        """Test the top pairs, totals and trends are served from the published aggregates."""
+        for _ in range(3):
+            CurrencyConversion.get_or_increment("USD", "EUR")
+        CurrencyConversion.get_or_increment("EUR", "EGP")
+        publish_popular_pairs(compute_popular_pairs())
+        CurrencyConversion.get_or_increment("EUR", "EGP")
+        publish_popular_pairs(compute_popular_pairs())
+
+        response = self.get()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["total_conversions"], 5)
+        self.assertEqual(response.data["total_conversions_change"], 1)
+        self.assertEqual(response.data["total_pairs"], 2)
+        self.assertEqual(
+            [(pair["base"], pair["target"], pair["count"], pair["change"]) for pair in response.data["top_pairs"]],
+            [("USD", "EUR", 3, 0), ("EUR", "EGP", 2, 1)],
+        )
+
+    def test_popular_pairs_served_from_cache(self):
+        """Test requests never query the conversions once the aggregates are published."""
+        publish_popular_pairs(compute_popular_pairs())
+
+        with self.assertNumQueries(0):
+            response = self.get()
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_popular_pairs_cold_cache(self):
+        """Test the aggregates are computed by the first request when they were never published."""
+        CurrencyConversion.get_or_increment("USD", "EUR")
+
+        response = self.get()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["total_conversions"], 1)
+        self.assertIsNotNone(get_popular_pairs())
+
+
+class RateHistoryViewTestCase(TestCase):
+    """Test suite for RateHistoryView and RateChangesView."""
+
+    def setUp(self):
+        """Set Up Method."""
+        self.factory = RequestFactory()
+        self.user = User.objects.create_user(username="test", email="test@example.com", password="test")  # NOQA: S106
+        self.token = Token.objects.create(user=self.user)
+        self.start = timezone.now() - timedelta(hours=2)
+        record_rates({"USD": 1.0, "EUR": 0.9}, self.start)
+        record_rates({"USD": 1.0, "EUR": 0.91}, self.start + timedelta(hours=1))
+
+    def get(self, view, url_name, params):
+        """Sends an authenticated request to the view."""
+        request = self.factory.get(reverse(url_name), params)
+        force_authenticate(request, user=self.user, token=self.token)
+        return view.as_view()(request)
+
+    def test_rate_history(self):
+        """Test the rates are served as they were at the requested moment, or now by default."""
+        past = self.get(RateHistoryView, "rate:history", {"at": (self.start + timedelta(minutes=5)).isoformat()})
+        latest = self.get(RateHistoryView, "rate:history", {})
+
+        self.assertEqual(past.data["rates"], {"USD": 1.0, "EUR": 0.9})
+        self.assertEqual(latest.data["rates"], {"USD": 1.0, "EUR": 0.91})
+
+    def test_rate_history_before_first_record(self):
+        """Test moments before the first record, and invalid moments, are rejected."""
+        missing = self.get(RateHistoryView, "rate:history", {"at": (self.start - timedelta(days=1)).isoformat()})
+        invalid = self.get(RateHistoryView, "rate:history", {"at": "yesterday"})
+
+        self.assertEqual(missing.status_code, 404)
+        self.assertEqual(invalid.status_code, 400)
+
+    def test_rate_changes(self):
+        """Test the changes after the given moment are served along with the moment to poll from next."""
+        response = self.get(RateChangesView, "rate:history_changes", {"since": self.start.isoformat()})
+        empty = self.get(
+            RateChangesView,
+            "rate:history_changes",
+            {"since": response.data["until"].isoformat(), "after_id": response.data["until_id"]},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(change["currency"], change["rate"]) for change in response.data["changes"]], [("EUR", 0.91)]
+        )
+        self.assertEqual(empty.data["changes"], [])
+        self.assertEqual(self.get(RateChangesView, "rate:history_changes", {}).status_code, 400)
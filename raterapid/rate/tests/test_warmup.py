@@ -0,0 +1,97 @@
+"""Test suite for the cache warm-up."""
+import io
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import OperationalError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from raterapid.utils.currency_clients import get_cached_api_rates
+from raterapid.utils.rate_graph import resolve_rate
+
+from ..analytics import get_popular_pairs
+from ..history import record_rates
+from ..warmup import warm_api_rates, warm_caches
+
+
+@override_settings(CACHE_API_RATE_FRESHNESS=3600)
+class WarmupTestCase(TestCase):
+    """Test suite for the cache warm-up."""
+
+    def setUp(self):
+        """Set Up Method."""
+        cache.clear()
+        self.fetched_at = timezone.now() - timedelta(minutes=10)
+        record_rates({"USD": 1.0, "EUR": 0.9}, self.fetched_at - timedelta(minutes=30))
+        record_rates({"USD": 1.0, "EUR": 0.91, "EGP": 30.9}, self.fetched_at)
+
+    def test_warm_api_rates_restores_last_recorded_rates(self):
+        """Test the last recorded rates are cached with the time they were fetched, along with the rate graph."""
+        self.assertTrue(warm_api_rates())
+
+        rates, updated_at = get_cached_api_rates()
+        self.assertEqual(rates, {"USD": 1.0, "EUR": 0.91, "EGP": 30.9})
+        self.assertEqual(updated_at, self.fetched_at)
+        self.assertAlmostEqual(resolve_rate("EUR", "EGP"), 30.9 / 0.91)
+
+    def test_warm_api_rates_keeps_cached_rates(self):
+        """Test rates already in the cache are not overwritten."""
+        cache.set("api_rates", {"rate": {"USD": 1.0}, "updated_at": str(timezone.now())})
+
+        self.assertFalse(warm_api_rates())
+        self.assertEqual(get_cached_api_rates()[0], {"USD": 1.0})
+
+    def test_warm_api_rates_after_eviction(self):
+        """Test rates evicted from the cache are restored even though the fence of their last refresh remains."""
+        cache.set("api_rates_fence", 7, timeout=None)
+
+        self.assertTrue(warm_api_rates())
+        self.assertEqual(get_cached_api_rates()[0], {"USD": 1.0, "EUR": 0.91, "EGP": 30.9})
+
+    def test_warm_caches(self):
+        """Test the rates and the statistics are warmed, and the restored rates are reported fresh."""
+        self.assertEqual(warm_caches(), {"api_rates": True, "popular_pairs": True, "fresh": True})
+        self.assertIsNotNone(get_popular_pairs())
+
+    @override_settings(CACHE_API_RATE_FRESHNESS=60)
+    @patch("raterapid.rate.management.commands.warm_caches.cache_api_rates")
+    def test_command_queues_refresh_of_stale_rates(self, mock_task):
+        """Test the command queues a refresh when the restored rates are no longer fresh."""
+        call_command("warm_caches", "--refresh", stdout=io.StringIO())
+
+        mock_task.delay.assert_called_once_with()
+
+    @patch("raterapid.rate.management.commands.warm_caches.cache_api_rates")
+    @patch("raterapid.rate.management.commands.warm_caches.warm_caches", side_effect=OperationalError)
+    def test_command_survives_unreachable_services(self, mock_warm_caches, mock_task):
+        """Test the command logs and carries on when the database or the broker is unreachable, so the app starts."""
+        stdout = io.StringIO()
+        with self.assertLogs("raterapid.rate.management.commands.warm_caches", "ERROR"):
+            call_command("warm_caches", "--refresh", stdout=stdout)
+
+        self.assertIn("Failed to warm the caches.", stdout.getvalue())
+        mock_task.delay.assert_not_called()
+
+        mock_warm_caches.side_effect = None
+        mock_warm_caches.return_value = {"api_rates": False, "popular_pairs": False, "fresh": False}
+        mock_task.delay.side_effect = OperationalError
+        with self.assertLogs("raterapid.rate.management.commands.warm_caches", "ERROR"):
+            call_command("warm_caches", "--refresh", stdout=stdout)
+
+        self.assertIn("Failed to queue a refresh of the rates.", stdout.getvalue())
+
+    def test_readiness(self):
+        """Test the readiness endpoint restores the rates before reporting ready."""
+        response = self.client.get(reverse("rate:ready"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(get_cached_api_rates()[0])
+
+    @patch("raterapid.rate.views.warm_api_rates", return_value=False)
+    def test_not_ready_without_rates(self, mock_warm):
+        """Test the instance is not ready while recorded rates could not be restored."""
+        self.assertEqual(self.client.get(reverse("rate:ready")).status_code, 503)
@@ -2,8 +2,12 @@
 """Rate App URLS."""
 from django.urls import path
 
-from .views import CurrencyConversionView
+from .views import CurrencyConversionView, PopularPairsView, RateChangesView, RateHistoryView, ReadinessView
 
 urlpatterns = [
     path("conversion/", CurrencyConversionView.as_view(), name="conversion"),
+    path("popular-pairs/", PopularPairsView.as_view(), name="popular_pairs"),
+    path("history/", RateHistoryView.as_view(), name="history"),
+    path("history/changes/", RateChangesView.as_view(), name="history_changes"),
+    path("ready/", ReadinessView.as_view(), name="ready"),
 ]
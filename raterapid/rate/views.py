@@ -5,16 +5,32 @@ import logging
 from datetime import datetime
 from typing import Dict, Optional, Tuple
 
-from rest_framework import status
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework import serializers, status
 from rest_framework.authentication import TokenAuthentication
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from raterapid.utils.currency_clients import pair_conversion
+from raterapid.core.profiling import profile_phase
+from raterapid.core.tracing import TRACEPARENT_HEADER, extract, start_span
+from raterapid.utils.cache_lock import CacheLease
+from raterapid.utils.currency_clients import get_api_rates_version, pair_conversion
+from raterapid.utils.deadline import Deadline
 
-from .models import CurrencyConversion
-from .serializers import CurrencyConversionResponseSerializer, CurrencyConversionSerializer
+from .analytics import compute_popular_pairs, get_popular_pairs, publish_popular_pairs
+from .counters import conversion_counters
+from .history import changes_since, rates_at
+from .models import CurrencyConversion, RateSnapshot
+from .response_cache import cache_response, get_cached_response
+from .serializers import (
+    ConversionRequestValidator,
+    ConversionResponseBuilder,
+    RateChangesSerializer,
+    RateHistorySerializer,
+)
+from .warmup import warm_api_rates
 
 logger = logging.getLogger(__name__)
 
@@ -26,30 +42,67 @@ class CurrencyConversionView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
-        """API POST HTTP method."""
-        serializer = CurrencyConversionSerializer(data=request.data)
+        """
+        API POST HTTP method.
 
-        if not serializer.is_valid():
-            logger.error(f"Currency conversion failed. Errors: {serializer.errors}")
-            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        The request is answered within the budget, in milliseconds, given by the ``X-Request-Deadline-Ms`` header,
+        or within ``CONVERSION_DEADLINE_MS`` if the header is missing. Identical conversions are answered from a
+        short-lived response cache when ``CONVERSION_RESPONSE_CACHE_TTL`` is set, without calling the providers or
+        counting the conversion again in the lifetime totals; the hourly counters count every answered request.
+        A ``traceparent`` header makes the trace of the conversion part of the caller's trace.
+        """
+        with start_span("CurrencyConversionView.post", parent=extract(request.headers.get(TRACEPARENT_HEADER))):
+            deadline = Deadline.from_header(request.headers.get("X-Request-Deadline-Ms"))
+            with profile_phase("serializer"):
+                validated_data, errors = ConversionRequestValidator.validate(request.data)
+
+            if errors:
+                logger.error("Currency conversion failed. Errors: %s", errors)
+                return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+            from_currency = validated_data["from_currency"]
+            to_currency = validated_data["to_currency"]
+            amount = validated_data["amount"]
 
-        from_currency = serializer.validated_data["from_currency"]
-        to_currency = serializer.validated_data["to_currency"]
-        amount = serializer.validated_data["amount"]
+            with profile_phase("cache"), start_span("cache.response"):
+                # Read once, so the response is stored under the version of the rates it is computed from.
+                rates_version = get_api_rates_version()
+                cached_response = get_cached_response(from_currency, to_currency, amount, rates_version)
+            if cached_response is not None:
+                with profile_phase("db"), start_span("db.conversion_counters"):
+                    conversion_counters.add(from_currency, to_currency, request.user.pk)
+                return Response({**cached_response, "time_now": timezone.now()}, status=status.HTTP_200_OK)
 
-        converted_amount, last_updated = self.convert_currency(from_currency, to_currency, amount)
-        if converted_amount is None or last_updated is None:
-            return Response(
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                data={"message": "Internal server error it is us not you."},
+            converted_amount, last_updated = self.convert_currency(
+                from_currency, to_currency, amount, deadline, user_id=request.user.pk
             )
-        response_data = self.create_response_data(from_currency, to_currency, float(converted_amount), last_updated)
+            if converted_amount is None or last_updated is None:
+                return Response(
+                    status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    data={"message": "Internal server error it is us not you."},
+                )
+            response_data = self.create_response_data(
+                from_currency, to_currency, float(converted_amount), last_updated
+            )
+
+            response = self.create_response(response_data)
+            if response.status_code == status.HTTP_200_OK:
+                with profile_phase("cache"), start_span("cache.response_write"):
+                    cache_response(from_currency, to_currency, amount, response.data, rates_version)
+            return response
 
-        return self.create_response(response_data)
+    def perform_authentication(self, request):
+        """Authenticates the request, timing it for the request profile."""
+        with profile_phase("auth"):
+            super().perform_authentication(request)
 
     @staticmethod
     def convert_currency(
-        from_currency: str, to_currency: str, amount: float
+        from_currency: str,
+        to_currency: str,
+        amount: float,
+        deadline: Optional[Deadline] = None,
+        user_id: Optional[int] = None,
     ) -> Tuple[Optional[float], Optional[datetime]]:
         """
         Converts an amount from one currency to another.
@@ -58,16 +111,22 @@ class CurrencyConversionView(APIView):
             from_currency (str): The base currency code (e.g. "USD").
             to_currency (str): The target currency code (e.g. "EUR").
             amount (float): The amount of base currency to be converted.
+            deadline (Optional[Deadline]): The deadline by which the conversion must be answered.
+            user_id (Optional[int]): The user who requested the conversion.
 
         Returns:
             Tuple[Optional[float], Optional[datetime]]: A tuple containing the converted amount and the last updated
             time of the rates used for conversion.
         """
-        success, converted_amount, last_updated = pair_conversion(from_currency, to_currency, amount)
+        success, converted_amount, last_updated = pair_conversion(
+            from_currency, to_currency, amount, deadline=deadline
+        )
         if not success:
             return None, None
-        CurrencyConversion.get_or_increment(from_currency, to_currency)
-        logger.info(f"Converted {amount} from {from_currency} to {to_currency}. Result: {converted_amount}")
+        with profile_phase("db"), start_span("db.currency_conversion"):
+            CurrencyConversion.get_or_increment(from_currency, to_currency)
+            conversion_counters.add(from_currency, to_currency, user_id)
+        logger.info("Converted %s from %s to %s. Result: %s", amount, from_currency, to_currency, converted_amount)
         return converted_amount, last_updated
 
     @staticmethod
@@ -104,9 +163,106 @@ class CurrencyConversionView(APIView):
             Response: A Response object containing the serialized response data.
             In case of serialization failure, it returns an error response.
         """
-        response_serializer = CurrencyConversionResponseSerializer(data=response_data)
-        if response_serializer.is_valid():
-            return Response(response_serializer.validated_data, status=status.HTTP_200_OK)
+        try:
+            with profile_phase("serializer"):
+                response_data = ConversionResponseBuilder.build(response_data)
+            return Response(response_data, status=status.HTTP_200_OK)
+        except serializers.ValidationError as exc:
+            logger.error("Response serialization failed. Errors: %s", exc.detail)
+            return Response(exc.detail, status=status.HTTP_400_BAD_REQUEST)
+
 
-        logger.error(f"Response serialization failed. Errors: {response_serializer.errors}")
-        return Response(response_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+class PopularPairsView(APIView):
+    """API to list the most converted currency pairs, with totals and trends."""
+
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """
+        API GET HTTP method.
+
+        Serves the aggregates precomputed by the ``cache_popular_pairs`` task. Only if they were never computed,
+        e.g. right after a cache flush, one request computes them while the others are asked to retry.
+        """
+        popular_pairs = get_popular_pairs()
+        if popular_pairs is None:
+            lease = CacheLease("cache_popular_pairs", timeout=60)
+            if lease.acquire() is None:
+                return Response(
+                    status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    data={"message": "Statistics are being computed, please retry shortly."},
+                    headers={"Retry-After": "5"},
+                )
+            try:
+                popular_pairs = compute_popular_pairs()
+                publish_popular_pairs(popular_pairs)
+            finally:
+                lease.release()
+        return Response(popular_pairs, status=status.HTTP_200_OK)
+
+
+class RateHistoryView(APIView):
+    """API to retrieve the USD based rates as they were at a point in time."""
+
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """
+        API GET HTTP method.
+
+        Returns the rates at the ``at`` query parameter, an ISO 8601 datetime, or the latest recorded rates.
+        """
+        serializer = RateHistorySerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        moment = serializer.validated_data.get("at") or timezone.now()
+        rates = rates_at(moment)
+        if rates is None:
+            return Response(status=status.HTTP_404_NOT_FOUND, data={"message": "No rates were recorded by then."})
+        return Response({"at": moment, "rates": rates}, status=status.HTTP_200_OK)
+
+
+class RateChangesView(APIView):
+    """API to consume the rate changes as a feed of deltas."""
+
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """
+        API GET HTTP method.
+
+        Returns the changes recorded after the ``since`` and ``after_id`` query parameters, oldest first and at most
+        ``RATE_HISTORY_CHANGES_LIMIT`` of them. Subscribers poll again with ``since`` and ``after_id`` set to the
+        returned ``until`` and ``until_id``, which resumes within a refresh whose changes did not fit in one page.
+        """
+        serializer = RateChangesSerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        since, after_id = serializer.validated_data["since"], serializer.validated_data.get("after_id")
+        changes = changes_since(since, after_id)
+        until, until_id = (changes[-1]["changed_at"], changes[-1]["id"]) if changes else (since, after_id)
+        return Response(
+            {"since": since, "after_id": after_id, "until": until, "until_id": until_id, "changes": changes},
+            status=status.HTTP_200_OK,
+        )
+
+
+class ReadinessView(APIView):
+    """API telling load balancers and orchestrators whether this instance is ready to take traffic."""
+
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        """
+        API GET HTTP method.
+
+        The instance is ready once the API rates are cached. If they are not, e.g. after a cache flush, they are first
+        restored from the last rates recorded in the database; an instance with no recorded rates at all is ready
+        as soon as it starts, as there is nothing to restore.
+        """
+        ready = cache.get("api_rates") is not None or warm_api_rates() or not RateSnapshot.objects.exists()
+        return Response({"ready": ready}, status=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE)
@@ -0,0 +1,76 @@
+# coding=utf-8
+"""Rate App Warm-up."""
+
+import logging
+from itertools import permutations
+from typing import Dict
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from raterapid.utils.cache_lock import CacheLease
+from raterapid.utils.rate_graph import build_rate_graph, publish_rate_graph
+
+from .analytics import compute_popular_pairs, get_popular_pairs, publish_popular_pairs
+from .api_rates import cached_rates_are_fresh, publish_api_rates
+from .history import latest_snapshot, replay
+from .models import Currency
+
+logger = logging.getLogger(__name__)
+
+
+def warm_api_rates() -> bool:
+    """
+    Restores the cached API rates and the rate graph from the last rates recorded in the database.
+
+    The restored rates keep the time they were fetched at, so they are only served as fresh if they still are, and
+    the next scheduled refresh replaces them as usual.
+
+    Returns:
+        bool: True if the rates were restored, False if they were already cached or none were ever recorded.
+    """
+    if cache.get("api_rates") is not None:
+        return False
+    lease = CacheLease("warm_api_rates", timeout=60)
+    if lease.acquire() is None:
+        return False
+    # The fence of the last published rates: any refresh that publishes meanwhile holds a newer one and wins.
+    fence = cache.get("api_rates_fence", 0)
+    try:
+        snapshot = latest_snapshot(timezone.now())
+        if snapshot is None:
+            return False
+        last_change = snapshot.changes.order_by("-changed_at").values_list("changed_at", flat=True).first()
+        fetched_at = max(snapshot.taken_at, last_change or snapshot.taken_at)
+        rates = replay(snapshot, fetched_at)
+        if not publish_api_rates(rates, fence=fence, fetched_at=fetched_at):
+            return False
+        graph = build_rate_graph(permutations(Currency.values, 2))
+        for currency, rate in rates.items():
+            graph.add_quote("USD", currency, rate, fetched_at)
+        publish_rate_graph(graph)
+        return True
+    finally:
+        lease.release()
+
+
+def warm_caches() -> Dict[str, bool]:
+    """
+    Fills the caches the API reads from.
+
+    Meant to run before the app takes traffic, so a fresh deploy or a flushed cache does not send every request live
+    to the providers.
+
+    Returns:
+        Dict[str, bool]: Whether each cache was warmed, and whether the cached rates are fresh.
+    """
+    warmed = {"api_rates": warm_api_rates(), "popular_pairs": False}
+    if get_popular_pairs() is None:
+        publish_popular_pairs(compute_popular_pairs())
+        warmed["popular_pairs"] = True
+    warmed["fresh"] = cached_rates_are_fresh()
+    logger.info("Warmed caches: %s", warmed)
+    return warmed
+
+
+__all__ = ["warm_api_rates", "warm_caches"]
@@ -0,0 +1,21 @@
+# coding=utf-8
+"""User App Authentication."""
+
+from rest_framework.authentication import BasicAuthentication
+
+from raterapid.core.db_router import pin_to_primary
+
+
+class PrimaryBasicAuthentication(BasicAuthentication):
+    """
+    Basic authentication reading the user from the primary database.
+
+    Token requests typically follow the signup which created the user, and carry credentials the signup request did
+    not, so they are not pinned to the primary by the client's recent writes and a lagging replica may not have the
+    user yet.
+    """
+
+    def authenticate(self, request):
+        """Pins the request to the primary, then authenticates it."""
+        pin_to_primary()
+        return super().authenticate(request)
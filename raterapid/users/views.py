@@ -2,13 +2,14 @@
 """USER App Views."""
 import logging
 
+from django.db import transaction
 from rest_framework import status
-from rest_framework.authentication import BasicAuthentication
 from rest_framework.authtoken.models import Token
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from .authentication import PrimaryBasicAuthentication
 from .serializers import UserSerializer
 
 logger = logging.getLogger(__name__)
@@ -23,32 +24,33 @@ class SignUpView(APIView):
         """API POST HTTP method."""
         serializer = UserSerializer(data=request.data)
         if serializer.is_valid():
-            user = serializer.save()
-            token, _ = Token.objects.get_or_create(user=user)
-            logger.info(f"User {user.username} registered successfully.")
+            with transaction.atomic():
+                user = serializer.save()
+                token, _ = Token.objects.get_or_create(user=user)
+            logger.info("User %s registered successfully.", user.username)
             return Response({"token": token.key}, status=status.HTTP_201_CREATED)
 
-        logger.warning(f"User registration failed. Errors: {serializer.errors}")
+        logger.warning("User registration failed. Errors: %s", serializer.errors)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
 class LoginView(APIView):
     """User Login API."""
 
-    authentication_classes = [BasicAuthentication]
+    authentication_classes = [PrimaryBasicAuthentication]
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
         """API POST HTTP method."""
         token, _ = Token.objects.get_or_create(user=request.user)
-        logger.info(f"User {request.user.username} logged in successfully.")
+        logger.info("User %s logged in successfully.", request.user.username)
         return Response({"token": token.key}, status=status.HTTP_200_OK)
 
 
 class RegenerateTokenView(APIView):
     """API to regenerate user token."""
 
-    authentication_classes = [BasicAuthentication]
+    authentication_classes = [PrimaryBasicAuthentication]
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
@@ -59,7 +61,8 @@ class RegenerateTokenView(APIView):
     @staticmethod
     def regenerate_token(user):
         """Deletes the old token for a user and generates a new one."""
-        Token.objects.filter(user=user).delete()
-        logger.info(f"Old token for user {user.username} deleted.")
-        Token.objects.create(user=user)
-        logger.info(f"New token generated for user {user.username}.")
+        with transaction.atomic():
+            Token.objects.filter(user=user).delete()
+            Token.objects.create(user=user)
+        logger.info("Old token for user %s deleted.", user.username)
+        logger.info("New token generated for user %s.", user.username)
@@ -0,0 +1,93 @@
+"""RateRapid Utils : Cache-backed lease locks."""
+
+import logging
+from typing import Optional
+
+from django.core.cache import cache, caches
+from django_redis.cache import RedisCache
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+# Deletes the lease (KEYS[1]) only if it still holds the token of the caller (ARGV[1]).
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class CacheLease:
+    """
+    Lease lock stored in the shared cache, guarded by a fencing token.
+
+    The lease is taken with an atomic ``cache.add`` so only one process across the deployment can hold it, and it
+    expires on its own after ``timeout`` seconds if the holder dies. Every acquisition draws a new, monotonically
+    increasing fencing token; writers store that token next to the data they publish and refuse to overwrite data
+    carrying a newer token, so a holder whose lease silently expired can never clobber the work of its successor.
+    """
+
+    def __init__(self, name: str, timeout: int):
+        """
+        Initializes the CacheLease.
+
+        Args:
+            name (str): The name of the protected resource.
+            timeout (int): Number of seconds after which the lease expires if it is not released.
+        """
+        self.key = f"lease:{name}"
+        self.fence_key = f"lease:{name}:fence"
+        self.timeout = timeout
+        self.token: Optional[int] = None
+
+    def _next_fence(self) -> Optional[int]:
+        """Draws the next fencing token, or None if the cache is unreachable."""
+        cache.add(self.fence_key, 0, timeout=None)
+        try:
+            return cache.incr(self.fence_key)
+        except ValueError:
+            # The counter was evicted between ``add`` and ``incr``.
+            return None
+
+    def acquire(self) -> Optional[int]:
+        """
+        Tries to take the lease without blocking.
+
+        Returns:
+            Optional[int]: The fencing token of the new lease, or None if somebody else holds it.
+        """
+        token = self._next_fence()
+        if token is None or not cache.add(self.key, token, timeout=self.timeout):
+            return None
+        self.token = token
+        return token
+
+    def is_held(self) -> bool:
+        """Returns True if the lease taken by this instance has neither expired nor been taken over."""
+        return self.token is not None and cache.get(self.key) == self.token
+
+    def release(self) -> None:
+        """
+        Releases the lease if it is still held by this instance.
+
+        With the Redis cache the check and the delete run as one Lua script, so a lease that expired and was taken
+        over in between is never deleted. Other cache backends check then delete.
+        """
+        if self.token is None:
+            return
+        backend = caches["default"]
+        if isinstance(backend, RedisCache):
+            client = backend.client
+            try:
+                script = client.get_client(write=True).register_script(RELEASE_SCRIPT)
+                script(keys=[client.make_key(self.key)], args=[client.encode(self.token)])
+            except RedisError as exc:
+                # The lease expires on its own.
+                logger.error("Failed to release the lease %s: %s", self.key, exc)
+        elif self.is_held():
+            cache.delete(self.key)
+        self.token = None
+
+
+__all__ = ["CacheLease"]
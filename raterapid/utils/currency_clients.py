@@ -1,23 +1,40 @@
 """RateRapid Utils : Currency APIs Clients."""
 
+import hashlib
 import json
 import logging
+import os
+import time
 from abc import ABC, abstractmethod
 from datetime import datetime
 from typing import Any, Dict, Optional, Tuple
 
+import orjson
 import requests
 from django.conf import settings
 from django.core.cache import cache
 from django.utils import timezone
 from django.utils.dateparse import parse_datetime
 
+from raterapid.core.profiling import profile_phase
+from raterapid.core.tracing import start_span
+
+from .deadline import Deadline
+from .offline_snapshot import offline_snapshot
+from .provider_router import ProviderStats, provider_router
+from .quota import ProviderQuota
+from .rate_graph import record_pair_quote, record_provider_rates, resolve_rate
+
 logger = logging.getLogger(__name__)
 
 
 class BaseCurrencyAPIClient(ABC):
     """Abstract Base Class for Currency API Clients."""
 
+    name: str
+    # Currency the latest rates of the provider are quoted against.
+    base_currency = "USD"
+
     def __init__(self, api_key: str, base_url: str):
         """
         Initializes the BaseCurrencyAPIClient.
@@ -28,6 +45,53 @@ class BaseCurrencyAPIClient(ABC):
         """
         self.api_key = api_key
         self.base_url = base_url
+        self.quota = ProviderQuota(self.name)
+        self._session: Optional[requests.Session] = None
+        self._session_pid: Optional[int] = None
+        # When this process last recorded the quote of each pair, keeping the cache writes off most conversions.
+        self._quoted_at: Dict[Tuple[str, str], float] = {}
+
+    @property
+    def session(self) -> requests.Session:
+        """
+        Returns the HTTP session of the current process, keeping the connections to the provider alive.
+
+        The session is created on first use in each process, so a forked worker never shares the sockets of its
+        parent, and its pool is sized for ``CURRENCY_API_POOL_SIZE`` concurrent requests.
+        """
+        if self._session is None or self._session_pid != os.getpid():
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_maxsize=settings.CURRENCY_API_POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            self._session, self._session_pid = session, os.getpid()
+        return self._session
+
+    def reset(self) -> None:
+        """Drops the HTTP session without closing its connections, which may belong to a parent process."""
+        self._session, self._session_pid = None, None
+        self._quoted_at = {}
+
+    def record_quote(self, base: str, target: str, rate: Any) -> None:
+        """
+        Keeps the rate the provider quoted for a pair, to be folded into the next rate graph.
+
+        The quoted rate is used rather than the result divided by the amount, which the rounding of the result makes
+        imprecise for small amounts. A pair is recorded at most once every ``RATE_GRAPH_QUOTE_INTERVAL`` seconds.
+
+        Args:
+            base (str): The base currency code (e.g. "USD").
+            target (str): The target currency code (e.g. "EUR").
+            rate (Any): The rate of the provider's answer, skipped unless it is a positive number.
+        """
+        if not isinstance(rate, (int, float)) or rate <= 0:
+            return
+        now = time.monotonic()
+        quoted_at = self._quoted_at.get((base, target))
+        if quoted_at is not None and now - quoted_at < settings.RATE_GRAPH_QUOTE_INTERVAL:
+            return
+        self._quoted_at[(base, target)] = now
+        record_pair_quote(base, target, float(rate))
 
     @property
     @abstractmethod
@@ -40,34 +104,80 @@ class BaseCurrencyAPIClient(ABC):
         """Abstract method to get the endpoint for pair conversion."""
         raise NotImplementedError
 
-    def request(self, url: str) -> Tuple[bool, Dict[str, Any]]:
+    def answer_error(self, content: Any) -> Optional[str]:
+        """
+        Returns why a parsed answer of the provider is an error, or None if it is not.
+
+        Args:
+            content (Any): The parsed JSON response.
+
+        Returns:
+            Optional[str]: The error reported by the provider, None for a valid answer.
+        """
+        if not isinstance(content, dict):
+            return "the response is not a JSON object"
+        return None
+
+    def request(
+        self, url: str, paced: bool = True, deadline: Optional[Deadline] = None, expected: Optional[str] = None
+    ) -> Tuple[bool, Dict[str, Any]]:
         """
         Sends a GET request to the given URL and returns the response status and content.
 
         On successful execution, a tuple (True, content) is returned,
         where 'content' is the parsed JSON response from the server.
-        On failure, the method returns (False, {}).
+        On failure, when the provider's monthly quota cannot afford the request, or when the deadline leaves no time
+        for it, the method returns (False, {}). Answers reporting an error, e.g. with a 200 status, or missing the
+        expected field are failures as well, and counted as such in the provider stats.
 
         Args:
             url (str): The URL to send the GET request to.
+            paced (bool): Whether the request is held back when the provider's quota burns faster than budgeted.
+            deadline (Optional[Deadline]): The deadline of the caller, bounding the request timeout.
+            expected (Optional[str]): Field a successful answer holds a non-empty value in, e.g. "quotes".
 
         Returns:
             Tuple[bool, Dict[str, Any]]: Tuple containing a boolean status and response content.
                 Status is True if request succeeded and False otherwise.
                 Content is a JSON response from the API on success and an empty dict on failure.
         """
+        timeout = deadline.timeout() if deadline is not None else settings.CURRENCY_API_TIMEOUT
+        if timeout <= 0:
+            logger.warning("Skipping request to %s: no time left before the deadline.", self.name)
+            return False, {}
+        if not self.quota.reserve(paced=paced):
+            logger.warning(
+                "Skipping request to %s: %s requests used this month, %.0f projected against a budget of %s.",
+                self.name,
+                self.quota.used(),
+                self.quota.projected_usage(),
+                self.quota.budget,
+            )
+            return False, {}
+        started_at = time.monotonic()
+        success, content = False, {}
         try:
-            logger.info(f"Sending request to {url}")
-            response = requests.get(url)
-            response.raise_for_status()
-            return True, response.json()
+            logger.info("Sending request to %s", url)
+            with profile_phase("provider"), start_span("provider.request", provider=self.name):
+                response = self.session.get(url, timeout=timeout)
+                response.raise_for_status()
+                content = response.json()
+            error = self.answer_error(content)
+            if error is None and expected is not None and content.get(expected) in (None, {}):
+                error = f"the response has no {expected}"
+            if error is None:
+                success = True
+            else:
+                logger.error("%s API answered with an error: %s", self.name, error)
+                content = {}
         except requests.exceptions.HTTPError as http_err:
-            logger.error(f"HTTP error occurred: {http_err}")
+            logger.error("HTTP error occurred: %s", http_err)
         except requests.exceptions.RequestException as req_err:
-            logger.error(f"An error occurred during the request: {req_err}")
+            logger.error("An error occurred during the request: %s", req_err)
         except json.JSONDecodeError as json_err:
-            logger.error(f"An error occurred while parsing the response into JSON: {json_err}")
-        return False, {}
+            logger.error("An error occurred while parsing the response into JSON: %s", json_err)
+        ProviderStats.record(self.name, time.monotonic() - started_at, success)
+        return success, content
 
     @abstractmethod
     def get_latest_rates(self) -> Tuple[bool, Dict[str, Any]]:
@@ -75,7 +185,9 @@ class BaseCurrencyAPIClient(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    def pair_conversion(self, base: str, target: str, amount: float) -> Tuple[bool, Optional[float]]:
+    def pair_conversion(
+        self, base: str, target: str, amount: float, deadline: Optional[Deadline] = None
+    ) -> Tuple[bool, Optional[float]]:
         """Abstract method to convert an amount of money from one currency to another."""
         raise NotImplementedError
 
@@ -88,6 +200,8 @@ class EXChangeRateClient(BaseCurrencyAPIClient):
     For more details on the API, refer to the API Documentation at https://exchangerate-api.com/docs/
     """
 
+    name = "exchangerate"
+
     def __init__(self, api_key: str):
         """
         Initialize the ExchangeRate API client.
@@ -108,6 +222,13 @@ class EXChangeRateClient(BaseCurrencyAPIClient):
         """
         return f"{self.base_url}/{self.api_key}/latest/USD"
 
+    def answer_error(self, content: Any) -> Optional[str]:
+        """Returns the error type of an answer whose result is "error", or None if it is not one."""
+        error = super().answer_error(content)
+        if error is None and content.get("result") == "error":
+            error = content.get("error-type") or "error"
+        return error
+
     def pair_conversion_endpoint(self, base: str, target: str, amount: float) -> str:
         """
         Construct and return the endpoint URL for converting one currency to another.
@@ -131,10 +252,12 @@ class EXChangeRateClient(BaseCurrencyAPIClient):
                 Status is True if request succeeded and False otherwise.
                 Content is a JSON response from the API on success, and an empty dict on failure.
         """
-        success, data = self.request(self.get_latest_rates_endpoint)
+        success, data = self.request(self.get_latest_rates_endpoint, paced=False, expected="conversion_rates")
         return success, data.get("conversion_rates", {})
 
-    def pair_conversion(self, base: str, target: str, amount: float) -> Tuple[bool, Optional[float]]:
+    def pair_conversion(
+        self, base: str, target: str, amount: float, deadline: Optional[Deadline] = None
+    ) -> Tuple[bool, Optional[float]]:
         """
         Converts a specific amount of money from one currency (base) to another (target).
 
@@ -142,6 +265,7 @@ class EXChangeRateClient(BaseCurrencyAPIClient):
             base (str): The base currency to convert from.
             target (str): The target currency to convert to.
             amount (float): The amount of base currency to be converted.
+            deadline (Optional[Deadline]): The deadline of the caller, bounding the request timeout.
 
         Returns:
             Tuple[bool, Optional[float]]: A tuple containing a boolean status and conversion result.
@@ -149,7 +273,11 @@ class EXChangeRateClient(BaseCurrencyAPIClient):
                 The conversion result is a float representing the converted amount in target currency on success,
                 and None on failure.
         """
-        success, data = self.request(self.pair_conversion_endpoint(base, target, amount))
+        success, data = self.request(
+            self.pair_conversion_endpoint(base, target, amount), deadline=deadline, expected="conversion_result"
+        )
+        if success:
+            self.record_quote(base, target, data.get("conversion_rate"))
         return success, data.get("conversion_result")
 
 
@@ -161,6 +289,8 @@ class CurrencyLayerClient(BaseCurrencyAPIClient):
     For more details on the API, refer to the API Documentation at https://currencylayer.com/documentation
     """
 
+    name = "currencylayer"
+
     def __init__(self, api_key: str):
         """
         Initialize the CurrencyLayer API client.
@@ -181,6 +311,13 @@ class CurrencyLayerClient(BaseCurrencyAPIClient):
         """
         return f"{self.base_url}/live?access_key={self.api_key}"
 
+    def answer_error(self, content: Any) -> Optional[str]:
+        """Returns the error info of an answer whose success is false, which CurrencyLayer sends with a 200."""
+        error = super().answer_error(content)
+        if error is None and content.get("success") is False:
+            error = (content.get("error") or {}).get("info") or "success is false"
+        return error
+
     def _remove_usd_from_keys(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Removes 'USD' prefix from keys in the provided dictionary.
@@ -217,10 +354,12 @@ class CurrencyLayerClient(BaseCurrencyAPIClient):
                 Status is True if request succeeded and False otherwise.
                 Content is a JSON response from the API on success, and an empty dict on failure.
         """
-        success, data = self.request(self.get_latest_rates_endpoint)
+        success, data = self.request(self.get_latest_rates_endpoint, paced=False, expected="quotes")
         return success, self._remove_usd_from_keys(data.get("quotes", {}))
 
-    def pair_conversion(self, base: str, target: str, amount: float) -> Tuple[bool, Optional[float]]:
+    def pair_conversion(
+        self, base: str, target: str, amount: float, deadline: Optional[Deadline] = None
+    ) -> Tuple[bool, Optional[float]]:
         """
         Converts a specific amount of money from one currency (base) to another (target).
 
@@ -228,6 +367,7 @@ class CurrencyLayerClient(BaseCurrencyAPIClient):
             base (str): The base currency to convert from.
             target (str): The target currency to convert to.
             amount (float): The amount of base currency to be converted.
+            deadline (Optional[Deadline]): The deadline of the caller, bounding the request timeout.
 
         Returns:
             Tuple[bool, Optional[float]]: A tuple containing a boolean status and conversion result.
@@ -235,7 +375,11 @@ class CurrencyLayerClient(BaseCurrencyAPIClient):
                 The conversion result is a float representing the converted amount in target currency on success,
                 and None on failure.
         """
-        success, data = self.request(self.pair_conversion_endpoint(base, target, amount))
+        success, data = self.request(
+            self.pair_conversion_endpoint(base, target, amount), deadline=deadline, expected="result"
+        )
+        if success:
+            self.record_quote(base, target, (data.get("info") or {}).get("quote"))
         return success, data.get("result")
 
 
@@ -264,58 +408,140 @@ def get_cached_api_rates():
     return None, None
 
 
+def get_api_rates_checked_at() -> Optional[datetime]:
+    """Retrieves when the cached API rates were last confirmed by a provider, whether they changed or not."""
+    checked_at = cache.get("api_rates_checked_at")
+    if checked_at is not None:
+        return parse_datetime(checked_at)
+    return get_cached_api_rates()[1]
+
+
+def get_api_rates_version() -> int:
+    """Retrieves the version of the cached API rates, bumped every time new rates are published."""
+    version = cache.get("api_rates_version")
+    if version is None:
+        cached_data = cache.get("api_rates")
+        version = cached_data.get("version", 0) if cached_data else 0
+    return version
+
+
+def next_api_rates_version() -> int:
+    """
+    Returns the version under which the next rates should be published.
+
+    Versions only ever increase: they are at least the current time in milliseconds, so even when the cached
+    version is evicted the next one is beyond any version handed out before.
+    """
+    return max(get_api_rates_version() + 1, int(time.time() * 1000))
+
+
+def bump_api_rates_version(version: Optional[int] = None) -> int:
+    """
+    Bumps the version of the cached API rates, invalidating everything derived from the previous rates.
+
+    Args:
+        version (Optional[int]): The new version, defaults to ``next_api_rates_version()``.
+
+    Returns:
+        int: The new version.
+    """
+    version = version or next_api_rates_version()
+    cache.set("api_rates_version", version, timeout=None)
+    return version
+
+
+def rates_digest(rates: Dict[str, Any]) -> str:
+    """Returns a digest of the rates, identical for identical rates whatever the order of the currencies."""
+    return hashlib.sha256(orjson.dumps(rates, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+
 def get_latest_rates() -> Tuple[bool, Dict[str, Any]]:
     """
     Retrieves the latest currency exchange rates.
 
-    Tries the ExchangeRate API first, then falls back to the CurrencyLayer API if the first one fails.
+    Tries the registered providers in the order picked by the provider router, falling back to the next one
+    whenever a provider fails.
 
 
     Returns:
         Tuple[bool, Dict[str, Any]]: A tuple containing a boolean status and response content.
     """
-    success, data = exchangerate_client.get_latest_rates()
-    if not success:
-        success, data = currencylayer_client.get_latest_rates()
+    success, data = False, {}
+    for client in provider_router.ordered():
+        success, data = client.get_latest_rates()
+        if success:
+            record_provider_rates(client.name, client.base_currency, data)
+            break
     return success, data
 
 
-def pair_conversion(base: str, target: str, amount: float) -> Tuple[bool, Optional[float], datetime]:
+def pair_conversion(
+    base: str, target: str, amount: float, deadline: Optional[Deadline] = None
+) -> Tuple[bool, Optional[float], datetime]:
     """
     Converts a specific amount of money from one currency (base) to another (target).
 
-    This function first tries to convert the currencies using the ExchangeRate API. If it fails, it falls back to
-    the CurrencyLayer API. If that fails too, it tries to calculate the conversion rate using cached rates.
+    This function first tries to convert the currencies using the registered providers, in the order picked by the
+    provider router. If all of them fail, or the deadline leaves no time for another provider call, it resolves the
+    rate from the rate graph, falling back to the cross rate of the cached rates. Without any cached rates, e.g.
+    while the cache is down, it reads the rates of the offline snapshot file, however old they are.
 
     Args:
         base (str): The base currency code (e.g. "USD").
         target (str): The target currency code (e.g. "EUR").
         amount (float): The amount of base currency to be converted.
+        deadline (Optional[Deadline]): The deadline of the request, shrinking the timeout of each provider call.
 
     Returns:
         Tuple[bool, Optional[float], datetime]: A tuple containing a boolean status indicating the success of the
         conversion, the conversion result, and the datetime of the rate used for conversion.
     """
-    success, result = exchangerate_client.pair_conversion(base, target, amount)
-    if success:
-        logger.info(f"Converted {amount} {base} to {target} using ExchangeRate API.")
-        return success, result, timezone.now()
-
-    success, result = currencylayer_client.pair_conversion(base, target, amount)
-    if success:
-        logger.info(f"Converted {amount} {base} to {target} using CurrencyLayer API.")
-        return success, result, timezone.now()
-
-    data, last_updated = get_cached_api_rates()
-    if data and last_updated:
-        cross_rate = compute_cross_rate(data[base], data[target])
-        result = cross_rate * float(amount)
-        logger.info(f"Converted {amount} {base} to {target} using cached rates.")
-        return True, result, last_updated
-
-    logger.error(f"Failed to convert {amount} {base} to {target}.")
-    return False, 0.0, timezone.now()
-
-
-exchangerate_client = EXChangeRateClient(settings.EXCHANGERATE_API_KEY)
-currencylayer_client = CurrencyLayerClient(settings.EXCHANGERATE_API_KEY)
+    with start_span("pair_conversion", base=base, target=target):
+        for client in provider_router.ordered():
+            if deadline is not None and deadline.is_nearly_expired():
+                logger.warning("Deadline nearly spent, skipping %s API for %s to %s.", client.name, base, target)
+                break
+            success, result = client.pair_conversion(base, target, amount, deadline=deadline)
+            if success and not isinstance(result, (int, float)):
+                # e.g. a result that is not a number.
+                logger.warning("%s API returned no conversion result for %s to %s.", client.name, base, target)
+                continue
+            if success:
+                logger.info("Converted %s %s to %s using %s API.", amount, base, target, client.name)
+                return success, result, timezone.now()
+
+        with profile_phase("cache"), start_span("cache.api_rates"):
+            data, last_updated = get_cached_api_rates()
+            rate = resolve_rate(base, target) if data and last_updated else None
+        if data and last_updated:
+            if rate is None and base in data and target in data:
+                rate = compute_cross_rate(data[base], data[target])
+            if rate is not None:
+                logger.info("Converted %s %s to %s using cached rates.", amount, base, target)
+                return True, rate * float(amount), last_updated
+
+        rate, fetched_at = offline_snapshot.cross_rate(base, target)
+        if rate is not None:
+            logger.warning(
+                "Converted %s %s to %s using the offline snapshot from %s.", amount, base, target, fetched_at
+            )
+            return True, rate * float(amount), fetched_at
+
+        logger.error("Failed to convert %s %s to %s.", amount, base, target)
+        return False, 0.0, timezone.now()
+
+
+def reset_clients() -> None:
+    """Drops the HTTP sessions of the registered clients, e.g. in a freshly forked worker."""
+    for client in provider_router.clients():
+        client.reset()
+
+
+exchangerate_client = provider_router.register(
+    EXChangeRateClient(settings.EXCHANGERATE_API_KEY),
+    weight=settings.CURRENCY_API_WEIGHTS.get(EXChangeRateClient.name, 1.0),
+)
+currencylayer_client = provider_router.register(
+    CurrencyLayerClient(settings.CURRENCYLAYER_API_KEY),
+    weight=settings.CURRENCY_API_WEIGHTS.get(CurrencyLayerClient.name, 1.0),
+)
@@ -0,0 +1,64 @@
+"""RateRapid Utils : Request deadlines."""
+
+import math
+import time
+from typing import Optional
+
+from django.conf import settings
+
+
+class Deadline:
+    """
+    Point in time by which a request must be answered.
+
+    A deadline is created once per request and handed down the conversion chain; every provider call gets the
+    time left as its timeout, so the whole chain answers within the request's budget however many providers fail.
+    """
+
+    def __init__(self, budget: float):
+        """
+        Initializes the Deadline.
+
+        Args:
+            budget (float): Number of seconds from now until the deadline expires.
+        """
+        self.expires_at = time.monotonic() + budget
+
+    @classmethod
+    def from_header(cls, value: Optional[str]) -> "Deadline":
+        """
+        Creates a deadline from a request header holding a budget in milliseconds.
+
+        Missing, malformed or non-finite values, e.g. "nan", fall back to ``CONVERSION_DEADLINE_MS``, and budgets are
+        capped by ``CONVERSION_DEADLINE_MAX_MS`` so callers cannot hold workers for longer than the server allows.
+
+        Args:
+            value (Optional[str]): The header value, e.g. "1500".
+
+        Returns:
+            Deadline: The deadline of the request.
+        """
+        try:
+            budget_ms = float(value) if value else settings.CONVERSION_DEADLINE_MS
+        except ValueError:
+            budget_ms = settings.CONVERSION_DEADLINE_MS
+        if not math.isfinite(budget_ms):
+            budget_ms = settings.CONVERSION_DEADLINE_MS
+        budget_ms = min(max(budget_ms, 0.0), settings.CONVERSION_DEADLINE_MAX_MS)
+        return cls(budget_ms / 1000)
+
+    def remaining(self) -> float:
+        """Returns the number of seconds left until the deadline, or 0 if it has passed."""
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def is_nearly_expired(self) -> bool:
+        """Returns True if too little time is left to wait on a provider, keeping the reserve for the fallback."""
+        return self.remaining() * 1000 <= settings.CONVERSION_DEADLINE_RESERVE_MS
+
+    def timeout(self) -> float:
+        """Returns the timeout of the next provider call: the time left minus the reserve, at most the API timeout."""
+        usable = self.remaining() - settings.CONVERSION_DEADLINE_RESERVE_MS / 1000
+        return min(max(usable, 0.0), settings.CURRENCY_API_TIMEOUT)
+
+
+__all__ = ["Deadline"]
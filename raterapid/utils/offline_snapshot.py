@@ -0,0 +1,200 @@
+"""RateRapid Utils : Offline rates snapshot."""
+
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"RRS1"
+# Magic, fetch time as a UNIX timestamp, number of records.
+HEADER = struct.Struct("<4sdI")
+# Currency code padded to 4 bytes, rate. Records are sorted by code.
+RECORD = struct.Struct("<4sd")
+
+
+def is_complete_rates_table(rates: Dict[str, float], previous_count: int) -> bool:
+    """
+    Checks whether a rates table may replace one of ``previous_count`` currencies.
+
+    Tables that are empty, or that lost more than ``RATES_TABLE_MIN_SHARE`` of the previous currencies at once, are
+    taken for a provider answering with a partial table rather than for currencies being withdrawn.
+
+    Args:
+        rates (Dict[str, float]): The new rates table.
+        previous_count (int): The number of currencies of the table it would replace, 0 if there is none.
+
+    Returns:
+        bool: True if the table may replace the previous one.
+    """
+    return bool(rates) and len(rates) >= previous_count * settings.RATES_TABLE_MIN_SHARE
+
+
+def write_offline_snapshot(rates: Dict[str, float], fetched_at: datetime, path: Optional[str] = None) -> bool:
+    """
+    Writes the rates to the offline snapshot file, replacing it atomically.
+
+    The file is written next to its final path then renamed over it, so processes mapping the previous file keep
+    reading it unharmed and new readers only ever see a complete file. A table much smaller than the one of the
+    current file is refused, so the last good rates are not replaced by a partial answer.
+
+    Args:
+        rates (Dict[str, float]): The amount of each currency one US dollar buys.
+        fetched_at (datetime): When the rates were fetched from a provider.
+        path (Optional[str]): The snapshot file, defaults to ``OFFLINE_RATES_PATH``.
+
+    Returns:
+        bool: True if the snapshot was written, False if the table was refused.
+    """
+    path = path or settings.OFFLINE_RATES_PATH
+    records = sorted(
+        (currency.encode("ascii"), float(rate))
+        for currency, rate in {"USD": 1.0, **rates}.items()
+        if 0 < len(currency) <= 4 and currency.isascii() and rate
+    )
+    current = OfflineSnapshot(path)
+    previous_count = current.count()
+    current.close()
+    if not rates or not is_complete_rates_table(dict(records), previous_count):
+        logger.warning(
+            "Kept the offline snapshot of %s currencies over a table of %s currencies.", previous_count, len(records)
+        )
+        return False
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temporary_path = tempfile.mkstemp(dir=directory, prefix=".rates-")
+    try:
+        with os.fdopen(fd, "wb") as snapshot_file:
+            snapshot_file.write(HEADER.pack(MAGIC, fetched_at.timestamp(), len(records)))
+            snapshot_file.writelines(RECORD.pack(currency, rate) for currency, rate in records)
+            snapshot_file.flush()
+            os.fsync(snapshot_file.fileno())
+        os.chmod(temporary_path, 0o644)
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.unlink(temporary_path)
+        raise
+    return True
+
+
+class OfflineSnapshot:
+    """
+    Read-only memory map of the offline snapshot file, the last-resort source of rates.
+
+    Lookups binary search the mapped records in place, without reading or parsing the file, and the pages are
+    shared by every process mapping it. Each lookup checks whether the file was replaced, and maps the new file if so.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Initializes the OfflineSnapshot.
+
+        Args:
+            path (Optional[str]): The snapshot file, defaults to ``OFFLINE_RATES_PATH``.
+        """
+        self._path = path
+        self._lock = threading.Lock()
+        self._mapped: Optional[mmap.mmap] = None
+        self._identity: Optional[Tuple[int, int, int]] = None
+
+    @property
+    def path(self) -> str:
+        """Returns the path of the snapshot file."""
+        return self._path or settings.OFFLINE_RATES_PATH
+
+    def _map(self) -> Optional[mmap.mmap]:
+        """Returns the map of the current snapshot file, or None if there is no valid snapshot file."""
+        if not self.path:
+            return None
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        identity = (stat.st_dev, stat.st_ino, stat.st_mtime_ns)
+        with self._lock:
+            if identity != self._identity:
+                # The previous map is not closed here, as other threads may still be reading it; it is unmapped
+                # once the last of them drops it.
+                try:
+                    with open(self.path, "rb") as snapshot_file:
+                        mapped = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+                except (OSError, ValueError):
+                    return None
+                if mapped.size() < HEADER.size or mapped[:4] != MAGIC:
+                    mapped.close()
+                    return None
+                # A truncated file holds fewer records than its header counts.
+                if HEADER.size + HEADER.unpack_from(mapped)[2] * RECORD.size > mapped.size():
+                    mapped.close()
+                    return None
+                self._mapped, self._identity = mapped, identity
+            return self._mapped
+
+    def close(self) -> None:
+        """Unmaps the snapshot file; the next lookup maps it again."""
+        if self._mapped is not None:
+            self._mapped.close()
+        self._mapped, self._identity = None, None
+
+    def rate(self, currency: str) -> Optional[float]:
+        """Returns the amount of the currency one US dollar buys, or None if the snapshot does not have it."""
+        mapped = self._map()
+        if mapped is None:
+            return None
+        key = currency.encode("ascii").ljust(4, b"\0")
+        _, _, count = HEADER.unpack_from(mapped)
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            code, rate = RECORD.unpack_from(mapped, HEADER.size + middle * RECORD.size)
+            if code == key:
+                return rate
+            if code < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def count(self) -> int:
+        """Returns the number of currencies of the snapshot, 0 if there is no snapshot."""
+        mapped = self._map()
+        if mapped is None:
+            return 0
+        return HEADER.unpack_from(mapped)[2]
+
+    def fetched_at(self) -> Optional[datetime]:
+        """Returns when the rates of the snapshot were fetched, or None if there is no snapshot."""
+        mapped = self._map()
+        if mapped is None:
+            return None
+        _, timestamp, _ = HEADER.unpack_from(mapped)
+        return datetime.fromtimestamp(timestamp, tz=timezone.utc)
+
+    def cross_rate(self, base: str, target: str) -> Tuple[Optional[float], Optional[datetime]]:
+        """
+        Returns the rate between two currencies from the snapshot.
+
+        Args:
+            base (str): The base currency code (e.g. "USD").
+            target (str): The target currency code (e.g. "EUR").
+
+        Returns:
+            Tuple[Optional[float], Optional[datetime]]: The amount of target currency one unit of base currency buys
+            and when the rates were fetched, or (None, None) if the snapshot lacks either currency.
+        """
+        base_rate, target_rate = self.rate(base), self.rate(target)
+        if not base_rate or target_rate is None:
+            return None, None
+        return target_rate / base_rate, self.fetched_at()
+
+
+offline_snapshot = OfflineSnapshot()
+
+__all__ = ["OfflineSnapshot", "is_complete_rates_table", "offline_snapshot", "write_offline_snapshot"]
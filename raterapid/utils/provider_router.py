@@ -0,0 +1,138 @@
+"""RateRapid Utils : Currency APIs provider routing."""
+
+import random
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+if TYPE_CHECKING:
+    from .currency_clients import BaseCurrencyAPIClient
+
+
+class ProviderStats:
+    """
+    Exponentially weighted moving averages of a provider's latency and error rate.
+
+    The averages live in the shared cache so every web and worker process routes on the same view of the providers.
+    Updates are a plain read-modify-write: two processes racing on the same provider only lose one sample.
+    """
+
+    def __init__(self, latency: float, error_rate: float):
+        """
+        Initializes the ProviderStats.
+
+        Args:
+            latency (float): Moving average of the request latency, in seconds.
+            error_rate (float): Moving average of the failure rate, between 0 and 1.
+        """
+        self.latency = latency
+        self.error_rate = error_rate
+
+    @staticmethod
+    def key(name: str) -> str:
+        """Returns the cache key holding the stats of the given provider."""
+        return f"provider_stats:{name}"
+
+    @classmethod
+    def default(cls) -> "ProviderStats":
+        """Returns the stats assumed for a provider that has not been called yet."""
+        return cls(latency=settings.CURRENCY_API_DEFAULT_LATENCY, error_rate=0.0)
+
+    @classmethod
+    def get_many(cls, names: List[str]) -> Dict[str, "ProviderStats"]:
+        """Retrieves the stats of the given providers from the cache in one round trip."""
+        cached = cache.get_many([cls.key(name) for name in names])
+        stats = {}
+        for name in names:
+            data = cached.get(cls.key(name))
+            stats[name] = cls(**data) if data else cls.default()
+        return stats
+
+    @classmethod
+    def record(cls, name: str, latency: float, success: bool) -> None:
+        """
+        Folds the outcome of one request into the provider's moving averages.
+
+        Args:
+            name (str): The name of the provider.
+            latency (float): How long the request took, in seconds.
+            success (bool): Whether the request succeeded.
+        """
+        alpha = settings.CURRENCY_API_EWMA_ALPHA
+        data = cache.get(cls.key(name))
+        stats = cls(**data) if data else cls(latency=latency, error_rate=0.0 if success else 1.0)
+        stats.latency += alpha * (latency - stats.latency)
+        stats.error_rate += alpha * ((0.0 if success else 1.0) - stats.error_rate)
+        cache.set(cls.key(name), {"latency": stats.latency, "error_rate": stats.error_rate}, timeout=None)
+
+    def score(self, weight: float) -> float:
+        """Returns how much traffic the provider deserves: its weight, scaled by its speed and health."""
+        return weight * max(1.0 - self.error_rate, 0.01) / max(self.latency, 0.01)
+
+
+class ProviderRouter:
+    """
+    Registry of the currency API clients, ordering them for each call by their live performance.
+
+    Each call draws a weighted random order of the providers, where a provider's chance to go first is its
+    registered weight divided by its average latency and discounted by its error rate. The fastest healthy
+    provider therefore serves most of the traffic, while the others keep receiving enough calls for their
+    stats to notice when they recover.
+    """
+
+    def __init__(self):
+        """Initializes an empty ProviderRouter."""
+        self._providers: Dict[str, Tuple["BaseCurrencyAPIClient", float]] = {}
+
+    def register(self, client: "BaseCurrencyAPIClient", weight: float = 1.0) -> "BaseCurrencyAPIClient":
+        """
+        Registers a client under its provider name, replacing any client previously registered under that name.
+
+        Args:
+            client (BaseCurrencyAPIClient): The client to route calls to.
+            weight (float): The relative share of traffic the provider gets when all providers perform alike, 0 to
+                only try it once all the other providers failed.
+
+        Returns:
+            BaseCurrencyAPIClient: The registered client.
+
+        Raises:
+            ValueError: If the weight is negative.
+        """
+        if weight < 0:
+            raise ValueError(f"The weight of the {client.name} provider must not be negative, got {weight}.")
+        self._providers[client.name] = (client, weight)
+        return client
+
+    def unregister(self, name: str) -> None:
+        """Removes the client registered under the given provider name."""
+        self._providers.pop(name, None)
+
+    def clients(self) -> List["BaseCurrencyAPIClient"]:
+        """Returns the registered clients."""
+        return [client for client, _ in self._providers.values()]
+
+    def names(self) -> List[str]:
+        """Returns the names of the registered providers."""
+        return list(self._providers)
+
+    def ordered(self) -> List["BaseCurrencyAPIClient"]:
+        """
+        Returns the registered clients in the order they should be tried for one call.
+
+        Uses weighted sampling without replacement (Efraimidis-Spirakis): every provider draws ``u ** (1 / score)``
+        for a uniform ``u`` and the providers are tried by decreasing draw. Providers of weight 0 draw below every
+        other provider, in random order, so they are only tried last.
+        """
+        stats = ProviderStats.get_many(list(self._providers))
+        keys = {}
+        for name, (_, weight) in self._providers.items():
+            draw = random.random()  # NOQA: S311
+            keys[name] = draw ** (1.0 / stats[name].score(weight)) if weight else draw - 1.0
+        return [self._providers[name][0] for name in sorted(keys, key=keys.__getitem__, reverse=True)]
+
+
+provider_router = ProviderRouter()
+
+__all__ = ["ProviderRouter", "ProviderStats", "provider_router"]
@@ -0,0 +1,137 @@
+"""RateRapid Utils : Currency APIs quota accounting."""
+
+import calendar
+import logging
+from datetime import datetime
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Monthly counters outlive their month by a few days so late reads still see the final usage.
+QUOTA_COUNTER_TIMEOUT = 35 * 24 * 60 * 60
+
+
+class ProviderQuota:
+    """
+    Monthly request budget of a currency API provider, shared by every process through the cache.
+
+    Calls are paced against the budget: at any moment of the month a provider may only have used its budget
+    pro-rata to the elapsed part of the month, plus ``CURRENCY_API_QUOTA_BURST`` requests. Once the burn rate
+    projects past the budget, paced calls are refused and callers fall back to the other provider or to the cached
+    rates, while essential (unpaced) calls such as the scheduled rates refresh keep going until the hard limit.
+    """
+
+    def __init__(self, provider: str):
+        """
+        Initializes the ProviderQuota.
+
+        Args:
+            provider (str): The name of the provider, as used in ``CURRENCY_API_MONTHLY_QUOTAS``.
+        """
+        self.provider = provider
+
+    @property
+    def budget(self) -> Optional[int]:
+        """The monthly request budget of the provider, or None if it is unlimited."""
+        return settings.CURRENCY_API_MONTHLY_QUOTAS.get(self.provider)
+
+    def key(self, now: datetime) -> str:
+        """Returns the cache key counting the requests of the month containing ``now``."""
+        return f"quota:{self.provider}:{now:%Y%m}"
+
+    def used(self, now: Optional[datetime] = None) -> int:
+        """Returns the number of requests sent to the provider so far this month."""
+        return cache.get(self.key(now or timezone.now()), 0)
+
+    def consume(self, now: Optional[datetime] = None) -> Optional[int]:
+        """
+        Records one request sent to the provider.
+
+        Returns:
+            Optional[int]: The number of requests sent this month with it, None if the cache could not count it,
+            e.g. while it is unavailable and its errors are ignored.
+        """
+        key = self.key(now or timezone.now())
+        cache.add(key, 0, timeout=QUOTA_COUNTER_TIMEOUT)
+        try:
+            return cache.incr(key)
+        except ValueError:
+            return 1 if cache.add(key, 1, timeout=QUOTA_COUNTER_TIMEOUT) else None
+
+    @staticmethod
+    def elapsed_fraction(now: datetime) -> float:
+        """Returns the fraction of the month containing ``now`` that has already elapsed."""
+        month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        month_seconds = calendar.monthrange(now.year, now.month)[1] * 24 * 60 * 60
+        return (now - month_start).total_seconds() / month_seconds
+
+    def projected_usage(self, now: Optional[datetime] = None) -> float:
+        """Returns the number of requests the provider will have received by the end of the month at this pace."""
+        now = now or timezone.now()
+        return self.used(now) / max(self.elapsed_fraction(now), 1e-6)
+
+    def fits(self, used: int, paced: bool, now: datetime) -> bool:
+        """Returns True if one more request fits in the budget after ``used`` requests this month."""
+        budget = self.budget
+        if budget is None:
+            return True
+        if used >= budget:
+            return False
+        if paced:
+            return used < budget * self.elapsed_fraction(now) + settings.CURRENCY_API_QUOTA_BURST
+        return True
+
+    def allows(self, paced: bool = True, now: Optional[datetime] = None) -> bool:
+        """
+        Checks whether one more request may be sent to the provider.
+
+        Args:
+            paced (bool): Hold the request back if the month's burn rate is ahead of the budget.
+            now (Optional[datetime]): The time of the request, defaults to now.
+
+        Returns:
+            bool: True if the request fits in the budget, False otherwise.
+        """
+        if self.budget is None:
+            return True
+        now = now or timezone.now()
+        return self.fits(self.used(now), paced, now)
+
+    def reserve(self, paced: bool = True, now: Optional[datetime] = None) -> bool:
+        """
+        Records one request sent to the provider if it fits in the budget.
+
+        The request is counted first, with an atomic increment, and given back if the count went over the budget,
+        so processes racing for the last requests of the budget cannot all pass the check before any of them counts.
+        Providers without a budget are not counted, and requests the cache could not count are let through rather
+        than failing the conversions while the cache is down.
+
+        Args:
+            paced (bool): Hold the request back if the month's burn rate is ahead of the budget.
+            now (Optional[datetime]): The time of the request, defaults to now.
+
+        Returns:
+            bool: True if the request was recorded, False if it does not fit in the budget.
+        """
+        if self.budget is None:
+            return True
+        now = now or timezone.now()
+        count = self.consume(now)
+        if count is None:
+            logger.warning("Could not count a request to %s against its quota, letting it through.", self.provider)
+            return True
+        if self.fits(count - 1, paced, now):
+            return True
+        try:
+            cache.decr(self.key(now))
+        except ValueError:
+            # The counter was evicted meanwhile, there is nothing to give back.
+            pass
+        return False
+
+
+__all__ = ["ProviderQuota"]
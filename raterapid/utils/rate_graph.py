@@ -0,0 +1,198 @@
+"""RateRapid Utils : Rate graph."""
+
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .provider_router import provider_router
+
+RATE_GRAPH_VERSION_KEY = "rate_graph_version"
+
+
+def provider_rates_key(name: str) -> str:
+    """Returns the cache key of the latest rates table fetched from the given provider."""
+    return f"provider_rates:{name}"
+
+
+def pair_quote_key(base: str, target: str) -> str:
+    """Returns the cache key of the latest direct quote of the given pair."""
+    return f"pair_quote:{base}:{target}"
+
+
+def rate_graph_key(version: int, base: str) -> str:
+    """Returns the cache key of the best rates from the given currency in the given version of the graph."""
+    return f"rate_graph:{version}:{base}"
+
+
+def record_provider_rates(name: str, base: str, rates: Dict[str, float]) -> None:
+    """
+    Keeps the rates table a provider returned, to be folded into the next rate graph.
+
+    Args:
+        name (str): The name of the provider.
+        base (str): The currency the rates are quoted against.
+        rates (Dict[str, float]): The amount of each currency one unit of the base currency buys.
+    """
+    cache.set(
+        provider_rates_key(name),
+        {"base": base, "rates": rates, "quoted_at": str(timezone.now())},
+        timeout=settings.RATE_GRAPH_QUOTE_MAX_AGE,
+    )
+
+
+def record_pair_quote(base: str, target: str, rate: float) -> None:
+    """
+    Keeps a direct quote of a pair, e.g. from a pair conversion, to be folded into the next rate graph.
+
+    Args:
+        base (str): The base currency code (e.g. "USD").
+        target (str): The target currency code (e.g. "EUR").
+        rate (float): The amount of target currency one unit of base currency buys.
+    """
+    cache.set(
+        pair_quote_key(base, target),
+        {"rate": rate, "quoted_at": str(timezone.now())},
+        timeout=settings.RATE_GRAPH_QUOTE_MAX_AGE,
+    )
+
+
+class RateGraph:
+    """
+    Graph of the exchange rates, where each quote is an edge between two currencies.
+
+    Quotes are added in both directions, and when several providers quote the same pair the freshest quote wins.
+    The best rate between two currencies follows the path with the fewest conversions, each extra hop compounding
+    spreads and rounding; among paths of the same length, the freshest quotes are preferred.
+    """
+
+    def __init__(self):
+        """Initializes an empty RateGraph."""
+        self.edges: Dict[str, Dict[str, Tuple[float, datetime]]] = {}
+
+    def add_quote(self, base: str, target: str, rate: float, quoted_at: datetime) -> None:
+        """
+        Adds a quote of a pair, unless a fresher quote of that pair is already known.
+
+        Args:
+            base (str): The base currency code (e.g. "USD").
+            target (str): The target currency code (e.g. "EUR").
+            rate (float): The amount of target currency one unit of base currency buys.
+            quoted_at (datetime): When the quote was made.
+        """
+        if base == target or not rate or rate <= 0:
+            return
+        for source, destination, value in ((base, target, rate), (target, base, 1 / rate)):
+            known = self.edges.setdefault(source, {}).get(destination)
+            if known is None or known[1] < quoted_at:
+                self.edges[source][destination] = (value, quoted_at)
+
+    def best_rates_from(self, base: str) -> Dict[str, float]:
+        """
+        Returns the best rate from the given currency to every currency reachable from it.
+
+        Runs a breadth-first search, expanding the freshest quotes first so that they win ties between paths of the
+        same length.
+        """
+        rates = {base: 1.0}
+        queue = deque([base])
+        while queue:
+            source = queue.popleft()
+            neighbours = sorted(self.edges.get(source, {}).items(), key=lambda edge: edge[1][1], reverse=True)
+            for destination, (rate, _) in neighbours:
+                if destination not in rates:
+                    rates[destination] = rates[source] * rate
+                    queue.append(destination)
+        return rates
+
+    def best_rates(self) -> Dict[str, Dict[str, float]]:
+        """Returns the best rates between every pair of connected currencies, by base currency."""
+        return {base: self.best_rates_from(base) for base in self.edges}
+
+
+def build_rate_graph(pairs: Iterable[Tuple[str, str]] = (), now: Optional[datetime] = None) -> RateGraph:
+    """
+    Builds the rate graph from the latest rates tables of every provider and the latest direct pair quotes.
+
+    Quotes older than ``RATE_GRAPH_QUOTE_MAX_AGE`` seconds are left out.
+
+    Args:
+        pairs (Iterable[Tuple[str, str]]): The (base, target) pairs whose direct quotes should be included.
+        now (Optional[datetime]): The current time, defaults to now.
+
+    Returns:
+        RateGraph: The graph.
+    """
+    now = now or timezone.now()
+    oldest = now - timedelta(seconds=settings.RATE_GRAPH_QUOTE_MAX_AGE)
+    provider_keys = [provider_rates_key(name) for name in provider_router.names()]
+    pair_keys = {pair_quote_key(base, target): (base, target) for base, target in pairs}
+    cached = cache.get_many(provider_keys + list(pair_keys))
+
+    graph = RateGraph()
+    for key in provider_keys:
+        snapshot = cached.get(key)
+        if snapshot and parse_datetime(snapshot["quoted_at"]) >= oldest:
+            for currency, rate in snapshot["rates"].items():
+                graph.add_quote(snapshot["base"], currency, rate, parse_datetime(snapshot["quoted_at"]))
+    for key, (base, target) in pair_keys.items():
+        quote = cached.get(key)
+        if quote and parse_datetime(quote["quoted_at"]) >= oldest:
+            graph.add_quote(base, target, quote["rate"], parse_datetime(quote["quoted_at"]))
+    return graph
+
+
+def publish_rate_graph(graph: RateGraph) -> int:
+    """
+    Publishes the best rates of the graph under a new version, one cache entry per base currency.
+
+    The entries are written before the version pointer is moved, so readers always resolve against a complete
+    graph; superseded versions expire after ``RATE_GRAPH_TIMEOUT`` seconds.
+
+    Args:
+        graph (RateGraph): The graph to publish.
+
+    Returns:
+        int: The version of the published graph.
+    """
+    version = (cache.get(RATE_GRAPH_VERSION_KEY) or 0) + 1
+    rows = {rate_graph_key(version, base): rates for base, rates in graph.best_rates().items()}
+    cache.set_many(rows, timeout=settings.RATE_GRAPH_TIMEOUT)
+    cache.set(RATE_GRAPH_VERSION_KEY, version, timeout=None)
+    return version
+
+
+def resolve_rate(base: str, target: str) -> Optional[float]:
+    """
+    Returns the best rate between two currencies from the published rate graph.
+
+    Costs two cache reads whatever the size of the graph: the version pointer, then the best rates from the base
+    currency.
+
+    Args:
+        base (str): The base currency code (e.g. "USD").
+        target (str): The target currency code (e.g. "EUR").
+
+    Returns:
+        Optional[float]: The amount of target currency one unit of base currency buys, or None if the graph was
+        never published or does not connect the two currencies.
+    """
+    version = cache.get(RATE_GRAPH_VERSION_KEY)
+    if version is None:
+        return None
+    rates = cache.get(rate_graph_key(version, base))
+    return rates.get(target) if rates else None
+
+
+__all__ = [
+    "RateGraph",
+    "build_rate_graph",
+    "publish_rate_graph",
+    "record_pair_quote",
+    "record_provider_rates",
+    "resolve_rate",
+]
@@ -0,0 +1,42 @@
+"""Test cases for the cache_lock."""
+from django.core.cache import cache
+from django.test import TestCase
+
+from ..cache_lock import CacheLease
+
+
+class TestCacheLease(TestCase):
+    """Test cases for the CacheLease class."""
+
+    def setUp(self):
+        """Tests Setup."""
+        cache.clear()
+
+    def test_acquire_is_exclusive(self):
+        """Test a held lease cannot be acquired a second time."""
+        first, second = CacheLease("resource", timeout=60), CacheLease("resource", timeout=60)
+
+        self.assertIsNotNone(first.acquire())
+        self.assertIsNone(second.acquire())
+
+        first.release()
+        self.assertIsNotNone(second.acquire())
+
+    def test_fencing_tokens_increase(self):
+        """Test every acquisition draws a larger fencing token."""
+        lease = CacheLease("resource", timeout=60)
+        first_token = lease.acquire()
+        lease.release()
+
+        self.assertGreater(lease.acquire(), first_token)
+
+    def test_release_keeps_lease_taken_over(self):
+        """Test releasing an expired lease does not free the lease of its successor."""
+        stale, successor = CacheLease("resource", timeout=60), CacheLease("resource", timeout=60)
+        stale.acquire()
+        cache.delete(stale.key)  # Simulate the lease expiring.
+        successor.acquire()
+
+        stale.release()
+
+        self.assertTrue(successor.is_held())
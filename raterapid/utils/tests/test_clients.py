@@ -1,10 +1,12 @@
 """Test cases for the currency_clients."""
 from unittest.mock import patch
 
+from django.core.cache import cache
 from django.test import TestCase
 from requests import HTTPError
 
 from ..currency_clients import CurrencyLayerClient, EXChangeRateClient, get_latest_rates, pair_conversion
+from ..provider_router import ProviderStats
 
 
 class TestClients(TestCase):
@@ -15,7 +17,7 @@ class TestClients(TestCase):
         self.ex_client = EXChangeRateClient("test")
         self.currencylayer_client = CurrencyLayerClient("test")
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_get_latest_rates(self, mock_get):
         """Test getting latest rates for the EXChangeRateClient."""
         mock_response = mock_get.return_value
@@ -36,7 +38,7 @@ class TestClients(TestCase):
         self.assertEqual(rates["GBP"], 0.76)
         self.assertEqual(rates["AUD"], 1.38)
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_pair_conversion(self, mock_get):
         """Test pair conversion for the EXChangeRateClient."""
         mock_response = mock_get.return_value
@@ -53,7 +55,7 @@ class TestClients(TestCase):
         self.assertTrue(success)
         self.assertEqual(conversion_result, 85.0)
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_get_latest_rates_api_request_failure(self, mock_get):
         """Test failing scenario for get_latest_rates method for the EXChangeRateClient."""
         mock_get.side_effect = HTTPError()
@@ -63,7 +65,7 @@ class TestClients(TestCase):
         self.assertFalse(success)
         self.assertEqual(rates, {})
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_pair_conversion_api_request_failure(self, mock_get):
         """Test failing scenario for pair_conversion method for the EXChangeRateClient."""
         mock_get.side_effect = HTTPError()
@@ -73,7 +75,7 @@ class TestClients(TestCase):
         self.assertFalse(success)
         self.assertIsNone(result)
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_currencylayer_get_latest_rates(self, mock_get):
         """Test getting latest rates for the CurrencyLayerClient."""
         mock_response = mock_get.return_value
@@ -94,7 +96,7 @@ class TestClients(TestCase):
         self.assertEqual(rates["GBP"], 0.76)
         self.assertEqual(rates["AUD"], 1.38)
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_currencylayer_pair_conversion(self, mock_get):
         """Test pair conversion for the CurrencyLayerClient."""
         mock_response = mock_get.return_value
@@ -111,7 +113,7 @@ class TestClients(TestCase):
         self.assertTrue(success)
         self.assertEqual(conversion_result, 85.0)
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_currencylayer_get_latest_rates_api_request_failure(self, mock_get):
         """Test failing scenario for get_latest_rates method for the CurrencyLayerClient."""
         mock_get.side_effect = HTTPError()
@@ -121,7 +123,7 @@ class TestClients(TestCase):
         self.assertFalse(success)
         self.assertEqual(rates, {})
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_currencylayer_pair_conversion_api_request_failure(self, mock_get):
         """Test failing scenario for pair_conversion method for the CurrencyLayerClient."""
         mock_get.side_effect = HTTPError()
@@ -131,6 +133,33 @@ class TestClients(TestCase):
         self.assertFalse(success)
         self.assertIsNone(result)
 
+    @patch("requests.Session.get")
+    def test_currencylayer_error_answer_is_a_failure(self, mock_get):
+        """Test an answer with success false, sent with a 200, fails and counts as an error of the provider."""
+        cache.clear()
+        mock_get.return_value.json.return_value = {
+            "success": False,
+            "error": {"code": 104, "info": "Your monthly usage limit has been reached."},
+        }
+
+        success, rates = self.currencylayer_client.get_latest_rates()
+
+        self.assertFalse(success)
+        self.assertEqual(rates, {})
+        name = self.currencylayer_client.name
+        self.assertEqual(ProviderStats.get_many([name])[name].error_rate, 1.0)
+
+    @patch("requests.Session.get")
+    def test_get_latest_rates_without_rates_is_a_failure(self, mock_get):
+        """Test an answer with a missing or empty rates table fails."""
+        for answer in ({"success": True}, {"success": True, "quotes": {}}):
+            mock_get.return_value.json.return_value = answer
+
+            self.assertEqual(self.currencylayer_client.get_latest_rates(), (False, {}))
+
+        mock_get.return_value.json.return_value = {"result": "error", "error-type": "quota-reached"}
+        self.assertEqual(self.ex_client.get_latest_rates(), (False, {}))
+
     @patch.object(EXChangeRateClient, "get_latest_rates")
     @patch.object(CurrencyLayerClient, "get_latest_rates")
     def test_get_latest_rates_fallback(self, mock_currencylayer_rates, mock_exchangerate_rates):
@@ -0,0 +1,76 @@
+"""Test cases for the deadline."""
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from ..currency_clients import CurrencyLayerClient, EXChangeRateClient, pair_conversion
+from ..deadline import Deadline
+
+
+@override_settings(
+    CONVERSION_DEADLINE_MS=3000,
+    CONVERSION_DEADLINE_MAX_MS=10000,
+    CONVERSION_DEADLINE_RESERVE_MS=100,
+    CURRENCY_API_TIMEOUT=5.0,
+)
+class TestDeadline(TestCase):
+    """Test cases for the Deadline class."""
+
+    def setUp(self):
+        """Tests Setup."""
+        cache.clear()
+
+    def test_from_header(self):
+        """Test the budget is read from the header, falling back to the default and capped by the maximum."""
+        self.assertAlmostEqual(Deadline.from_header("1500").remaining(), 1.5, places=1)
+        self.assertAlmostEqual(Deadline.from_header(None).remaining(), 3.0, places=1)
+        self.assertAlmostEqual(Deadline.from_header("soon").remaining(), 3.0, places=1)
+        self.assertAlmostEqual(Deadline.from_header("60000").remaining(), 10.0, places=1)
+        self.assertAlmostEqual(Deadline.from_header("nan").remaining(), 3.0, places=1)
+        self.assertAlmostEqual(Deadline.from_header("inf").remaining(), 3.0, places=1)
+
+    def test_timeout_shrinks_with_the_budget(self):
+        """Test provider calls get the time left minus the reserve, capped by the API timeout."""
+        self.assertAlmostEqual(Deadline(1.0).timeout(), 0.9, places=1)
+        self.assertEqual(Deadline(30.0).timeout(), 5.0)
+
+    def test_nearly_expired(self):
+        """Test a deadline within its reserve is nearly expired."""
+        self.assertTrue(Deadline(0.05).is_nearly_expired())
+        self.assertFalse(Deadline(1.0).is_nearly_expired())
+
+    @patch("requests.Session.get")
+    def test_client_timeout(self, mock_get):
+        """Test clients pass the time left as the request timeout."""
+        mock_get.return_value.json.return_value = {"conversion_result": 85.0}
+
+        EXChangeRateClient("test").pair_conversion("USD", "EUR", 100, deadline=Deadline(1.0))
+
+        self.assertLessEqual(mock_get.call_args.kwargs["timeout"], 0.9)
+
+    @patch("requests.Session.get")
+    def test_client_skips_spent_deadline(self, mock_get):
+        """Test clients do not call out, nor spend quota, once the deadline leaves no timeout."""
+        client = EXChangeRateClient("test")
+
+        success, result = client.pair_conversion("USD", "EUR", 100, deadline=Deadline(0.0))
+
+        self.assertFalse(success)
+        self.assertIsNone(result)
+        self.assertEqual(client.quota.used(), 0)
+        mock_get.assert_not_called()
+
+    @patch.object(EXChangeRateClient, "pair_conversion")
+    @patch.object(CurrencyLayerClient, "pair_conversion")
+    def test_spent_deadline_uses_cached_rates(self, mock_currencylayer_conversion, mock_exchangerate_conversion):
+        """Test conversions fall straight to the cached rates once the deadline is nearly spent."""
+        cache.set("api_rates", {"rate": {"USD": 1.0, "EUR": 0.85}, "updated_at": str(timezone.now())})
+
+        success, result, _ = pair_conversion("USD", "EUR", 100, deadline=Deadline(0.0))
+
+        self.assertTrue(success)
+        self.assertAlmostEqual(result, 85.0)
+        mock_exchangerate_conversion.assert_not_called()
+        mock_currencylayer_conversion.assert_not_called()
@@ -0,0 +1,96 @@
+"""Test suite for the offline rates snapshot."""
+import os
+import tempfile
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from ..currency_clients import CurrencyLayerClient, EXChangeRateClient, pair_conversion
+from ..offline_snapshot import OfflineSnapshot, offline_snapshot, write_offline_snapshot
+
+
+class OfflineSnapshotTestCase(TestCase):
+    """Test suite for OfflineSnapshot."""
+
+    def setUp(self):
+        """Set Up Method."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "rates.snapshot")
+        self.snapshot = OfflineSnapshot(self.path)
+
+    def tearDown(self):
+        """Tear Down Method."""
+        self.snapshot.close()
+        self.directory.cleanup()
+
+    def test_lookup(self):
+        """Test every rate of the snapshot is found, along with the time the rates were fetched."""
+        fetched_at = timezone.now().replace(microsecond=0)
+        rates = {"EUR": 0.9, "EGP": 30.9, "GBP": 0.78, "JPY": 144.1, "": 1.0}
+        write_offline_snapshot(rates, fetched_at, path=self.path)
+
+        for currency, rate in rates.items():
+            if currency:
+                self.assertEqual(self.snapshot.rate(currency), rate)
+        self.assertEqual(self.snapshot.rate("USD"), 1.0)
+        self.assertIsNone(self.snapshot.rate("AAA"))
+        self.assertIsNone(self.snapshot.rate("ZZZ"))
+        self.assertEqual(self.snapshot.fetched_at(), fetched_at)
+        self.assertAlmostEqual(self.snapshot.cross_rate("EUR", "EGP")[0], 30.9 / 0.9)
+
+    def test_replaced_file_is_mapped_again(self):
+        """Test a snapshot replaced by a newer one is picked up by readers that mapped the old one."""
+        write_offline_snapshot({"EUR": 0.9}, timezone.now(), path=self.path)
+        self.assertEqual(self.snapshot.rate("EUR"), 0.9)
+
+        write_offline_snapshot({"EUR": 0.95}, timezone.now(), path=self.path)
+
+        self.assertEqual(self.snapshot.rate("EUR"), 0.95)
+        self.assertEqual(os.listdir(self.directory.name), ["rates.snapshot"])
+
+    def test_missing_or_invalid_file(self):
+        """Test a missing, empty or foreign file is treated as no snapshot."""
+        self.assertEqual(self.snapshot.cross_rate("USD", "EUR"), (None, None))
+        for content in (b"", b"not a snapshot"):
+            with open(self.path, "wb") as snapshot_file:
+                snapshot_file.write(content)
+            self.assertIsNone(self.snapshot.rate("USD"))
+            os.unlink(self.path)
+
+    @override_settings(RATES_TABLE_MIN_SHARE=0.8)
+    def test_partial_table_keeps_the_snapshot(self):
+        """Test an empty table, or one that lost most currencies of the snapshot, does not replace it."""
+        rates = {"EUR": 0.9, "EGP": 30.9, "GBP": 0.78, "JPY": 144.1}
+        self.assertTrue(write_offline_snapshot(rates, timezone.now(), path=self.path))
+
+        self.assertFalse(write_offline_snapshot({}, timezone.now(), path=self.path))
+        self.assertFalse(write_offline_snapshot({"EUR": 0.95}, timezone.now(), path=self.path))
+
+        self.assertEqual(self.snapshot.rate("EUR"), 0.9)
+        self.assertEqual(self.snapshot.count(), 5)
+
+    def test_truncated_file(self):
+        """Test a file holding fewer records than its header counts is treated as no snapshot."""
+        write_offline_snapshot({"EUR": 0.9, "GBP": 0.78}, timezone.now(), path=self.path)
+        os.truncate(self.path, os.path.getsize(self.path) - 1)
+
+        self.assertEqual(self.snapshot.cross_rate("USD", "GBP"), (None, None))
+
+    @patch.object(EXChangeRateClient, "pair_conversion", return_value=(False, None))
+    @patch.object(CurrencyLayerClient, "pair_conversion", return_value=(False, None))
+    def test_pair_conversion_falls_back_to_snapshot(self, mock_currencylayer, mock_exchangerate):
+        """Test conversions are answered from the snapshot when neither the providers nor the cache can."""
+        cache.clear()
+        fetched_at = timezone.now() - timedelta(days=2)
+        write_offline_snapshot({"EUR": 0.9, "EGP": 30.9}, fetched_at, path=self.path)
+
+        with override_settings(OFFLINE_RATES_PATH=self.path):
+            success, result, last_updated = pair_conversion("EUR", "EGP", 10)
+            offline_snapshot.close()
+
+        self.assertTrue(success)
+        self.assertAlmostEqual(result, 10 * 30.9 / 0.9)
+        self.assertEqual(last_updated.timestamp(), fetched_at.timestamp())
@@ -0,0 +1,73 @@
+"""Test cases for the provider_router."""
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from ..currency_clients import CurrencyLayerClient, EXChangeRateClient
+from ..provider_router import ProviderRouter, ProviderStats
+
+
+@override_settings(CURRENCY_API_EWMA_ALPHA=0.5, CURRENCY_API_DEFAULT_LATENCY=0.5)
+class TestProviderRouter(TestCase):
+    """Test cases for the ProviderRouter class."""
+
+    def setUp(self):
+        """Tests Setup."""
+        cache.clear()
+        self.router = ProviderRouter()
+        self.ex_client = self.router.register(EXChangeRateClient("test"))
+        self.currencylayer_client = self.router.register(CurrencyLayerClient("test"))
+
+    def test_record_moving_averages(self):
+        """Test request outcomes are folded into the provider's moving averages."""
+        ProviderStats.record("exchangerate", 1.0, success=True)
+        ProviderStats.record("exchangerate", 0.5, success=False)
+
+        stats = ProviderStats.get_many(["exchangerate"])["exchangerate"]
+
+        self.assertAlmostEqual(stats.latency, 0.75)
+        self.assertAlmostEqual(stats.error_rate, 0.5)
+
+    @patch("random.random", return_value=0.5)
+    def test_fastest_provider_first(self, _):
+        """Test the fastest provider is tried first."""
+        ProviderStats.record("exchangerate", 2.0, success=True)
+        ProviderStats.record("currencylayer", 0.1, success=True)
+
+        self.assertEqual(self.router.ordered(), [self.currencylayer_client, self.ex_client])
+
+    @patch("random.random", return_value=0.5)
+    def test_failing_provider_last(self, _):
+        """Test a failing provider is tried after a healthy one."""
+        ProviderStats.record("exchangerate", 0.1, success=False)
+        ProviderStats.record("currencylayer", 0.1, success=True)
+
+        self.assertEqual(self.router.ordered(), [self.currencylayer_client, self.ex_client])
+
+    @patch("random.random", return_value=0.5)
+    def test_weight(self, _):
+        """Test the registered weight decides between providers that perform alike."""
+        self.router.register(self.ex_client, weight=3.0)
+
+        self.assertEqual(self.router.ordered(), [self.ex_client, self.currencylayer_client])
+
+    def test_zero_weight_last_resort(self):
+        """Test a provider of weight 0 is only tried last, however fast it is, and negative weights are rejected."""
+        self.router.register(self.ex_client, weight=0.0)
+        ProviderStats.record("exchangerate", 0.01, success=True)
+        ProviderStats.record("currencylayer", 5.0, success=True)
+
+        for _ in range(20):
+            self.assertEqual(self.router.ordered(), [self.currencylayer_client, self.ex_client])
+        with self.assertRaises(ValueError):
+            self.router.register(self.ex_client, weight=-1.0)
+
+    @patch("requests.Session.get")
+    def test_client_records_stats(self, mock_get):
+        """Test clients record the outcome of every request."""
+        mock_get.return_value.json.return_value = {"conversion_result": 85.0}
+
+        self.ex_client.pair_conversion("USD", "EUR", 100)
+
+        self.assertIsNotNone(cache.get(ProviderStats.key("exchangerate")))
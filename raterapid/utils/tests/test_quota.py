@@ -0,0 +1,94 @@
+"""Test cases for the quota."""
+import threading
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from ..currency_clients import EXChangeRateClient
+from ..quota import ProviderQuota
+
+MID_MONTH = datetime(2023, 6, 16, tzinfo=timezone.utc)
+
+
+@override_settings(CURRENCY_API_MONTHLY_QUOTAS={"exchangerate": 100}, CURRENCY_API_QUOTA_BURST=5)
+class TestProviderQuota(TestCase):
+    """Test cases for the ProviderQuota class."""
+
+    def setUp(self):
+        """Tests Setup."""
+        cache.clear()
+        self.quota = ProviderQuota("exchangerate")
+
+    def consume(self, count):
+        """Records ``count`` requests in the middle of the month."""
+        for _ in range(count):
+            self.quota.consume(now=MID_MONTH)
+
+    def test_unlimited_provider(self):
+        """Test a provider without a budget is never limited."""
+        quota = ProviderQuota("currencylayer")
+
+        self.assertTrue(quota.allows(now=MID_MONTH))
+
+    def test_paced_requests_follow_the_budget(self):
+        """Test paced requests stop once usage runs ahead of the pro-rata budget."""
+        self.consume(50)
+        self.assertTrue(self.quota.allows(now=MID_MONTH))
+
+        self.consume(5)
+        self.assertFalse(self.quota.allows(now=MID_MONTH))
+        self.assertTrue(self.quota.allows(paced=False, now=MID_MONTH))
+
+    def test_hard_limit(self):
+        """Test no request is allowed once the budget is spent."""
+        self.consume(100)
+
+        self.assertFalse(self.quota.allows(paced=False, now=MID_MONTH))
+
+    def test_concurrent_reservations_stay_within_budget(self):
+        """Test requests racing for the end of the budget are only granted what is left of it."""
+        self.consume(95)
+        granted = []
+
+        def reserve():
+            granted.append(self.quota.reserve(paced=False, now=MID_MONTH))
+
+        threads = [threading.Thread(target=reserve) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(granted.count(True), 5)
+        self.assertEqual(self.quota.used(now=MID_MONTH), 100)
+
+    def test_reserve_lets_requests_through_when_the_cache_is_down(self):
+        """Test requests are reserved when the cache cannot count them, as when it ignores its errors."""
+        with patch.object(cache, "add", return_value=None), patch.object(cache, "incr", return_value=None):
+            self.assertTrue(self.quota.reserve(now=MID_MONTH))
+
+    def test_unlimited_provider_is_not_counted(self):
+        """Test reserving a request of a provider without a budget does not touch the cache."""
+        with patch.object(cache, "incr") as mock_incr:
+            self.assertTrue(ProviderQuota("currencylayer").reserve(now=MID_MONTH))
+
+        mock_incr.assert_not_called()
+
+    def test_projected_usage(self):
+        """Test the monthly usage is projected from the current burn rate."""
+        self.consume(40)
+
+        self.assertAlmostEqual(self.quota.projected_usage(now=MID_MONTH), 80.0)
+
+    @patch("requests.Session.get")
+    def test_client_skips_request_over_budget(self, mock_get):
+        """Test clients do not call a provider whose quota is spent."""
+        client = EXChangeRateClient("test")
+        with patch.object(ProviderQuota, "reserve", return_value=False):
+            success, result = client.pair_conversion("USD", "EUR", 100)
+
+        self.assertFalse(success)
+        self.assertIsNone(result)
+        mock_get.assert_not_called()
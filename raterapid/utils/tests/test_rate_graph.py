@@ -0,0 +1,123 @@
+"""Test suite for the rate graph."""
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from ..currency_clients import CurrencyLayerClient, EXChangeRateClient, pair_conversion
+from ..rate_graph import (
+    RateGraph,
+    build_rate_graph,
+    pair_quote_key,
+    provider_rates_key,
+    publish_rate_graph,
+    record_pair_quote,
+    record_provider_rates,
+    resolve_rate,
+)
+
+
+class RateGraphTestCase(TestCase):
+    """Test suite for RateGraph."""
+
+    def test_best_rates_follow_shortest_paths(self):
+        """Test rates are resolved in both directions and across several hops."""
+        now = timezone.now()
+        graph = RateGraph()
+        graph.add_quote("USD", "EUR", 0.9, now)
+        graph.add_quote("EUR", "EGP", 34.0, now)
+
+        rates = graph.best_rates()
+
+        self.assertAlmostEqual(rates["EUR"]["USD"], 1 / 0.9)
+        self.assertAlmostEqual(rates["USD"]["EGP"], 0.9 * 34.0)
+        self.assertAlmostEqual(rates["EGP"]["USD"], 1 / (0.9 * 34.0))
+
+    def test_fresher_quotes_win(self):
+        """Test the freshest quote of a pair is kept, and direct quotes beat longer paths."""
+        now = timezone.now()
+        graph = RateGraph()
+        graph.add_quote("USD", "EUR", 0.9, now)
+        graph.add_quote("EUR", "USD", 1 / 0.8, now - timedelta(hours=1))
+        graph.add_quote("USD", "EGP", 30.0, now)
+        graph.add_quote("EUR", "EGP", 40.0, now)
+
+        rates = graph.best_rates()
+
+        self.assertAlmostEqual(rates["USD"]["EUR"], 0.9)
+        self.assertAlmostEqual(rates["USD"]["EGP"], 30.0)
+
+
+@override_settings(RATE_GRAPH_QUOTE_MAX_AGE=3600)
+class RateGraphCacheTestCase(TestCase):
+    """Test suite for building, publishing and resolving the rate graph."""
+
+    def setUp(self):
+        """Set Up Method."""
+        cache.clear()
+
+    def test_graph_covers_currencies_missing_from_a_provider(self):
+        """Test currencies one provider omits are resolved through another provider or a direct quote."""
+        record_provider_rates(EXChangeRateClient.name, "USD", {"USD": 1.0, "EUR": 0.9})
+        record_provider_rates(CurrencyLayerClient.name, "USD", {"USD": 1.0, "GBP": 0.8})
+        record_pair_quote("EUR", "EGP", 34.0)
+
+        publish_rate_graph(build_rate_graph([("EUR", "EGP")]))
+
+        self.assertAlmostEqual(resolve_rate("GBP", "EUR"), 0.9 / 0.8)
+        self.assertAlmostEqual(resolve_rate("EGP", "GBP"), 0.8 / (0.9 * 34.0))
+        self.assertIsNone(resolve_rate("USD", "JPY"))
+
+    def test_stale_quotes_are_left_out(self):
+        """Test quotes older than RATE_GRAPH_QUOTE_MAX_AGE are not part of the graph."""
+        stale = {"base": "USD", "rates": {"EUR": 0.9}, "quoted_at": str(timezone.now() - timedelta(hours=2))}
+        cache.set(provider_rates_key(EXChangeRateClient.name), stale)
+
+        self.assertEqual(build_rate_graph().edges, {})
+
+    def test_resolve_without_graph(self):
+        """Test nothing is resolved before a graph is published."""
+        self.assertIsNone(cache.get(pair_quote_key("USD", "EUR")))
+
+    @patch.object(EXChangeRateClient, "pair_conversion", return_value=(False, None))
+    @patch.object(CurrencyLayerClient, "pair_conversion", return_value=(False, None))
+    def test_pair_conversion_resolves_from_graph(self, mock_currencylayer, mock_exchangerate):
+        """Test conversions fall back to the rate graph, even for a currency missing from the cached rates."""
+        cache.set("api_rates", {"rate": {"USD": 1.0, "EUR": 0.9}, "updated_at": str(timezone.now())})
+        record_provider_rates(EXChangeRateClient.name, "USD", {"USD": 1.0, "EUR": 0.9})
+        record_pair_quote("EUR", "EGP", 34.0)
+        publish_rate_graph(build_rate_graph([("EUR", "EGP")]))
+
+        success, result, _ = pair_conversion("USD", "EGP", 10)
+
+        self.assertTrue(success)
+        self.assertAlmostEqual(result, 10 * 0.9 * 34.0)
+
+    @patch("requests.Session.get")
+    def test_pair_conversion_without_result_falls_back(self, mock_get):
+        """Test a provider answering without a result, e.g. on a quota error, is skipped like a failed one."""
+        mock_get.return_value.json.return_value = {"success": False, "error": {"code": 104}}
+        cache.set("api_rates", {"rate": {"USD": 1.0, "EUR": 0.9}, "updated_at": str(timezone.now())})
+
+        success, result, _ = pair_conversion("USD", "EUR", 10)
+
+        self.assertTrue(success)
+        self.assertAlmostEqual(result, 9.0)
+        self.assertIsNone(cache.get(pair_quote_key("USD", "EUR")))
+
+    @patch("requests.Session.get")
+    def test_pair_conversion_records_quoted_rate(self, mock_get):
+        """Test a conversion records the provider's rate rather than its rounded result, once per interval."""
+        client = EXChangeRateClient("test")
+        mock_get.return_value.json.return_value = {"conversion_rate": 0.0324, "conversion_result": 0.0}
+
+        client.pair_conversion("EGP", "USD", 0.01)
+
+        self.assertEqual(cache.get(pair_quote_key("EGP", "USD"))["rate"], 0.0324)
+
+        mock_get.return_value.json.return_value = {"conversion_rate": 0.0325, "conversion_result": 0.0}
+        client.pair_conversion("EGP", "USD", 0.01)
+
+        self.assertEqual(cache.get(pair_quote_key("EGP", "USD"))["rate"], 0.0324)